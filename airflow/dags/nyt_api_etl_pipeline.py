@@ -1,18 +1,22 @@
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-import time
 import sys
 import os
 
 from airflow import DAG
+from airflow.models.param import Param
 from airflow.operators.python import PythonOperator
 from airflow.operators.bash import BashOperator
 from airflow.utils.dates import days_ago
 
 # Import helper functions
-from helper_functions import parse_configs, generate_incremental_dates, fetch_data_from_api, \
-    init_db_connection, read_json_file, transform_data, load_data, write_rejected_records_to_file, \
-    validate_published_dates
+from helper_functions import parse_configs, generate_incremental_dates, init_db_connection, \
+    write_rejected_records_to_file, validate_published_dates
+from concurrent_fetcher import fetch_dates_concurrently
+from raw_data_manifest import RawDataManifest
+from ingestion import IngestionRunner
+from pipeline import run_etl_pipeline
 
 # Fetching the API Credentials
 NYT_BOOKS_API_KEY, NYT_BOOKS_API_SECRET, NYT_BOOKS_API_ENDPOINT = parse_configs('./config/config.json')
@@ -21,53 +25,50 @@ NYT_BOOKS_API_KEY, NYT_BOOKS_API_SECRET, NYT_BOOKS_API_ENDPOINT = parse_configs(
 START_DATE = '2020-12-27'
 END_DATE = '2023-12-31'
 OFFSET = 7
+FETCH_MAX_WORKERS = 4
+PROCESS_BATCH_SIZE = 20
+TRANSFORM_WORKERS = 4
 
 # Fetch Data from API
 def fetch_data_function():
     # Generate the list of dates for incremental loading
     dates = generate_incremental_dates(START_DATE, END_DATE, OFFSET)
 
-    # make api calls for each date
-    for date in dates:
-        try:
-            logger.info(f"Starting fetch for date {date}")
-            fetch_data_from_api(NYT_BOOKS_API_KEY, date)
-            logger.info(f"Successfully fetched data for date {date}")
-            time.sleep(12)  # Sleep for 12 seconds to avoid hitting API rate limits
-        except Exception as e:
-            logger.error(f"Error fetching data for date {date}: {e}")
-            raise
+    # make api calls concurrently, paced by the API per-minute and per-day quotas,
+    # only for dates missing, failed or stale in the raw data manifest
+    try:
+        logger.info(f"Starting fetch for {len(dates)} dates")
+        manifest = RawDataManifest('./raw_data')
+        file_paths = fetch_dates_concurrently(NYT_BOOKS_API_KEY, dates, max_workers=FETCH_MAX_WORKERS, manifest=manifest)
+        logger.info(f"Successfully fetched data for {len(file_paths)} dates")
+    except Exception as e:
+        logger.error(f"Error fetching data: {e}")
+        raise
 
 # Task 2: Process Data
 def process_data_function():
     # Generate the list of dates for incremental loading
     dates = generate_incremental_dates(START_DATE, END_DATE, OFFSET)
 
-     # process raw data files for each date
-    for date in dates:
-        try:
-            logger.info(f"Starting data processing for {date}")
-            # Read the raw data
-            data = read_json_file(f'./raw_data/{date}.json')
-
-            # Transform the data
-            df_lists, df_books, df_buy_links, df_best_sellers, rejected_records = transform_data(data)
-
-            # Load data into the database
-            conn, cursor = init_db_connection("localhost", "mydb", "admin", "admin", "5432")
-            load_data(conn, cursor, df_lists, df_books, df_buy_links, df_best_sellers)
+    # process raw data files in batches of dates, one transaction per batch, through the
+    # streaming pipeline so transforming the next files overlaps loading the current batch;
+    # batches of consecutive dates are formed before the transform processes, each one
+    # transformed together into one set of DataFrames, and committed in date order
+    try:
+        logger.info(f"Starting data processing for {len(dates)} dates")
+        with ProcessPoolExecutor(max_workers=TRANSFORM_WORKERS) as executor, \
+                IngestionRunner("localhost", "mydb", "admin", "admin", "5432", batch_size=PROCESS_BATCH_SIZE,
+                                transform_batches=True) as runner:
+            rejected_records = run_etl_pipeline(runner, dates, transform_workers=TRANSFORM_WORKERS,
+                                                transform_executor=executor)
 
-            # Handle rejected records
-            write_rejected_records_to_file(rejected_records)
+        # Handle rejected records
+        write_rejected_records_to_file(rejected_records)
 
-            logger.info(f"Successfully processed data for {date}")
-        except Exception as e:
-            logger.error(f"Error processing data for {date}: {e}")
-            raise
-    
-    # Close the DB connection
-    cursor.close()
-    conn.close()
+        logger.info(f"Successfully processed data for {len(dates)} dates")
+    except Exception as e:
+        logger.error(f"Error processing data: {e}")
+        raise
 
 # Validate Data ingested date range
 def validate_data_task():
@@ -94,6 +95,8 @@ with DAG(
     },
     schedule_interval='@weekly',
     catchup=False,
+    # dbt builds the silver models incrementally unless a run is triggered with full_refresh
+    params={'full_refresh': Param(False, type='boolean')},
     tags=['etl', 'books', 'nyt']
 ) as dag:
 
@@ -118,7 +121,7 @@ with DAG(
 
     dbt_run_task = BashOperator(
         task_id = 'run_dbt_build_cmd',
-        bash_command='cd ../nyt_lists_reviews && dbt build --full-refresh'
+        bash_command="cd ../nyt_lists_reviews && dbt build{{ ' --full-refresh' if params.full_refresh else '' }}"
     )
 
     # Set up tasks dependiencies
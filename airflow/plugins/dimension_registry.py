@@ -0,0 +1,112 @@
+# imports
+import logging
+
+import numpy as np
+import pandas as pd
+
+from helper_functions import STAGE_TABLE_KEYS
+
+
+logger = logging.getLogger(__name__)
+
+# Stage tables whose rows repeat from week to week, in `transform_data` output order
+DIMENSION_TABLES = ("lists", "books", "books_buy_links")
+
+# Columns left out of the content hash: the dates that move with every week a row is
+# published in. The same columns the SCD2 snapshots leave out of their `row_hash`.
+UNTRACKED_COLUMNS = {
+    "lists": ["updated"],
+    "books": ["created_date", "updated_date"],
+    "books_buy_links": ["published_date"],
+}
+
+
+class DimensionRegistry:
+    """
+    Remembers, for the duration of an ingestion run, the content hash of every list,
+    book and buy link already staged, keyed on the natural keys of `STAGE_TABLE_KEYS`
+    (list id, ISBN13, and ISBN13 plus website). Filtering a batch through it keeps only
+    the dimension rows that are new or whose content changed, so a book ranked for
+    months is staged once instead of once per list and week.
+
+    Like the load transaction, what a batch adds is pending until `commit` and dropped
+    by `rollback`, so rows of a rolled-back batch are staged again by the next one.
+
+    Every column but the weekly dates of `UNTRACKED_COLUMNS` is hashed, so a list, book
+    or buy link is staged again only when one of its attributes changes, and once per
+    run otherwise. As with the snapshots, the dates of a staged row are those of the
+    first week of its current version.
+    """
+
+    def __init__(self):
+        self.tables = DIMENSION_TABLES
+        self.hashes = {table: {} for table in DIMENSION_TABLES}
+        self.pending = {table: {} for table in DIMENSION_TABLES}
+        self.emitted = dict.fromkeys(DIMENSION_TABLES, 0)
+        self.skipped = dict.fromkeys(DIMENSION_TABLES, 0)
+
+    def filter_table(self, table, df):
+        """
+        Returns the rows of `df` that are new or changed since the last committed batch,
+        the last row of each key winning (as with the upsert). Rows missing a key are
+        passed through for the loader to handle.
+
+        Args:
+            table (str): One of `DIMENSION_TABLES`.
+            df (pd.DataFrame): Rows of `table`, as output by `transform_data`.
+
+        Returns:
+            pd.DataFrame: The rows to stage.
+        """
+        if df.empty:
+            return df
+        keys = STAGE_TABLE_KEYS[table]
+        has_keys = df[keys].notna().all(axis=1)
+        keyed = df[has_keys].drop_duplicates(keys, keep="last")
+
+        key_values = keyed[keys[0]].tolist() if len(keys) == 1 else list(keyed[keys].itertuples(index=False, name=None))
+        tracked = keyed.drop(columns=UNTRACKED_COLUMNS.get(table, []), errors="ignore")
+        content_hashes = pd.util.hash_pandas_object(tracked, index=False).tolist()
+        hashes, pending = self.hashes[table], self.pending[table]
+        changed = np.fromiter(
+            (pending.get(key, hashes.get(key)) != content_hash for key, content_hash in zip(key_values, content_hashes)),
+            dtype=bool, count=len(keyed),
+        )
+        pending.update(
+            (key, content_hash) for key, content_hash, is_changed in zip(key_values, content_hashes, changed)
+            if is_changed
+        )
+
+        rows = pd.concat([keyed[changed], df[~has_keys]]) if not has_keys.all() else keyed[changed]
+        self.emitted[table] += len(rows)
+        self.skipped[table] += len(df) - len(rows)
+        return rows
+
+    def filter(self, df_lists, df_books, df_buy_links):
+        """
+        Applies `filter_table` to the dimension outputs of `transform_data`.
+
+        Returns:
+            tuple: The lists, books and buy links to stage.
+        """
+        return tuple(self.filter_table(table, df) for table, df in zip(self.tables, (df_lists, df_books, df_buy_links)))
+
+    def commit(self):
+        """
+        Records the rows filtered since the last commit or rollback as staged.
+        """
+        for table in self.tables:
+            self.hashes[table].update(self.pending[table])
+            self.pending[table].clear()
+
+    def rollback(self):
+        """
+        Forgets the rows filtered since the last commit, so they are staged again.
+        """
+        for table in self.tables:
+            self.pending[table].clear()
+
+    def log_stats(self):
+        for table in self.tables:
+            logger.info(f"Dimension {table}: staged {self.emitted[table]} rows, skipped {self.skipped[table]} "
+                        f"already staged, {len(self.hashes[table])} distinct keys.")
@@ -3,18 +3,277 @@ import logging
 import sys
 import os
 from datetime import datetime, timedelta
+import functools
+import gzip
+import io
 import json
+import random
+import zlib
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import psycopg2
 from psycopg2.extras import execute_batch
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+# zstd compression of raw data is optional
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'plugins')))
 
 # Setup logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# NYT Books API lists overview endpoint
+NYT_OVERVIEW_ENDPOINT = "https://api.nytimes.com/svc/books/v3/lists/overview.json"
+
+# Raw data storage formats: name -> (file extension, opener taking (path, mode))
+RAW_DATA_FORMATS = {
+    "json": (".json", open),
+    "gzip": (".json.gz", gzip.open),
+}
+# Errors raised while decoding a corrupt or malformed raw file
+RAW_DATA_DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError, EOFError, gzip.BadGzipFile, zlib.error)
+if zstandard is not None:
+    RAW_DATA_FORMATS["zstd"] = (".json.zst", zstandard.open)
+    RAW_DATA_DECODE_ERRORS += (zstandard.ZstdError,)
+DEFAULT_RAW_DATA_FORMAT = "gzip"
+
+# Stage tables and the DataFrame columns loaded into them, in COPY/INSERT order
+STAGE_TABLE_COLUMNS = {
+    "lists": ["id", "list_name", "list_name_encoded", "display_name", "updated", "list_image",
+              "list_image_width", "list_image_height"],
+    "books": ["id", "title", "publisher", "author", "contributor", "contributor_note", "description",
+              "created_date", "updated_date", "age_group", "amazon_product_url", "primary_isbn13",
+              "primary_isbn10", "book_image_width", "book_image_height", "first_chapter_link", "book_uri",
+              "sunday_review_link"],
+    "books_buy_links": ["book_id", "website_name", "website_url", "published_date"],
+    "best_sellings_lists_books": ["bestsellers_date", "published_date", "previous_published_date",
+                                  "next_published_date", "list_id", "book_id", "rank", "weeks_on_list", "price"],
+}
+
+# Natural keys of the stage tables, merged on by the upsert loader
+STAGE_TABLE_KEYS = {
+    "lists": ["id"],
+    "books": ["id"],
+    "books_buy_links": ["book_id", "website_name"],
+    "best_sellings_lists_books": ["published_date", "list_id", "book_id"],
+}
+
+# Date telling which version of a dimension row is the newest: the upsert loader never
+# replaces a staged row with one from an older week (a re-run or late batch)
+STAGE_TABLE_RECENCY = {
+    "lists": "updated",
+    "books": "updated_date",
+    "books_buy_links": "published_date",
+}
+
+# Audit table of the stage loads, one row per committed batch. Every stage row
+# records the batch that last changed it (batch_id) and when (loaded_at).
+LOAD_BATCHES_TABLE = "load_batches"
+
+# Stage fact table, range-partitioned by year on its partition column
+STAGE_FACT_TABLE = "best_sellings_lists_books"
+FACT_PARTITION_COLUMN = "published_date"
+
+# Keys each list and book entry must hold (a missing one rejects the record)
+LIST_COLUMNS = ["list_id", "list_name", "list_name_encoded", "display_name"]
+BOOK_COLUMNS = ["primary_isbn13", "title", "publisher", "author", "contributor", "contributor_note", "description",
+                "created_date", "updated_date", "age_group", "amazon_product_url", "primary_isbn10",
+                "book_image_width", "book_image_height", "first_chapter_link", "book_uri", "sunday_review_link"]
+
+# Overview-level dates shared by every fact row of a file
+FILE_DATE_KEYS = ["bestsellers_date", "published_date", "previous_published_date", "next_published_date"]
+
+# Compact dtypes of the transformed DataFrames: strings from small vocabularies, and
+# the file dates and ids repeated on every fact row, as categoricals; small counts as
+# nullable small integers. Columns that cannot be cast keep their inferred dtype.
+COMPACT_DTYPES = {
+    "lists": {"list_name": "category", "list_name_encoded": "category", "display_name": "category"},
+    "books": {"publisher": "category", "author": "category", "contributor": "category",
+              "contributor_note": "category", "age_group": "category", "book_image_width": "Int32",
+              "book_image_height": "Int32"},
+    "books_buy_links": {"book_id": "category", "website_name": "category", "published_date": "category"},
+    "best_sellings_lists_books": {"bestsellers_date": "category", "published_date": "category",
+                                  "previous_published_date": "category", "next_published_date": "category",
+                                  "list_id": "category", "book_id": "category", "rank": "Int16",
+                                  "weeks_on_list": "Int16"},
+}
+
+# Distinct date strings kept by the parse cache
+DATE_PARSE_CACHE_SIZE = 1024
+
+# Leading bytes identifying compressed raw files
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class APIRequestError(Exception):
+    """
+    Raised when the NYT Books API answers with a non-200 status code.
+
+    Attributes:
+        status_code (int): The HTTP status code returned by the API.
+        retry_after (float or None): Seconds to wait before retrying, taken from the
+            `Retry-After` header when the API provides one.
+    """
+
+    def __init__(self, message, status_code, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value):
+    """
+    Parses a `Retry-After` header given in seconds, returning None when absent or invalid.
+    """
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class NYTBooksAPIClient:
+    """
+    HTTP client for the NYT Books API holding a pooled keep-alive session, so
+    consecutive calls reuse TCP/TLS connections instead of paying for a new
+    handshake every time.
+
+    Transient failures (connection errors, timeouts and the statuses listed in
+    `retry_statuses`) are retried with exponential backoff and full jitter, and a
+    `Retry-After` header takes precedence over the computed delay, up to `max_backoff`.
+
+    Args:
+        pool_maxsize (int): Maximum number of kept-alive connections (match the number of fetch workers).
+        max_retries (int): Retries per request after the first attempt.
+        backoff_factor (float): Base delay in seconds, doubled after every retry.
+        max_backoff (float): Upper bound for a single delay in seconds, `Retry-After` included.
+        connect_timeout (float): Seconds to wait for the connection to be established.
+        read_timeout (float): Seconds to wait for the server to send the response.
+        retry_statuses (tuple): HTTP statuses considered transient.
+        sleep (callable, optional): Sleep function, overridable for testing.
+    """
+
+    def __init__(self, pool_maxsize=10, max_retries=3, backoff_factor=1.0, max_backoff=60.0,
+                 connect_timeout=5, read_timeout=30, retry_statuses=(429, 500, 502, 503, 504), sleep=time.sleep):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry_statuses = retry_statuses
+        self.sleep = sleep
+
+        # Keep-alive session with a connection pool sized for the concurrent callers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Per-request latency and retry counts
+        self.stats_lock = threading.Lock()
+        self.latencies = []
+        self.retries = 0
+
+    def backoff_delay(self, retry, retry_after=None):
+        """
+        Returns the delay before the given retry (1-based), honoring `Retry-After` when present.
+        Both are capped at `max_backoff`, so a server asking for a long wait cannot stall the run.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** (retry - 1)))
+
+    def get(self, url):
+        """
+        Sends a GET request, retrying transient failures.
+
+        Args:
+            url (str): The URL to request.
+
+        Returns:
+            tuple: The final `requests.Response`, the total latency in seconds
+                   (including backoff) and the number of retries it took.
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails after every retry.
+        """
+        start = time.perf_counter()
+        retry = 0
+        while True:
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                if response.status_code not in self.retry_statuses or retry >= self.max_retries:
+                    break
+                delay = self.backoff_delay(retry + 1, _parse_retry_after(response.headers.get("Retry-After")))
+                logging.warning(f"Transient status {response.status_code}, retrying in {delay:.1f}s")
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if retry >= self.max_retries:
+                    self._record(time.perf_counter() - start, retry)
+                    raise
+                delay = self.backoff_delay(retry + 1)
+                logging.warning(f"Request failed ({e}), retrying in {delay:.1f}s")
+            retry += 1
+            self.sleep(delay)
+
+        latency = time.perf_counter() - start
+        self._record(latency, retry)
+        return response, latency, retry
+
+    def _record(self, latency, retries):
+        with self.stats_lock:
+            self.latencies.append(latency)
+            self.retries += retries
+
+    def stats(self):
+        """
+        Summarizes the requests sent so far.
+
+        Returns:
+            dict: Request count, total retries and mean/p95/max latency in seconds.
+        """
+        with self.stats_lock:
+            latencies = sorted(self.latencies)
+            retries = self.retries
+        if not latencies:
+            return {"requests": 0, "retries": retries, "mean_latency": 0.0, "p95_latency": 0.0, "max_latency": 0.0}
+        return {
+            "requests": len(latencies),
+            "retries": retries,
+            "mean_latency": sum(latencies) / len(latencies),
+            "p95_latency": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "max_latency": latencies[-1],
+        }
+
+    def log_stats(self):
+        stats = self.stats()
+        logging.info(
+            f"API client stats: {stats['requests']} requests, {stats['retries']} retries, "
+            f"mean latency {stats['mean_latency']:.2f}s, p95 {stats['p95_latency']:.2f}s, max {stats['max_latency']:.2f}s"
+        )
+
+
+# Shared client reused across calls to fetch_data_from_api
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """
+    Returns the process-wide NYTBooksAPIClient, creating it on first use.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = NYTBooksAPIClient()
+        return _default_client
+
 
 def parse_configs(config_file_path):
     """
@@ -85,37 +344,47 @@ def generate_incremental_dates(start_date, end_date, offset):
 
 
 
-def fetch_data_from_api(NYT_BOOKS_API_KEY, DATE):
+def fetch_data_from_api(NYT_BOOKS_API_KEY, DATE, endpoint=NYT_OVERVIEW_ENDPOINT, raw_data_dir="./raw_data", client=None,
+                        raw_format=DEFAULT_RAW_DATA_FORMAT):
     """
     Fetches book data from the New York Times Books API for a specific date and 
-    saves the response as a JSON file in the `raw_data` folder.
+    saves the response as a (compressed) JSON file in the `raw_data` folder.
 
     Args:
         NYT_BOOKS_API_KEY (str): The API key for accessing the New York Times Books API.
         DATE (str): The date for which to fetch book data, in the format "YYYY-MM-DD".
+        endpoint (str): The lists overview endpoint to call (overridable for testing).
+        raw_data_dir (str): Folder where the raw JSON file is written.
+        client (NYTBooksAPIClient, optional): Client to send the request with. Defaults to the shared client.
+        raw_format (str): Storage format of the raw file, one of `RAW_DATA_FORMATS`.
 
     Returns:
-        None: This function does not return any value. It saves the data to a file.
+        str: The path of the saved raw JSON file.
+
+    Raises:
+        APIRequestError: If the API answers with a non-200 status code.
     """
     logging.info(f"Fetching data for {DATE} from the NYT Books API.")
+    client = client or get_default_client()
 
     try:
         # Connect to API and pull data
-        URL = f"https://api.nytimes.com/svc/books/v3/lists/overview.json?published_date={DATE}&api-key={NYT_BOOKS_API_KEY}"
-        response = requests.get(URL)
+        URL = f"{endpoint}?published_date={DATE}&api-key={NYT_BOOKS_API_KEY}"
+        response, latency, retries = client.get(URL)
 
         if response.status_code == 200:
             # Save the data to a JSON file in the raw_data folder
-            os.makedirs("./raw_data", exist_ok=True)
+            file_path = write_json_file(response.json(), raw_data_dir, DATE, raw_format)
 
-            file_path = f"./raw_data/{DATE}.json"
-            with open(file_path, "w") as raw_file:
-                json.dump(response.json(), raw_file)
-
-            logging.info(f"Successfully fetched and saved data for {DATE}.")
+            logging.info(f"Successfully fetched and saved data for {DATE} in {latency:.2f}s ({retries} retries).")
+            return file_path
         else:
             logging.error(f"Failed to fetch data for {DATE}. Status code: {response.status_code}")
-            raise Exception(f"Failed to fetch data. Status code: {response.status_code}")
+            raise APIRequestError(
+                f"Failed to fetch data. Status code: {response.status_code}",
+                status_code=response.status_code,
+                retry_after=_parse_retry_after(response.headers.get("Retry-After")),
+            )
     except requests.exceptions.RequestException as e:
         logging.error(f"Error occurred while making the API request: {e}")
         raise
@@ -160,9 +429,87 @@ def init_db_connection(host, database, user, password, port):
 
 
 
+def raw_data_file_path(raw_data_dir, DATE, raw_format=None):
+    """
+    Returns the path of the raw file for a date.
+
+    Args:
+        raw_data_dir (str): Folder holding the raw files.
+        DATE (str): The published date, in the format "YYYY-MM-DD".
+        raw_format (str, optional): Storage format to build the path for. When omitted, the
+            existing file is located whatever its format (uncompressed JSON if none exists).
+
+    Returns:
+        str: The path of the raw file.
+    """
+    if raw_format is not None:
+        extension, _ = RAW_DATA_FORMATS[raw_format]
+        return os.path.join(raw_data_dir, f"{DATE}{extension}")
+
+    for extension, _ in RAW_DATA_FORMATS.values():
+        file_path = os.path.join(raw_data_dir, f"{DATE}{extension}")
+        if os.path.exists(file_path):
+            return file_path
+    return os.path.join(raw_data_dir, f"{DATE}.json")
+
+
+
+def open_raw_file(file_path):
+    """
+    Opens a raw file for reading as text, detecting gzip or zstd compression from its leading bytes.
+
+    Args:
+        file_path (str): The path to the raw file.
+
+    Returns:
+        file object: A text-mode file object yielding the decompressed JSON.
+    """
+    with open(file_path, "rb") as raw_file:
+        magic = raw_file.read(4)
+
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(file_path, "rt")
+    if magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ImportError(f"{file_path} is zstd-compressed but the zstandard package is not installed.")
+        return zstandard.open(file_path, "rt")
+    return open(file_path, "r")
+
+
+
+def write_json_file(data, raw_data_dir, DATE, raw_format=DEFAULT_RAW_DATA_FORMAT):
+    """
+    Writes a raw API response in the given storage format.
+
+    Args:
+        data (dict): The parsed API response.
+        raw_data_dir (str): Folder holding the raw files.
+        DATE (str): The published date, in the format "YYYY-MM-DD".
+        raw_format (str): Storage format, one of `RAW_DATA_FORMATS`.
+
+    Returns:
+        str: The path of the written file.
+    """
+    os.makedirs(raw_data_dir, exist_ok=True)
+
+    file_path = raw_data_file_path(raw_data_dir, DATE, raw_format)
+    _, opener = RAW_DATA_FORMATS[raw_format]
+    with opener(file_path, "wt") as raw_file:
+        json.dump(data, raw_file)
+
+    # Drop copies of the same date stored in another format
+    for other_format in RAW_DATA_FORMATS:
+        other_path = raw_data_file_path(raw_data_dir, DATE, other_format)
+        if other_format != raw_format and os.path.exists(other_path):
+            os.remove(other_path)
+    return file_path
+
+
+
 def read_json_file(file_path):
     """
-    Reads a JSON file and returns the data as a Python object.
+    Reads a JSON file and returns the data as a Python object. Gzip and zstd
+    compressed files are detected and decompressed transparently.
 
     Args:
         file_path (str): The path to the JSON file.
@@ -173,7 +520,7 @@ def read_json_file(file_path):
     logging.info(f"Reading JSON file from {file_path}")
     
     try:
-        with open(file_path, 'r') as file:
+        with open_raw_file(file_path) as file:
             data = json.load(file)  # Parses the JSON data into a Python object (dict or list)
 
         logging.info("Successfully read and parsed the JSON file.")
@@ -181,13 +528,175 @@ def read_json_file(file_path):
     except FileNotFoundError:
         logging.error(f"Error: The file {file_path} was not found.")
         return None
-    except json.JSONDecodeError:
+    except RAW_DATA_DECODE_ERRORS:
         logging.error(f"Error: Failed to decode JSON from {file_path}. The file may be malformed.")
         return None
 
 
 
-def transform_data(data):
+@functools.lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _parse_date_cached(value, fmt):
+    return datetime.strptime(value, fmt).date()
+
+
+
+def parse_date(value, fmt="%Y-%m-%d"):
+    """
+    Parses a date string with `datetime.strptime`, memoizing the result in a bounded
+    LRU cache shared by the transform paths. Values that fail to parse are not cached
+    and raise the same errors as `datetime.strptime`.
+
+    Args:
+        value (str): The date string.
+        fmt (str): The `strptime` format.
+
+    Returns:
+        datetime.date: The parsed date.
+    """
+    if not isinstance(value, str):
+        return datetime.strptime(value, fmt).date()
+    return _parse_date_cached(value, fmt)
+
+
+
+def date_parse_cache_info():
+    """
+    Returns the hit/miss counters and the size of the date parse cache of this process.
+    """
+    info = _parse_date_cached.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+
+
+
+def clear_date_parse_cache():
+    """
+    Empties the date parse cache and resets its counters.
+    """
+    _parse_date_cached.cache_clear()
+
+
+
+def _parse_file_dates(results):
+    """
+    Parses the `FILE_DATE_KEYS` of an overview response once per file.
+
+    Returns:
+        dict: Date per key, or the exception raised while reading or parsing it.
+    """
+    file_dates = {}
+    for key in FILE_DATE_KEYS:
+        try:
+            file_dates[key] = parse_date(results[key])
+        except Exception as e:
+            file_dates[key] = e
+    return file_dates
+
+
+
+def _file_date(file_dates, key):
+    """
+    Returns the parsed file-level date of `key`, raising its parse error again if it failed.
+    """
+    value = file_dates[key]
+    if isinstance(value, Exception):
+        raise value.with_traceback(None)
+    return value
+
+
+
+def _log_transform_summary(published_date, df_lists, df_books, df_buy_links, df_best_sellers, rejected_records,
+                           seconds):
+    """
+    Logs one INFO line per transformed file (or batch of files) with its row counters
+    and timing. The counters are also attached to the log record as
+    `transform_summary` for structured handlers.
+    """
+    summary = {
+        'published_date': published_date,
+        'lists': len(df_lists),
+        'books': len(df_books),
+        'buy_links': len(df_buy_links),
+        'facts': len(df_best_sellers),
+        'rejects': len(rejected_records),
+        'seconds': round(seconds, 4),
+    }
+    logger.info(
+        f"Transformed {summary['published_date']}: {summary['lists']} lists, {summary['books']} books, "
+        f"{summary['buy_links']} buy links, {summary['facts']} facts, {summary['rejects']} rejects "
+        f"in {seconds * 1000:.1f}ms",
+        extra={'transform_summary': summary}
+    )
+    return summary
+
+
+
+def compact_frame(df, table):
+    """
+    Casts the columns of a transformed DataFrame to the compact dtypes of `COMPACT_DTYPES`.
+    A column holding values its compact dtype cannot represent is left as it is.
+
+    Args:
+        df (pd.DataFrame): Rows of `table`.
+        table (str): The stage table, a key of `COMPACT_DTYPES`.
+
+    Returns:
+        pd.DataFrame: The compacted frame.
+    """
+    for column, dtype in COMPACT_DTYPES[table].items():
+        if column not in df.columns:
+            continue
+        try:
+            df[column] = df[column].astype(dtype)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Keeping {table}.{column} as {df[column].dtype}, it cannot be cast to {dtype}: {e}")
+    return df
+
+
+
+def _compact_outputs(*frames):
+    """
+    Applies `compact_frame` to the four DataFrames of a transform, in `STAGE_TABLE_COLUMNS` order.
+    """
+    return tuple(compact_frame(df, table) for df, table in zip(frames, STAGE_TABLE_COLUMNS))
+
+
+
+def concat_frames(frames):
+    """
+    Concatenates DataFrames like `pd.concat(frames, ignore_index=True)`, keeping the
+    categorical columns categorical: their categories are unioned first, where
+    `pd.concat` would fall back to object columns.
+
+    Args:
+        frames (list): DataFrames with the same columns; frames without columns are skipped.
+
+    Returns:
+        pd.DataFrame: The concatenated frame.
+    """
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+    columns = frames[0].columns
+    # `union_categoricals` concatenates the codes itself, so categorical columns skip `pd.concat`
+    categoricals = {}
+    for column, dtype in frames[0].dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        parts = [frame[column] for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            categoricals[column] = union_categoricals(parts, sort_categories=True)
+    df = pd.concat([frame.drop(columns=list(categoricals)) for frame in frames], ignore_index=True)
+    for column, values in categoricals.items():
+        df[column] = values
+    return df[columns]
+
+
+
+def transform_data(data, compact=True):
+    start = time.perf_counter()
+    # Per-record logging is only formatted when DEBUG is enabled
+    log_records = logger.isEnabledFor(logging.DEBUG)
+
     # Init lists to store each table data
     lists_data = []
     books_data = []
@@ -197,6 +706,11 @@ def transform_data(data):
     # Create a list to track rejected records
     rejected_records = []
 
+    # Parse the file-level dates once
+    file_dates = _parse_file_dates(data['results'])
+    # Buy links carry the week they were published in, left null if it cannot be parsed
+    published_date = None if isinstance(file_dates['published_date'], Exception) else file_dates['published_date']
+
     # Stage lists
     for list_entry in data['results']['lists']:
         try:
@@ -205,13 +719,14 @@ def transform_data(data):
                 'list_name': list_entry['list_name'],
                 'list_name_encoded': list_entry['list_name_encoded'],
                 'display_name': list_entry['display_name'],
-                'updated': datetime.strptime(data['results']['bestsellers_date'], "%Y-%m-%d").date(),
+                'updated': _file_date(file_dates, 'bestsellers_date'),
                 'list_image': list_entry.get('list_image', ''),
                 'list_image_width': list_entry.get('list_image_width', None),
                 'list_image_height': list_entry.get('list_image_height', None),
             }
             lists_data.append(list_dict)
-            logger.info(f"Processed list: {list_entry['list_name']}")
+            if log_records:
+                logger.debug(f"Processed list: {list_entry['list_name']}")
         except Exception as e:
             rejected_records.append({
                 'error': str(e),
@@ -232,8 +747,8 @@ def transform_data(data):
                     'contributor': book['contributor'],
                     'contributor_note': book['contributor_note'],
                     'description': book['description'],
-                    'created_date': datetime.strptime(book['created_date'], "%Y-%m-%d %H:%M:%S").date(),
-                    'updated_date': datetime.strptime(book['updated_date'], "%Y-%m-%d %H:%M:%S").date(),
+                    'created_date': parse_date(book['created_date'], "%Y-%m-%d %H:%M:%S"),
+                    'updated_date': parse_date(book['updated_date'], "%Y-%m-%d %H:%M:%S"),
                     'age_group': book['age_group'],
                     'amazon_product_url': book['amazon_product_url'],
                     'primary_isbn13': book['primary_isbn13'],
@@ -245,7 +760,8 @@ def transform_data(data):
                     'sunday_review_link': book['sunday_review_link']
                 }
                 books_data.append(book_dict)
-                logger.info(f"Processed book: {book['title']} (ISBN13: {book['primary_isbn13']})")
+                if log_records:
+                    logger.debug(f"Processed book: {book['title']} (ISBN13: {book['primary_isbn13']})")
 
                 # Stage book_buy_links
                 for buy_link in book['buy_links']:
@@ -253,10 +769,12 @@ def transform_data(data):
                         buy_link_dict = {
                             'book_id': book_id,
                             'website_name': buy_link['name'],
-                            'website_url': buy_link['url']
+                            'website_url': buy_link['url'],
+                            'published_date': published_date,
                         }
                         buy_links_data.append(buy_link_dict)
-                        logger.info(f"Processed buy link for book {book['title']} - {buy_link['name']}")
+                        if log_records:
+                            logger.debug(f"Processed buy link for book {book['title']} - {buy_link['name']}")
                     except Exception as e:
                         rejected_records.append({
                             'error': str(e),
@@ -276,10 +794,10 @@ def transform_data(data):
             # Stage best_sellers_publish
             try:
                 fct_best_seller_dict = {
-                    'bestsellers_date': datetime.strptime(data['results']['bestsellers_date'], "%Y-%m-%d").date(),
-                    'published_date': datetime.strptime(data['results']['published_date'], "%Y-%m-%d").date(),
-                    'previous_published_date': datetime.strptime(data['results']['previous_published_date'], "%Y-%m-%d").date(),
-                    'next_published_date': datetime.strptime(data['results']['next_published_date'], "%Y-%m-%d").date(),
+                    'bestsellers_date': _file_date(file_dates, 'bestsellers_date'),
+                    'published_date': _file_date(file_dates, 'published_date'),
+                    'previous_published_date': _file_date(file_dates, 'previous_published_date'),
+                    'next_published_date': _file_date(file_dates, 'next_published_date'),
                     'list_id': list_entry['list_id'],
                     'book_id': book_id,
                     'rank': book['rank'],
@@ -287,7 +805,8 @@ def transform_data(data):
                     'price': float(book['price'])
                 }
                 fact_best_sellers_data.append(fct_best_seller_dict)
-                logger.info(f"Processed best seller data for book {book['title']}")
+                if log_records:
+                    logger.debug(f"Processed best seller data for book {book['title']}")
             except Exception as e:
                 rejected_records.append({
                     'error': str(e),
@@ -301,42 +820,547 @@ def transform_data(data):
     df_books = pd.DataFrame(books_data)
     df_buy_links = pd.DataFrame(buy_links_data)
     df_best_sellers = pd.DataFrame(fact_best_sellers_data)
+    if compact:
+        df_lists, df_books, df_buy_links, df_best_sellers = _compact_outputs(
+            df_lists, df_books, df_buy_links, df_best_sellers)
+
+    _log_transform_summary(data['results'].get('published_date'), df_lists, df_books, df_buy_links,
+                           df_best_sellers, rejected_records, time.perf_counter() - start)
+    return df_lists, df_books, df_buy_links, df_best_sellers, rejected_records
+
+
 
+def _first_error(parse, value):
+    """
+    Returns the exception `parse(value)` raises, or None if it succeeds.
+    """
+    try:
+        parse(value)
+        return None
+    except Exception as e:
+        return e
+
+
+
+def _validate_columns(frame, records, columns, table, rejected_records, valid=None):
+    """
+    Validation pass of `transform_data_columnar`: rejects the rows missing one of the
+    required `columns` (a KeyError in `transform_data`).
+
+    Only rows holding a null in a required column are inspected one by one, to tell
+    an absent key (rejected) from an explicit null (kept).
+
+    Args:
+        frame (pd.DataFrame): The flattened records, holding every column of `columns`.
+        records (list): The original dicts, reported as the rejected `record`.
+        columns (list): The required keys, in the order `transform_data` reads them.
+        table (str): Table name reported with the rejected records.
+        rejected_records (list): Rejected records are appended to it.
+        valid (np.ndarray, optional): Mask of the rows still valid; other rows are skipped.
+
+    Returns:
+        np.ndarray: Boolean mask of the valid rows.
+    """
+    valid = np.ones(len(frame), dtype=bool) if valid is None else valid.copy()
+    for position in np.flatnonzero(valid & frame[columns].isna().any(axis=1).to_numpy()):
+        missing = next((column for column in columns if column not in records[position]), None)
+        if missing is not None:
+            valid[position] = False
+            rejected_records.append({'error': str(KeyError(missing)), 'record': records[position], 'table': table})
+    return valid
+
+
+
+def _parse_column(values, fmt, valid, records, table, rejected_records):
+    """
+    Vectorized date parsing of `transform_data_columnar`: parses `values` with
+    `pd.to_datetime` and an explicit format. Valid rows it cannot parse are retried
+    with `datetime.strptime` and rejected with the same error message on failure.
+
+    Returns:
+        tuple: The parsed dates as `datetime.date` objects and the updated valid mask.
+    """
+    valid = valid.copy()
+    parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+    for position in np.flatnonzero(valid & parsed.isna().to_numpy()):
+        error = _first_error(lambda value: datetime.strptime(value, fmt), values.iat[position])
+        if error is None:
+            parsed.iat[position] = datetime.strptime(values.iat[position], fmt)
+        else:
+            valid[position] = False
+            rejected_records.append({'error': str(error), 'record': records[position], 'table': table})
+    return parsed.dt.date, valid
+
+
+
+def _frame_from_columns(columns, valid):
+    """
+    Builds a DataFrame from the valid rows of `columns` ({name: pd.Series or list}),
+    letting pandas infer each dtype from the kept values as `pd.DataFrame(list_of_dicts)` does.
+    """
+    if not valid.any():
+        return pd.DataFrame()
+    return pd.DataFrame({
+        name: np.asarray(values, dtype=object)[valid].tolist() for name, values in columns.items()
+    })
+
+
+
+def _transform_payloads(payloads):
+    """
+    Columnar transform of any number of overview responses: the lists of every response
+    are flattened together into one object-dtype frame per level, each row carrying the
+    file-level dates of its own response, so validation, parsing and DataFrame
+    construction run once however many responses there are.
+
+    Args:
+        payloads (iterable): Parsed lists overview responses.
+
+    Returns:
+        tuple: df_lists, df_books, df_buy_links, df_best_sellers, rejected_records.
+    """
+    rejected_records = []
+    lists = []
+    # File-level dates of the response of each list, parsed once per response, and the
+    # first of them that failed to parse
+    list_dates = {key: [] for key in FILE_DATE_KEYS}
+    list_date_errors = []
+    for data in payloads:
+        results = data['results']
+        response_lists = results['lists']
+        parsed_dates = _parse_file_dates(results)
+        file_date_errors = [(key, value) for key, value in parsed_dates.items() if isinstance(value, Exception)]
+        lists.extend(response_lists)
+        for key, value in parsed_dates.items():
+            list_dates[key].extend([None if isinstance(value, Exception) else value] * len(response_lists))
+        list_date_errors.extend([file_date_errors[0] if file_date_errors else None] * len(response_lists))
+
+    # Stage lists
+    lists_frame = pd.DataFrame(lists, dtype=object).reindex(columns=LIST_COLUMNS)
+    valid_lists = _validate_columns(lists_frame, lists, LIST_COLUMNS, 'lists', rejected_records)
+    for position in np.flatnonzero(valid_lists):
+        file_date_error = list_date_errors[position]
+        if file_date_error is not None and file_date_error[0] == 'bestsellers_date':
+            valid_lists[position] = False
+            rejected_records.append({'error': str(file_date_error[1]), 'record': lists[position], 'table': 'lists'})
+    df_lists = _frame_from_columns({
+        'id': lists_frame['list_id'],
+        'list_name': lists_frame['list_name'],
+        'list_name_encoded': lists_frame['list_name_encoded'],
+        'display_name': lists_frame['display_name'],
+        'updated': list_dates['bestsellers_date'],
+        'list_image': [list_entry.get('list_image', '') for list_entry in lists],
+        'list_image_width': [list_entry.get('list_image_width', None) for list_entry in lists],
+        'list_image_height': [list_entry.get('list_image_height', None) for list_entry in lists],
+    }, valid_lists)
+
+    # Flatten books, keeping the position of the list each one appears in
+    books = [book for list_entry in lists for book in list_entry['books']]
+    book_lists = np.repeat(np.arange(len(lists)), [len(list_entry['books']) for list_entry in lists])
+    list_ids = np.asarray([list_entry.get('list_id') for list_entry in lists], dtype=object)[book_lists]
+    has_list_id = np.asarray(['list_id' in list_entry for list_entry in lists], dtype=bool)[book_lists]
+    books_frame = pd.DataFrame(books, dtype=object).reindex(columns=BOOK_COLUMNS + ['rank', 'weeks_on_list', 'price'])
+    book_ids = books_frame['primary_isbn13'].to_numpy(dtype=object)
+
+    # Stage books
+    valid_books = _validate_columns(books_frame, books, BOOK_COLUMNS, 'books', rejected_records)
+    created_date, valid_books = _parse_column(books_frame['created_date'], "%Y-%m-%d %H:%M:%S", valid_books, books, 'books', rejected_records)
+    updated_date, valid_books = _parse_column(books_frame['updated_date'], "%Y-%m-%d %H:%M:%S", valid_books, books, 'books', rejected_records)
+    df_books = _frame_from_columns({
+        'id': book_ids,
+        'title': books_frame['title'],
+        'publisher': books_frame['publisher'],
+        'author': books_frame['author'],
+        'contributor': books_frame['contributor'],
+        'contributor_note': books_frame['contributor_note'],
+        'description': books_frame['description'],
+        'created_date': created_date,
+        'updated_date': updated_date,
+        'age_group': books_frame['age_group'],
+        'amazon_product_url': books_frame['amazon_product_url'],
+        'primary_isbn13': book_ids,
+        'primary_isbn10': books_frame['primary_isbn10'],
+        'book_image_width': books_frame['book_image_width'],
+        'book_image_height': books_frame['book_image_height'],
+        'first_chapter_link': books_frame['first_chapter_link'],
+        'book_uri': books_frame['book_uri'],
+        'sunday_review_link': books_frame['sunday_review_link'],
+    }, valid_books)
+
+    # Stage book_buy_links of the valid books (a staged book without buy_links is also rejected)
+    has_buy_links = valid_books.copy()
+    for position in np.flatnonzero(valid_books):
+        if 'buy_links' not in books[position]:
+            has_buy_links[position] = False
+            rejected_records.append({'error': str(KeyError('buy_links')), 'record': books[position], 'table': 'books'})
+    linked_books = [books[position] for position in np.flatnonzero(has_buy_links)]
+    buy_links = [buy_link for book in linked_books for buy_link in book['buy_links']]
+    buy_links_frame = pd.DataFrame(buy_links, dtype=object).reindex(columns=['name', 'url'])
+    valid_links = _validate_columns(buy_links_frame, buy_links, ['name', 'url'], 'books_buy_links', rejected_records)
+    links_per_book = [len(book['buy_links']) for book in linked_books]
+    book_dates = {key: np.asarray(dates, dtype=object)[book_lists] for key, dates in list_dates.items()}
+    df_buy_links = _frame_from_columns({
+        'book_id': np.repeat(book_ids[has_buy_links], links_per_book),
+        'website_name': buy_links_frame['name'],
+        'website_url': buy_links_frame['url'],
+        'published_date': np.repeat(book_dates['published_date'][has_buy_links], links_per_book),
+    }, valid_links)
+
+    # Stage best_sellers_publish
+    valid_facts = np.ones(len(books), dtype=bool)
+    for position, list_position in enumerate(book_lists):
+        file_date_error = list_date_errors[list_position]
+        if file_date_error is not None:
+            valid_facts[position] = False
+            rejected_records.append({'error': str(file_date_error[1]), 'record': books[position], 'table': 'best_sellers_publish'})
+    for position in np.flatnonzero(valid_facts & ~has_list_id):
+        valid_facts[position] = False
+        rejected_records.append({'error': str(KeyError('list_id')), 'record': books[position], 'table': 'best_sellers_publish'})
+    valid_facts = _validate_columns(books_frame, books, ['primary_isbn13', 'rank', 'weeks_on_list', 'price'],
+                                    'best_sellers_publish', rejected_records, valid=valid_facts)
+    price = pd.to_numeric(books_frame['price'], errors="coerce").astype(float)
+    for position in np.flatnonzero(valid_facts & price.isna().to_numpy()):
+        error = _first_error(float, books_frame['price'].iat[position])
+        if error is None:
+            price.iat[position] = float(books_frame['price'].iat[position])
+        else:
+            valid_facts[position] = False
+            rejected_records.append({'error': str(error), 'record': books[position], 'table': 'best_sellers_publish'})
+    df_best_sellers = _frame_from_columns({
+        'bestsellers_date': book_dates['bestsellers_date'],
+        'published_date': book_dates['published_date'],
+        'previous_published_date': book_dates['previous_published_date'],
+        'next_published_date': book_dates['next_published_date'],
+        'list_id': list_ids,
+        'book_id': book_ids,
+        'rank': books_frame['rank'],
+        'weeks_on_list': books_frame['weeks_on_list'],
+        'price': price,
+    }, valid_facts)
+    return df_lists, df_books, df_buy_links, df_best_sellers, rejected_records
+
+
+
+def transform_data_columnar(data, compact=True):
+    """
+    Columnar alternative to `transform_data`: flattens `results.lists[].books[].buy_links[]`
+    into one object-dtype frame per level, parses dates with `pd.to_datetime` and an
+    explicit format and casts prices with `pd.to_numeric`, instead of building a dict
+    and calling `datetime.strptime` for every row. The file-level dates are parsed
+    once per file.
+
+    The four DataFrames are identical to the ones of `transform_data`. Rows that fail
+    validation are routed into `rejected_records` with the same {error, record, table}
+    shape; unlike `transform_data`, a book without `primary_isbn13` never reuses the
+    previous book's id for its fact row.
+
+    Args:
+        data (dict): A parsed lists overview response.
+        compact (bool): Cast the outputs to the compact dtypes of `COMPACT_DTYPES`.
+
+    Returns:
+        tuple: df_lists, df_books, df_buy_links, df_best_sellers, rejected_records.
+    """
+    start = time.perf_counter()
+    df_lists, df_books, df_buy_links, df_best_sellers, rejected_records = _transform_payloads([data])
+    if compact:
+        df_lists, df_books, df_buy_links, df_best_sellers = _compact_outputs(
+            df_lists, df_books, df_buy_links, df_best_sellers)
+
+    _log_transform_summary(data['results'].get('published_date'), df_lists, df_books, df_buy_links,
+                           df_best_sellers, rejected_records, time.perf_counter() - start)
+    return df_lists, df_books, df_buy_links, df_best_sellers, rejected_records
+
+
+
+def transform_data_batch(payloads, compact=True):
+    """
+    Transforms several overview responses (e.g. the weeks of one load batch) at once with
+    the columnar code path of `transform_data_columnar`: their rows are accumulated in
+    one set of columns and each DataFrame is built once per batch, instead of four small
+    DataFrames per week merged afterwards.
+
+    The rows are those of `merge_transformed` over `transform_data_columnar` of each
+    response, in the same order, and the rejected records of every response are merged
+    into one list.
+
+    Args:
+        payloads (iterable): Parsed lists overview responses.
+        compact (bool): Cast the outputs to the compact dtypes of `COMPACT_DTYPES`.
+
+    Returns:
+        tuple: df_lists, df_books, df_buy_links, df_best_sellers, rejected_records.
+    """
+    start = time.perf_counter()
+    payloads = list(payloads)
+    df_lists, df_books, df_buy_links, df_best_sellers, rejected_records = _transform_payloads(payloads)
+    if compact:
+        df_lists, df_books, df_buy_links, df_best_sellers = _compact_outputs(
+            df_lists, df_books, df_buy_links, df_best_sellers)
+
+    published_dates = [data['results'].get('published_date') for data in payloads]
+    label = f"{len(payloads)} files ({published_dates[0]}..{published_dates[-1]})" if payloads else "0 files"
+    _log_transform_summary(label, df_lists, df_books, df_buy_links, df_best_sellers, rejected_records,
+                           time.perf_counter() - start)
     return df_lists, df_books, df_buy_links, df_best_sellers, rejected_records
 
 
 
-def load_data(conn, cursor, df_lists, df_books, df_buy_links, df_best_sellers):
+def copy_dataframe(cursor, df, table, columns, chunk_rows=100000):
+    """
+    Bulk loads a DataFrame into a table with `COPY ... FROM STDIN`, streaming the rows
+    as CSV through an in-memory buffer instead of building a list of row tuples.
+
+    Missing values are sent as NULL while empty strings stay empty strings, and
+    float columns holding only whole numbers (integer columns with gaps) are sent
+    as integers. Rows are copied in chunks of `chunk_rows` to bound the buffer size.
+
+    Args:
+        cursor: A psycopg2 cursor inside the caller's transaction.
+        df (pd.DataFrame): The rows to load.
+        table (str): The target table, e.g. "stage.books".
+        columns (list): The DataFrame columns to load, in the order of the COPY column list.
+        chunk_rows (int): Maximum number of rows per COPY statement.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    if df.empty:
+        return 0
+
+    frame = df[columns]
+    for column in frame.columns[frame.dtypes == "float64"]:
+        values = frame[column].dropna()
+        if (values == values.round()).all():
+            frame = frame.astype({column: "Int64"})
+
+    copy_sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    for start in range(0, len(frame), chunk_rows):
+        buffer = io.StringIO()
+        frame.iloc[start:start + chunk_rows].to_csv(buffer, header=False, index=False, na_rep="\\N")
+        buffer.seek(0)
+        cursor.copy_expert(copy_sql, buffer)
+    return len(frame)
+
+
+
+def upsert_dataframe(cursor, df, table, columns, keys, chunk_rows=100000, batch_id=None, recency=None):
+    """
+    Idempotently merges a DataFrame into a table on its natural `keys`: the rows are
+    bulk loaded into a temporary table with `copy_dataframe`, deduplicated (the last
+    row of each key wins), then inserted with `ON CONFLICT DO UPDATE`. Rows identical
+    to the stored ones are left untouched, so re-loading a date writes nothing and
+    keeps their `loaded_at` and `batch_id`; inserted and changed rows get new ones.
+
+    With a `recency` column, the newest row of each key wins instead, and a stored row
+    is never replaced by an older one, so re-running a past date or loading a late
+    batch after a newer one leaves the newer values in place.
+
+    Rows with a null key cannot be merged and are skipped with a warning.
+
+    Args:
+        cursor: A psycopg2 cursor inside the caller's transaction.
+        df (pd.DataFrame): The rows to merge.
+        table (str): The target table, e.g. "stage.books", with a unique constraint on `keys`
+            and the `loaded_at` (defaulting to now()) and `batch_id` columns of the stage tables.
+        columns (list): The DataFrame columns to load.
+        keys (list): The natural key columns.
+        chunk_rows (int): Maximum number of rows per COPY statement.
+        batch_id (int, optional): The load batch, see `open_load_batch`.
+        recency (str, optional): Date column ordering the versions of a row, see `STAGE_TABLE_RECENCY`.
+
+    Returns:
+        int: The number of rows merged.
+    """
+    if df.empty:
+        return 0
+
+    null_keys = df[keys].isna().any(axis=1)
+    if null_keys.any():
+        logger.warning(f"Skipping {int(null_keys.sum())} rows of {table} with a null natural key {keys}")
+        df = df[~null_keys]
+
+    temp_table = f"{table.split('.')[-1]}_upsert"
+    cursor.execute(f"CREATE TEMP TABLE {temp_table} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+    cursor.execute(f"ALTER TABLE {temp_table} ADD COLUMN load_order bigserial")
+    copy_dataframe(cursor, df, temp_table, columns, chunk_rows)
+
+    key_list = ', '.join(keys)
+    order = f"{recency} DESC NULLS LAST, load_order DESC" if recency else "load_order DESC"
+    updates = [column for column in columns if column not in keys]
+    if updates:
+        # loaded_at is left to its default, so EXCLUDED.loaded_at is the time of this load
+        on_conflict = f"""DO UPDATE SET {', '.join(f'{column} = EXCLUDED.{column}' for column in updates)},
+                loaded_at = EXCLUDED.loaded_at, batch_id = EXCLUDED.batch_id
+            WHERE ({', '.join(f'target.{column}' for column in updates)})
+                IS DISTINCT FROM ({', '.join(f'EXCLUDED.{column}' for column in updates)})"""
+        if recency:
+            on_conflict += f"""
+                AND (target.{recency} IS NULL OR EXCLUDED.{recency} >= target.{recency})"""
+    else:
+        on_conflict = "DO NOTHING"
+    cursor.execute(f"""
+        INSERT INTO {table} AS target ({', '.join(columns)}, batch_id)
+        SELECT DISTINCT ON ({key_list}) {', '.join(columns)}, %s
+        FROM {temp_table}
+        ORDER BY {key_list}, {order}
+        ON CONFLICT ({key_list}) {on_conflict}
+    """, (batch_id,))
+    logger.info(f"Merged {len(df)} records into {table} ({cursor.rowcount} inserted or changed)")
+    cursor.execute(f"DROP TABLE {temp_table}")
+    return len(df)
+
+
+
+def fact_partition_bounds(published_date):
+    """
+    Returns the yearly partition of the stage fact table holding `published_date`.
+
+    Args:
+        published_date (date): A published date.
+
+    Returns:
+        tuple: (partition name suffix, first date, first date of the next partition).
+    """
+    year = published_date.year
+    return str(year), f"{year}-01-01", f"{year + 1}-01-01"
+
+
+def ensure_fact_partitions(cursor, published_dates, schema="stage"):
+    """
+    Creates the yearly partitions of the stage fact table missing for `published_dates`,
+    so that new weeks can be loaded without a default partition.
+
+    Args:
+        cursor: A psycopg2 cursor inside the caller's transaction.
+        published_dates (iterable): The published dates about to be loaded; nulls are ignored.
+        schema (str): Schema holding the stage tables.
+
+    Returns:
+        list: The partitions created.
+    """
+    created = []
+    parent = f"{schema}.{STAGE_FACT_TABLE}"
+    bounds = {fact_partition_bounds(value) for value in published_dates if value is not None and not pd.isna(value)}
+    for suffix, lower, upper in sorted(bounds):
+        partition = f"{parent}_{suffix}"
+        cursor.execute("SELECT to_regclass(%s)", (partition,))
+        if cursor.fetchone()[0] is not None:
+            continue
+        # Serializes concurrent loads creating the same partition
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (partition,))
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {parent}
+            FOR VALUES FROM ('{lower}') TO ('{upper}')
+        """)
+        logger.info(f"Created partition {partition} for {lower} to {upper}")
+        created.append(partition)
+    return created
+
+
+def open_load_batch(cursor, source, schema="stage"):
+    """
+    Starts a load batch in the audit table. The audit row is written in the caller's
+    transaction, so it is only kept if the batch is committed.
+
+    Args:
+        cursor: A psycopg2 cursor inside the caller's transaction.
+        source (str): What the batch loads, e.g. a raw file path or a range of dates.
+        schema (str): Schema holding the stage tables.
+
+    Returns:
+        int: The batch id, to pass to `stage_dataframes` and `close_load_batch`.
+    """
+    cursor.execute(f"INSERT INTO {schema}.{LOAD_BATCHES_TABLE} (source) VALUES (%s) RETURNING batch_id", (source,))
+    return cursor.fetchone()[0]
+
+
+def close_load_batch(cursor, batch_id, rows, rejected=0, schema="stage"):
+    """
+    Records the outcome of a load batch in the audit table, right before its commit.
+
+    Args:
+        cursor: A psycopg2 cursor inside the caller's transaction.
+        batch_id (int): The batch returned by `open_load_batch`.
+        rows (int): The rows staged by the batch.
+        rejected (int): The records of the batch rejected by the transform.
+        schema (str): Schema holding the stage tables.
+    """
+    cursor.execute(f"""
+        UPDATE {schema}.{LOAD_BATCHES_TABLE}
+        SET finished_at = clock_timestamp(), rows_loaded = %s, rejected_records = %s
+        WHERE batch_id = %s
+    """, (rows, rejected, batch_id))
+    logger.info(f"Closed load batch {batch_id}: {rows} rows, {rejected} rejected records")
+
+
+def stage_dataframes(cursor, df_lists, df_books, df_buy_links, df_best_sellers, method="upsert", schema="stage",
+                     batch_id=None):
+    """
+    Writes the transformed DataFrames into the stage tables without committing, so
+    the caller decides the transaction boundaries. The fact table partitions needed
+    by `df_best_sellers` are created first.
+
+    Args:
+        cursor: A psycopg2 cursor inside the caller's transaction.
+        df_lists, df_books, df_buy_links, df_best_sellers (pd.DataFrame): Outputs of `transform_data`.
+        method (str): "upsert" to merge on the natural keys of `STAGE_TABLE_KEYS` (default, safe
+            to re-run in any order of dates, see `STAGE_TABLE_RECENCY`), "copy" to bulk load with
+            COPY, or "insert" for batched INSERT statements.
+            "copy" and "insert" only suit tables without those keys or rows not loaded yet.
+        schema (str): Schema holding the stage tables.
+        batch_id (int, optional): The load batch recorded on every written row, see `open_load_batch`.
+
+    Returns:
+        int: The total number of rows written.
+    """
+    rows = 0
+    if not df_best_sellers.empty:
+        ensure_fact_partitions(cursor, df_best_sellers[FACT_PARTITION_COLUMN].unique(), schema)
+    frames = [df_lists, df_books, df_buy_links, df_best_sellers]
+    for (table_name, columns), df in zip(STAGE_TABLE_COLUMNS.items(), frames):
+        table = f"{schema}.{table_name}"
+        if method == "upsert":
+            rows += upsert_dataframe(cursor, df, table, columns, STAGE_TABLE_KEYS[table_name], batch_id=batch_id,
+                                     recency=STAGE_TABLE_RECENCY.get(table_name))
+            continue
+        if batch_id is not None:
+            df = df.assign(batch_id=batch_id)
+            columns = columns + ["batch_id"]
+        if method == "copy":
+            copy_dataframe(cursor, df, table, columns)
+        else:
+            execute_batch(cursor, f"""
+                INSERT INTO {table} ({', '.join(columns)})
+                VALUES ({', '.join(['%s'] * len(columns))})
+            """, df.astype(object).where(df.notna(), None).values.tolist())
+        logger.info(f"Inserted {len(df)} records into {table}")
+        rows += len(df)
+    return rows
+
+
+
+def load_data(conn, cursor, df_lists, df_books, df_buy_links, df_best_sellers, method="upsert", schema="stage",
+              source=None):
+    """
+    Loads the transformed DataFrames into the stage tables in a single transaction,
+    recorded as one batch in the load audit table.
+
+    Args:
+        conn: The psycopg2 connection, committed once every table is loaded.
+        cursor: A cursor of `conn`.
+        df_lists, df_books, df_buy_links, df_best_sellers (pd.DataFrame): Outputs of `transform_data`.
+        method (str): "upsert" (default), "copy" or "insert", see `stage_dataframes`.
+        schema (str): Schema holding the stage tables.
+        source (str, optional): What is loaded, recorded in the audit table.
+    """
     # Create a list to track rejected records
     rejected_records = []
     try:
-        # Insert data into DimLists
-        execute_batch(cursor, """
-            INSERT INTO stage.lists (id, list_name, list_name_encoded, display_name, updated, list_image, list_image_width, list_image_height)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, df_lists.values.tolist())
-        logger.info(f"Inserted {len(df_lists)} records into stage.lists")
-
-        # Insert data into DimBooks
-        execute_batch(cursor, """
-            INSERT INTO stage.books (id, title, publisher, author, contributor, contributor_note, description, created_date, updated_date, age_group, amazon_product_url, primary_isbn13, primary_isbn10, book_image_width, book_image_height, first_chapter_link, book_uri, sunday_review_link)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, df_books.values.tolist())
-        logger.info(f"Inserted {len(df_books)} records into stage.books")
-
-        # Insert data into DimBooksBuyLinks
-        execute_batch(cursor, """
-            INSERT INTO stage.books_buy_links (book_id, website_name, website_url)
-            VALUES (%s, %s, %s)
-        """, df_buy_links.values.tolist())
-        logger.info(f"Inserted {len(df_buy_links)} records into stage.books_buy_links")
-
-        # Insert data into best_sellings_lists_books
-        execute_batch(cursor, """
-            INSERT INTO stage.best_sellings_lists_books (bestsellers_date, published_date, previous_published_date, next_published_date, list_id, book_id, rank, weeks_on_list, price)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, df_best_sellers.values.tolist())
-        logger.info(f"Inserted {len(df_best_sellers)} records into stage.best_sellers_puplish")
+        batch_id = open_load_batch(cursor, source, schema)
+        rows = stage_dataframes(cursor, df_lists, df_books, df_buy_links, df_best_sellers, method=method,
+                                schema=schema, batch_id=batch_id)
+        close_load_batch(cursor, batch_id, rows, len(rejected_records), schema)
 
         # Commit the transaction
         conn.commit()
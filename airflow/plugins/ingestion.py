@@ -0,0 +1,400 @@
+# imports
+import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+import pandas as pd
+from psycopg2.pool import ThreadedConnectionPool
+
+from helper_functions import FACT_PARTITION_COLUMN, RAW_DATA_DECODE_ERRORS, close_load_batch, concat_frames, \
+    open_load_batch, raw_data_file_path, read_json_file, stage_dataframes, transform_data, transform_data_batch
+from dimension_registry import DimensionRegistry
+from parquet_export import export_parquet
+from streaming import STREAM_CHUNK_BOOKS, stage_file_streaming
+
+
+logger = logging.getLogger(__name__)
+
+
+def read_and_transform(file_path, transform=transform_data):
+    """
+    Reads and transforms one raw file. Runs in the worker processes of `transform_files`.
+
+    Args:
+        file_path (str): The raw file.
+        transform (callable): `transform_data` or `transform_data_columnar`.
+
+    Returns:
+        tuple or None: The outputs of `transform`, or None if the file is missing or malformed.
+    """
+    data = read_json_file(file_path)
+    if data is None:
+        return None
+    return transform(data)
+
+
+def raw_file_rejected(file_path):
+    """
+    Returns the rejected record of a raw file that is missing or malformed.
+    """
+    return {'error': 'Raw file is missing or malformed', 'record': file_path, 'table': 'raw_data'}
+
+
+def read_and_transform_batch(file_paths):
+    """
+    Reads the raw files of one load batch and transforms them together with
+    `transform_data_batch`. Runs in the worker processes of `transform_file_batches`.
+
+    Args:
+        file_paths (list): The raw files of the batch.
+
+    Returns:
+        tuple: The outputs of `transform_data_batch`, with a rejected record for every
+            missing or malformed file ahead of the others.
+    """
+    payloads = []
+    rejected_records = []
+    for file_path in file_paths:
+        data = read_json_file(file_path)
+        if data is None:
+            rejected_records.append(raw_file_rejected(file_path))
+        else:
+            payloads.append(data)
+    df_lists, df_books, df_buy_links, df_best_sellers, rejected = transform_data_batch(payloads)
+    return df_lists, df_books, df_buy_links, df_best_sellers, rejected_records + rejected
+
+
+def _map_in_order(function, items, workers=1, executor=None):
+    """
+    Yields (item, function(item)) for every item, in the order of `items`, fanning the
+    calls out across a process pool when `workers` > 1 with at most `2 * workers` in flight.
+    """
+    if workers <= 1 and executor is None:
+        for item in items:
+            yield item, function(item)
+        return
+
+    own_executor = executor is None
+    executor = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for item in items:
+            pending.append((item, executor.submit(function, item)))
+            if len(pending) >= 2 * workers:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def transform_files(file_paths, workers=1, executor=None, transform=transform_data):
+    """
+    Reads and transforms raw files, fanning the CPU-bound work out across a process
+    pool when `workers` > 1.
+
+    Results are yielded in the order of `file_paths` whatever the completion order,
+    and at most `2 * workers` files are in flight so memory stays bounded while the
+    caller (the single writer) consumes them.
+
+    Args:
+        file_paths (iterable): Raw files to transform.
+        workers (int): Number of worker processes, 1 to transform in this process.
+        executor (ProcessPoolExecutor, optional): Pool to reuse across calls.
+        transform (callable): Module-level transform function, see `read_and_transform`.
+
+    Yields:
+        tuple: (file_path, outputs of `transform_data` or None).
+    """
+    return _map_in_order(partial(read_and_transform, transform=transform), file_paths, workers, executor)
+
+
+def transform_file_batches(file_path_batches, workers=1, executor=None):
+    """
+    Like `transform_files`, for whole load batches: each list of raw files is read and
+    transformed at once by `read_and_transform_batch`, in a worker process when `workers` > 1.
+
+    Args:
+        file_path_batches (iterable): Lists of raw files, one per load batch.
+        workers (int): Number of worker processes, 1 to transform in this process.
+        executor (ProcessPoolExecutor, optional): Pool to reuse across calls.
+
+    Yields:
+        tuple: (file_paths, outputs of `read_and_transform_batch`).
+    """
+    return _map_in_order(read_and_transform_batch, file_path_batches, workers, executor)
+
+
+def merge_transformed(results):
+    """
+    Concatenates the outputs of several `transform_data` calls, keeping their compact dtypes.
+
+    Args:
+        results (list): Tuples of (df_lists, df_books, df_buy_links, df_best_sellers, rejected_records).
+
+    Returns:
+        tuple: One DataFrame per table and the merged rejected records.
+    """
+    if not results:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), []
+    frames = [concat_frames([result[table] for result in results]) for table in range(4)]
+    rejected_records = [record for result in results for record in result[4]]
+    return (*frames, rejected_records)
+
+
+class IngestionRunner:
+    """
+    Ingests raw overview files into the stage tables using connections taken from a
+    small pool, grouping `batch_size` dates into a single transaction.
+
+    Every connection it opens is returned to the pool and closed by `close()` (or on
+    leaving the `with` block). Connection-acquire and commit times are recorded so
+    the batch size can be tuned.
+
+    Args:
+        host, database, user, password, port: Connection parameters, as for `init_db_connection`.
+        batch_size (int): Number of dates loaded per transaction.
+        min_connections (int): Connections opened upfront by the pool.
+        max_connections (int): Upper bound of open connections.
+        load_method (str): "upsert", "copy" or "insert", see `stage_dataframes`.
+        raw_data_dir (str): Folder holding the raw files.
+        schema (str): Schema holding the stage tables.
+        workers (int): Processes transforming raw files in parallel, 1 to transform serially.
+        transform (callable): `transform_data` or `transform_data_columnar`.
+        parquet_dir (str, optional): Also export each committed week as partitioned Parquet
+            datasets in this folder, see `export_parquet` (not done by `run_streaming`).
+        dedupe_dimensions (bool): Stage each list, book and buy link only when it is new or
+            changed since an earlier batch of the run, see `DimensionRegistry`.
+        transform_batches (bool): Transform the files of a batch together with
+            `transform_data_batch`, building one set of DataFrames per batch rather than one
+            per file (`transform` is then unused). Not supported with `parquet_dir`, which
+            exports each week apart.
+
+    Raises:
+        ValueError: If both `transform_batches` and `parquet_dir` are set.
+    """
+
+    def __init__(self, host, database, user, password, port, batch_size=10, min_connections=1, max_connections=2,
+                 load_method="upsert", raw_data_dir="./raw_data", schema="stage", workers=1,
+                 transform=transform_data, parquet_dir=None, dedupe_dimensions=True, transform_batches=False):
+        if transform_batches and parquet_dir is not None:
+            raise ValueError("Parquet export needs each week transformed apart, it cannot be used with transform_batches.")
+        logger.info(f"Opening a connection pool ({min_connections}-{max_connections}) to {host}:{port}/{database}")
+        self.pool = ThreadedConnectionPool(
+            min_connections, max_connections,
+            host=host, dbname=database, user=user, password=password, port=port,
+        )
+        self.batch_size = batch_size
+        self.load_method = load_method
+        self.raw_data_dir = raw_data_dir
+        self.schema = schema
+        self.workers = workers
+        self.transform = transform
+        self.parquet_dir = parquet_dir
+        self.transform_batches = transform_batches
+        self.registry = DimensionRegistry() if dedupe_dimensions else None
+        self.metrics = {"batches": 0, "dates": 0, "rows": 0, "acquire_seconds": [], "commit_seconds": []}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes every connection of the pool.
+        """
+        if not self.pool.closed:
+            self.pool.closeall()
+            logger.info("Closed the connection pool.")
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection from the pool, recording how long it took to acquire it.
+        """
+        start = time.perf_counter()
+        conn = self.pool.getconn()
+        self.metrics["acquire_seconds"].append(time.perf_counter() - start)
+        try:
+            yield conn
+        finally:
+            self.pool.putconn(conn)
+
+    def run(self, dates):
+        """
+        Ingests the raw files of `dates`, one transaction per `batch_size` dates.
+
+        Files are transformed by `workers` processes (a whole batch per process with
+        `transform_batches`) while this process, the single writer, loads the merged
+        batches in date order.
+
+        Args:
+            dates (list): Dates produced by `generate_incremental_dates`.
+
+        Returns:
+            list: Rejected records of every date, including raw files that could not be read.
+        """
+        rejected_records = []
+        file_paths = [raw_data_file_path(self.raw_data_dir, date) for date in dates]
+        if self.transform_batches:
+            transformed = transform_file_batches(
+                [file_paths[start:start + self.batch_size] for start in range(0, len(dates), self.batch_size)],
+                workers=self.workers,
+            )
+        else:
+            transformed = transform_files(file_paths, workers=self.workers, transform=self.transform)
+        try:
+            for start in range(0, len(dates), self.batch_size):
+                batch_dates = dates[start:start + self.batch_size]
+                if self.transform_batches:
+                    _, result = next(transformed)
+                    rejected_records.extend(self.stage_batch(batch_dates, result))
+                else:
+                    batch = [next(transformed) for _ in batch_dates]
+                    rejected_records.extend(self.ingest_batch(batch_dates, batch))
+        finally:
+            transformed.close()
+        self.log_metrics()
+        return rejected_records
+
+    def run_streaming(self, dates, chunk_books=STREAM_CHUNK_BOOKS):
+        """
+        Ingests the raw files of `dates` one at a time with `stage_file_streaming`, so
+        memory stays bounded by `chunk_books` whatever the size of a file. Each file is
+        loaded in its own transaction.
+
+        Args:
+            dates (list): Dates produced by `generate_incremental_dates`.
+            chunk_books (int): Books transformed and loaded per chunk.
+
+        Returns:
+            list: Rejected records of every date, including raw files that could not be read.
+        """
+        rejected_records = []
+        for date in dates:
+            file_path = raw_data_file_path(self.raw_data_dir, date)
+            with self.connection() as conn:
+                try:
+                    rows, rejected = stage_file_streaming(conn, file_path, chunk_books, method=self.load_method,
+                                                          schema=self.schema, transform=self.transform,
+                                                          registry=self.registry)
+                except (FileNotFoundError, *RAW_DATA_DECODE_ERRORS) as e:
+                    rejected_records.append({'error': str(e), 'record': file_path, 'table': 'raw_data'})
+                    continue
+            rejected_records.extend(rejected)
+            self.metrics["batches"] += 1
+            self.metrics["dates"] += 1
+            self.metrics["rows"] += rows
+        self.log_metrics()
+        return rejected_records
+
+    def ingest_batch(self, dates, transformed):
+        """
+        Merges the transformed files of `dates` and stages them with `stage_batch`, then
+        exports each week to Parquet when `parquet_dir` is set.
+
+        Args:
+            dates (list): The dates of the batch.
+            transformed (list): (file_path, outputs of `transform_data` or None) per date.
+
+        Returns:
+            list: The rejected records of the batch.
+
+        Raises:
+            Exception: Any load error, after rolling the whole batch back.
+        """
+        results = []
+        rejected_records = []
+        for file_path, result in transformed:
+            if result is None:
+                rejected_records.append(raw_file_rejected(file_path))
+            else:
+                results.append(result)
+
+        df_lists, df_books, df_buy_links, df_best_sellers, rejected = merge_transformed(results)
+        rejected_records = self.stage_batch(dates, (df_lists, df_books, df_buy_links, df_best_sellers,
+                                                    rejected_records + rejected))
+
+        if self.parquet_dir is not None:
+            for date, (_, result) in zip(dates, transformed):
+                if result is not None:
+                    self.export_week(date, result)
+        return rejected_records
+
+    def stage_batch(self, dates, result):
+        """
+        Stages the transformed files of `dates`, as one set of DataFrames, in a single
+        transaction recorded as one load batch.
+
+        Args:
+            dates (list): The dates of the batch.
+            result (tuple): df_lists, df_books, df_buy_links, df_best_sellers and the rejected
+                records of the batch, as returned by `transform_data_batch`.
+
+        Returns:
+            list: The rejected records of the batch.
+
+        Raises:
+            Exception: Any load error, after rolling the whole batch back.
+        """
+        df_lists, df_books, df_buy_links, df_best_sellers, rejected_records = result
+        if self.registry is not None:
+            df_lists, df_books, df_buy_links = self.registry.filter(df_lists, df_books, df_buy_links)
+
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    batch_id = open_load_batch(cursor, f"{dates[0]}..{dates[-1]}", self.schema)
+                    rows = stage_dataframes(cursor, df_lists, df_books, df_buy_links, df_best_sellers,
+                                            method=self.load_method, schema=self.schema, batch_id=batch_id)
+                    close_load_batch(cursor, batch_id, rows, len(rejected_records), self.schema)
+
+                start = time.perf_counter()
+                conn.commit()
+                self.metrics["commit_seconds"].append(time.perf_counter() - start)
+            except Exception as e:
+                conn.rollback()
+                if self.registry is not None:
+                    self.registry.rollback()
+                logger.error(f"Error loading dates {dates[0]}..{dates[-1]}, batch rolled back: {e}")
+                raise
+        if self.registry is not None:
+            self.registry.commit()
+
+        self.metrics["batches"] += 1
+        self.metrics["dates"] += len(dates)
+        self.metrics["rows"] += rows
+        logger.info(f"Committed {rows} rows for {len(dates)} dates ({dates[0]}..{dates[-1]}).")
+        return rejected_records
+
+    def export_week(self, date, result):
+        """
+        Appends one transformed week to the Parquet datasets of `parquet_dir`, in the
+        partition of the week's published date (the requested date when no fact was kept).
+        """
+        df_best_sellers = result[3]
+        if len(df_best_sellers):
+            published_date = df_best_sellers[FACT_PARTITION_COLUMN].iloc[0]
+        else:
+            published_date = pd.Timestamp(date).date()
+        export_parquet(self.parquet_dir, published_date, *result[:4])
+
+    def log_metrics(self):
+        acquire_seconds = self.metrics["acquire_seconds"]
+        commit_seconds = self.metrics["commit_seconds"]
+        logger.info(
+            f"Ingested {self.metrics['rows']} rows for {self.metrics['dates']} dates in {self.metrics['batches']} batches "
+            f"of up to {self.batch_size} dates; connection acquire total {sum(acquire_seconds):.3f}s "
+            f"(max {max(acquire_seconds, default=0):.3f}s), commit total {sum(commit_seconds):.3f}s "
+            f"(max {max(commit_seconds, default=0):.3f}s)."
+        )
+        if self.registry is not None:
+            self.registry.log_stats()
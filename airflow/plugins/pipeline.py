@@ -0,0 +1,456 @@
+# imports
+import logging
+import queue
+import threading
+import time
+
+from concurrent_fetcher import build_fetch_client, build_nyt_rate_limiter, fetch_date
+from helper_functions import DEFAULT_RAW_DATA_FORMAT, NYT_OVERVIEW_ENDPOINT, raw_data_file_path, read_json_file, \
+    transform_data, transform_data_batch
+from ingestion import raw_file_rejected, read_and_transform, read_and_transform_batch
+
+
+logger = logging.getLogger(__name__)
+
+# Items buffered between two stages
+DEFAULT_QUEUE_SIZE = 8
+# Seconds between checks for a stopped pipeline while blocked on a queue
+POLL_SECONDS = 0.1
+
+# Marks the end of the items flowing into a stage
+_END = object()
+# Stands in for an item dropped by a stage (failed or without output), so that the
+# ordered stages after it do not wait for that item
+_SKIP = object()
+
+
+class Stage:
+    """
+    One step of a `Pipeline`: `workers` threads apply `function` to the items of the
+    stage's input queue and put its outputs on the next stage's queue. Outputs that
+    are None are dropped.
+
+    Batches are formed in one place ahead of the workers, so each batch goes to a single
+    worker whole. An `ordered` stage gets its items in the order of the pipeline input,
+    whatever the workers upstream finished first: its batches hold consecutive items,
+    which a stage with a single worker processes in that order. While it waits for a
+    late item it holds back at most `queue_size` later ones, and the source waits too.
+
+    Args:
+        name (str): Name used in logs and stats.
+        function (callable): Maps one item, or a list of up to `batch_size` items, to one output.
+        workers (int): Threads running `function`.
+        batch_size (int, optional): Hands `function` lists of up to `batch_size` items.
+        ordered (bool): Restores the input order of the items before handing them out.
+    """
+
+    def __init__(self, name, function, workers=1, batch_size=None, ordered=False):
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.batch_size = batch_size
+        self.ordered = ordered
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.max_depth = 0
+
+    def sample_depth(self, depth):
+        with self.lock:
+            self.depth_samples += 1
+            self.depth_total += depth
+            self.max_depth = max(self.max_depth, depth)
+
+    def stats(self, seconds):
+        """
+        Returns the stage counters for a run that lasted `seconds`.
+        """
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "items_per_second": self.processed / seconds if seconds else 0.0,
+            "busy_seconds": self.busy_seconds,
+            "utilization": self.busy_seconds / (seconds * self.workers) if seconds else 0.0,
+            "mean_queue_depth": self.depth_total / self.depth_samples if self.depth_samples else 0.0,
+            "max_queue_depth": self.max_depth,
+        }
+
+
+class Pipeline:
+    """
+    Runs `stages` concurrently, each in its own threads, connected by bounded queues.
+    A full queue blocks the stage feeding it, so a slow stage holds back everything
+    upstream of it (down to the source iterable) instead of letting items pile up in
+    memory, while network, CPU and database work of different items overlap.
+
+    Items are not kept in order once a stage has more than one worker, unless a later
+    stage is `ordered`. An item whose function raises is logged and dropped; the run
+    raises once every other item is done.
+
+    Args:
+        stages (list[Stage]): The stages, in order.
+        queue_size (int): Items buffered in front of each stage.
+    """
+
+    def __init__(self, stages, queue_size=DEFAULT_QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.errors = []
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+
+    def run(self, items):
+        """
+        Pushes `items` through the stages, yielding the outputs of the last stage as
+        they arrive. `items` is consumed lazily, only as fast as the first queue drains.
+
+        Args:
+            items (iterable): The inputs of the first stage.
+
+        Yields:
+            The outputs of the last stage.
+
+        Raises:
+            Exception: If any item failed in any stage, after all other items went through.
+        """
+        for stage in self.stages:
+            stage.reset()
+        self.errors = []
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        windows, admits = self._reorder_windows()
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0], admits[None], stop), daemon=True)]
+        for index, stage in enumerate(self.stages):
+            inbox = queues[index]
+            if self._gated(stage):
+                inbox = queue.Queue(maxsize=self.queue_size)
+                threads.append(threading.Thread(target=self._gate, args=(stage, queues[index], inbox, windows[index],
+                                                                         admits[index], stop), daemon=True))
+            end_markers = self._readers(self.stages[index + 1]) if index + 1 < len(self.stages) else 1
+            running = [stage.workers]
+            threads.extend(
+                threading.Thread(target=self._work, args=(stage, inbox, queues[index + 1], running,
+                                                          end_markers, stop), daemon=True)
+                for _ in range(stage.workers)
+            )
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                entry = self._get(queues[-1], stop)
+                if entry is _END:
+                    break
+                _, output = entry
+                if output is not _SKIP:
+                    yield output
+        finally:
+            # Also stops the threads when the caller abandons the generator early
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self.seconds = time.perf_counter() - start
+            self.log_stats()
+
+        if self.errors:
+            summary = "; ".join(f"{stage}: {error}" for stage, _, error in self.errors[:5])
+            raise Exception(f"{len(self.errors)} items failed in the pipeline: {summary}")
+
+    @staticmethod
+    def _gated(stage):
+        return bool(stage.batch_size) or stage.ordered
+
+    def _readers(self, stage):
+        # Threads taking items off the queue in front of `stage`, one end marker each
+        return 1 if self._gated(stage) else stage.workers
+
+    def _reorder_windows(self):
+        """
+        Bounds the items an ordered stage holds back while waiting for an earlier one:
+        each item takes a slot of the stage's window (`queue_size` slots) where its
+        position is given (the input, or the batched stage numbering the batches it is
+        part of) and frees it once handed out in order, so a slow item holds back the
+        source instead of letting the later ones pile up in the stage.
+
+        Returns:
+            tuple: The window of each stage (None unless ordered), and the windows each
+                position giver (None for the input, else a stage index) takes slots of.
+        """
+        windows = [None] * len(self.stages)
+        admits = {None: [], **{index: [] for index in range(len(self.stages))}}
+        numbered_by = None
+        for index, stage in enumerate(self.stages):
+            if stage.ordered:
+                windows[index] = threading.Semaphore(self.queue_size)
+                admits[numbered_by].append(windows[index])
+            if stage.batch_size:
+                numbered_by = index
+        return windows, admits
+
+    @staticmethod
+    def _admit(windows, stop):
+        for window in windows:
+            while not window.acquire(timeout=POLL_SECONDS):
+                if stop.is_set():
+                    return False
+        return True
+
+    def _feed(self, items, inbox, admits, stop):
+        # Items travel as (position, item), the position in the input or batch number
+        try:
+            for position, item in enumerate(items):
+                if not self._admit(admits, stop) or not self._put(inbox, (position, item), stop):
+                    return
+        except Exception as e:
+            logger.error(f"Error reading the pipeline input: {e}")
+            with self.lock:
+                self.errors.append(("input", None, e))
+        for _ in range(self._readers(self.stages[0])):
+            self._put(inbox, _END, stop)
+
+    def _gate(self, stage, inbox, outbox, window, admits, stop):
+        """
+        Hands the items of a batched or ordered stage to its workers: puts them back in
+        input order first when the stage is ordered, then groups them into numbered batches.
+        """
+        pending = {}
+        next_position = 0
+        batch = []
+        batches = 0
+        while True:
+            entry = self._get(inbox, stop)
+            if entry is _END:
+                break
+            if stage.ordered:
+                # Items finished out of order wait here until every earlier one arrived
+                position, item = entry
+                pending[position] = item
+                ready = []
+                while next_position in pending:
+                    ready.append((next_position, pending.pop(next_position)))
+                    next_position += 1
+                    window.release()
+            else:
+                ready = [entry]
+            for position, item in ready:
+                if not stage.batch_size:
+                    if not self._put(outbox, (position, item), stop):
+                        return
+                    continue
+                if item is _SKIP:
+                    continue
+                batch.append(item)
+                if len(batch) == stage.batch_size:
+                    if not self._admit(admits, stop) or not self._put(outbox, (batches, batch), stop):
+                        return
+                    batches, batch = batches + 1, []
+        if batch and not (self._admit(admits, stop) and self._put(outbox, (batches, batch), stop)):
+            return
+        for _ in range(stage.workers):
+            self._put(outbox, _END, stop)
+
+    def _work(self, stage, inbox, outbox, running, end_markers, stop):
+        while True:
+            stage.sample_depth(inbox.qsize())
+            entry = self._get(inbox, stop)
+            if entry is _END:
+                break
+            position, item = entry
+
+            output = None
+            if item is not _SKIP:
+                start = time.perf_counter()
+                try:
+                    output = stage.function(item)
+                except Exception as e:
+                    logger.error(f"Stage {stage.name} failed: {e}")
+                    with stage.lock:
+                        stage.failed += 1
+                    with self.lock:
+                        self.errors.append((stage.name, item, e))
+                else:
+                    with stage.lock:
+                        stage.processed += len(item) if stage.batch_size else 1
+                finally:
+                    with stage.lock:
+                        stage.busy_seconds += time.perf_counter() - start
+            if not self._put(outbox, (position, _SKIP if output is None else output), stop):
+                return
+
+        # The last worker of a stage to finish tells the next stage it is done
+        with stage.lock:
+            running[0] -= 1
+            last = running[0] == 0
+        if last:
+            for _ in range(end_markers):
+                self._put(outbox, _END, stop)
+
+    @staticmethod
+    def _get(inbox, stop):
+        while True:
+            try:
+                return inbox.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                if stop.is_set():
+                    return _END
+
+    @staticmethod
+    def _put(outbox, item, stop):
+        while not stop.is_set():
+            try:
+                outbox.put(item, timeout=POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def stats(self):
+        """
+        Returns the counters of every stage for the last run, keyed by stage name.
+        """
+        return {stage.name: stage.stats(self.seconds) for stage in self.stages}
+
+    def log_stats(self):
+        for name, stats in self.stats().items():
+            logger.info(
+                f"Stage {name}: {stats['processed']} items ({stats['failed']} failed) at "
+                f"{stats['items_per_second']:.1f}/s, {stats['utilization']:.0%} busy, queue depth "
+                f"mean {stats['mean_queue_depth']:.1f} max {stats['max_queue_depth']}."
+            )
+
+
+def build_etl_pipeline(runner, NYT_BOOKS_API_KEY=None, fetch_workers=4, transform_workers=1, transform_executor=None,
+                       queue_size=DEFAULT_QUEUE_SIZE, rate_limiter=None, client=None, manifest=None,
+                       endpoint=NYT_OVERVIEW_ENDPOINT, raw_format=DEFAULT_RAW_DATA_FORMAT, transform=transform_data):
+    """
+    Builds the fetch -> decode -> transform -> load pipeline of the lists overview ETL.
+    Its items are dates and its outputs the rejected records of each loaded batch.
+
+    Without an API key, the first stage only locates the raw files already in
+    `runner.raw_data_dir`. Batches of `runner.batch_size` consecutive dates are loaded in
+    one transaction each with `IngestionRunner.ingest_batch`, in date order whatever the
+    fetch and transform workers finish first; with `runner.transform_batches`, each batch
+    is formed before the transform workers, transformed at once by `transform_data_batch`
+    and loaded with `IngestionRunner.stage_batch` instead.
+
+    Args:
+        runner (IngestionRunner): Provides the connection pool, raw data folder and batch size.
+        NYT_BOOKS_API_KEY (str, optional): Fetch each date from the API before loading it.
+        fetch_workers (int): Requests kept in flight, paced by `rate_limiter`.
+        transform_workers (int): Threads transforming files.
+        transform_executor (ProcessPoolExecutor, optional): Decode and transform each file in
+            this pool instead, with `transform_workers` files in flight, to use several CPUs.
+        queue_size (int): Items buffered in front of each stage.
+        rate_limiter (RateLimiter, optional): Defaults to the NYT per-minute and per-day quotas.
+        client (NYTBooksAPIClient, optional): Defaults to a client pooling `fetch_workers` connections.
+        manifest (RawDataManifest, optional): Dates fresh in the manifest are not fetched again.
+        endpoint (str): The lists overview endpoint to call.
+        raw_format (str): Storage format of fetched files, one of `RAW_DATA_FORMATS`.
+        transform (callable): `transform_data` or `transform_data_columnar`, unused with
+            `runner.transform_batches`.
+
+    Returns:
+        Pipeline: The pipeline, to be run on a list of dates.
+    """
+    raw_data_dir = runner.raw_data_dir
+
+    def locate(date):
+        return date, raw_data_file_path(raw_data_dir, date)
+
+    if NYT_BOOKS_API_KEY is not None:
+        rate_limiter = rate_limiter or build_nyt_rate_limiter()
+        client = client or build_fetch_client(fetch_workers)
+
+        def fetch(date):
+            if manifest is not None and not manifest.needs_fetch(date):
+                return locate(date)
+            return date, fetch_date(NYT_BOOKS_API_KEY, date, rate_limiter, client, endpoint=endpoint,
+                                    raw_data_dir=raw_data_dir, manifest=manifest, raw_format=raw_format)
+
+        first_stage = Stage("fetch", fetch, workers=fetch_workers)
+    else:
+        first_stage = Stage("locate", locate)
+
+    def decode(item):
+        date, file_path = item
+        return date, file_path, read_json_file(file_path)
+
+    def transform_item(item):
+        date, file_path, data = item
+        # A missing or malformed file is rejected by the load stage
+        return date, file_path, None if data is None else transform(data)
+
+    def transform_file(item):
+        date, file_path = item
+        return date, file_path, transform_executor.submit(read_and_transform, file_path, transform).result()
+
+    def load(batch):
+        return runner.ingest_batch([date for date, _, _ in batch], [(file_path, result) for _, file_path, result in batch])
+
+    def transform_batch(batch):
+        rejected_records = [raw_file_rejected(file_path) for _, file_path, data in batch if data is None]
+        df_lists, df_books, df_buy_links, df_best_sellers, rejected = transform_data_batch(
+            [data for _, _, data in batch if data is not None])
+        return [date for date, _, _ in batch], (df_lists, df_books, df_buy_links, df_best_sellers,
+                                                 rejected_records + rejected)
+
+    def transform_file_batch(batch):
+        file_paths = [file_path for _, file_path in batch]
+        return [date for date, _ in batch], transform_executor.submit(read_and_transform_batch, file_paths).result()
+
+    def stage(item):
+        dates, result = item
+        return runner.stage_batch(dates, result)
+
+    if runner.transform_batches:
+        # Batches are formed ahead of the transform, which hands the load one set of DataFrames per batch
+        if transform_executor is None:
+            transform_stages = [Stage("decode", decode), Stage("transform", transform_batch, workers=transform_workers,
+                                                               batch_size=runner.batch_size, ordered=True)]
+        else:
+            transform_stages = [Stage("transform", transform_file_batch, workers=transform_workers,
+                                      batch_size=runner.batch_size, ordered=True)]
+        load_stage = Stage("load", stage, ordered=True)
+    else:
+        if transform_executor is None:
+            transform_stages = [Stage("decode", decode), Stage("transform", transform_item, workers=transform_workers)]
+        else:
+            transform_stages = [Stage("transform", transform_file, workers=transform_workers)]
+        load_stage = Stage("load", load, batch_size=runner.batch_size, ordered=True)
+    return Pipeline([
+        first_stage,
+        *transform_stages,
+        load_stage,
+    ], queue_size=queue_size)
+
+
+def run_etl_pipeline(runner, dates, manifest=None, **kwargs):
+    """
+    Runs `build_etl_pipeline` over `dates`, saving the manifest (when given) once done.
+
+    Args:
+        runner (IngestionRunner): Provides the connection pool, raw data folder and batch size.
+        dates (list): Dates produced by `generate_incremental_dates`.
+        manifest (RawDataManifest, optional): See `build_etl_pipeline`.
+        **kwargs: Passed to `build_etl_pipeline`.
+
+    Returns:
+        list: The rejected records of every loaded batch.
+
+    Raises:
+        Exception: If any date failed to fetch or load, after every other date went through.
+    """
+    pipeline = build_etl_pipeline(runner, manifest=manifest, **kwargs)
+    try:
+        return [record for rejected_records in pipeline.run(dates) for record in rejected_records]
+    finally:
+        if manifest is not None:
+            manifest.save()
+        runner.log_metrics()
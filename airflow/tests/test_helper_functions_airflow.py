@@ -28,7 +28,7 @@ def test_generate_incremental_dates_no_dates():
 
 
 # Test fetch_data_from_api function
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_fetch_data_from_api_success(mock_get):
     # get API credientials
     NYT_BOOKS_API_KEY, NYT_BOOKS_API_SECRET, NYT_BOOKS_API_ENDPOINT = parse_configs('./config/config.json')
@@ -46,9 +46,10 @@ def test_fetch_data_from_api_success(mock_get):
     # Call the actual function
     fetch_data_from_api(NYT_BOOKS_API_KEY, DATE)
 
-    # Check that requests.get was called with the expected URL
+    # Check that the pooled session was called with the expected URL and timeouts
     mock_get.assert_called_once_with(
-        f"https://api.nytimes.com/svc/books/v3/lists/overview.json?published_date={DATE}&api-key={NYT_BOOKS_API_KEY}"
+        f"https://api.nytimes.com/svc/books/v3/lists/overview.json?published_date={DATE}&api-key={NYT_BOOKS_API_KEY}",
+        timeout=(5, 30)
     )
 
 def test_fetch_data_from_api_failure():
@@ -0,0 +1,60 @@
+"""
+Compares transforming the weeks of a load batch one by one with `transform_data_columnar`
+and merging them with `merge_transformed`, against transforming them at once with
+`transform_data_batch`, for growing batch sizes, checking both return identical frames.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_batch_transform --batch-size 1 5 20 52 --repeat 3
+"""
+# imports
+import argparse
+import logging
+import time
+
+import pandas as pd
+
+from src.utils.helper_functions import transform_data_batch, transform_data_columnar
+from src.utils.ingestion import merge_transformed
+from benchmarks.synthetic_data import generate_overview_payload, generate_weekly_dates
+
+
+def per_week(payloads):
+    return merge_transformed([transform_data_columnar(data) for data in payloads])
+
+
+def best_of(function, payloads, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(payloads)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 5, 20, 52])
+    parser.add_argument("--lists", type=int, default=12)
+    parser.add_argument("--books-per-list", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement
+    logging.disable(logging.INFO)
+
+    print(f"{'weeks':>8}{'facts':>9}{'per week (ms)':>15}{'batch (ms)':>12}{'speedup':>10}")
+    for batch_size in args.batch_size:
+        payloads = [generate_overview_payload(published_date, num_lists=args.lists, books_per_list=args.books_per_list)
+                    for published_date in generate_weekly_dates("2023-01-01", batch_size)]
+        expected, actual = per_week(payloads), transform_data_batch(payloads)
+        for expected_frame, actual_frame in zip(expected[:4], actual[:4]):
+            pd.testing.assert_frame_equal(actual_frame, expected_frame)
+
+        per_week_seconds = best_of(per_week, payloads, args.repeat)
+        batch_seconds = best_of(transform_data_batch, payloads, args.repeat)
+        print(f"{batch_size:>8}{len(actual[3]):>9}{per_week_seconds * 1000:>15.1f}{batch_seconds * 1000:>12.1f}"
+              f"{per_week_seconds / batch_seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
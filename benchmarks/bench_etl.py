@@ -0,0 +1,292 @@
+"""
+Times the ETL hot paths end to end on synthetic raw files (`benchmarks/synthetic_data.py`):
+`read_json_file`, the transforms, `load_data` with each load method and
+`write_rejected_records_to_file`, and stores the results as JSON so that runs can be
+compared. With `--baseline`, every step is compared with an earlier results file by
+rows per second, and the run fails if one got slower than `--tolerance`.
+
+`load_data` runs against an in-process stand-in of the database connection by default:
+it consumes the COPY streams and statements without executing them, so only the
+client-side cost (serializing the frames) is measured. Pass `--postgres` to load into
+a scratch schema (default `bench_stage`) of a real database instead, dropped afterwards.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_etl --weeks 52 --lists 12 --books-per-list 15
+    python -m benchmarks.bench_etl --baseline benchmarks/results/bench_etl-20231231T120000.json
+    python -m benchmarks.bench_etl --postgres --port 5431   # against the docker-compose Postgres
+"""
+# imports
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from src.utils.helper_functions import DEFAULT_RAW_DATA_FORMAT, RAW_DATA_FORMATS, STAGE_TABLE_COLUMNS, \
+    STAGE_TABLE_KEYS, init_db_connection, load_data, read_json_file, transform_data, transform_data_batch, \
+    transform_data_columnar, write_rejected_records_to_file
+from src.utils.ingestion import merge_transformed
+from benchmarks.bench_load_data import create_schema
+from benchmarks.synthetic_data import write_raw_data_files
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+LOAD_METHODS = ["upsert", "copy", "insert"]
+
+
+class InProcessCursor:
+    """
+    Stands in for a psycopg2 cursor in `load_data`: statements are recorded, COPY
+    streams read to the end and parameters rendered as text, without a database.
+    Every query returns a single row holding 1.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.copied_bytes = 0
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.statements += 1
+
+    def fetchone(self):
+        return (1,)
+
+    def copy_expert(self, sql, file):
+        self.statements += 1
+        self.copied_bytes += len(file.read())
+
+    def mogrify(self, sql, params=None):
+        # Used by `execute_batch`, which joins the rendered statements
+        return (sql % tuple(repr(param) for param in params)).encode() if params else sql.encode()
+
+    def close(self):
+        pass
+
+
+class InProcessConnection:
+    """
+    Stands in for a psycopg2 connection, counting commits and rollbacks.
+    """
+
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return InProcessCursor()
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+def time_runs(function, repeat, rows, before=None):
+    """
+    Runs `function` `repeat` times, calling `before` untimed ahead of each run.
+
+    Returns:
+        dict: Best and mean duration in seconds, and rows per second of the best run.
+    """
+    timings = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "seconds": best,
+        "mean_seconds": sum(timings) / len(timings),
+        "runs": len(timings),
+        "rows": rows,
+        "rows_per_second": rows / best if best else None,
+    }
+
+
+def unique_keys(frames):
+    """
+    Keeps the last row of each natural key, so the rows of several weeks can be
+    copied or inserted into the keyed stage tables in one load.
+    """
+    return [df.drop_duplicates(STAGE_TABLE_KEYS[table], keep="last") if len(df) else df
+            for table, df in zip(STAGE_TABLE_COLUMNS, frames)]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args, work_dir):
+    """
+    Writes the synthetic raw files into `work_dir` and times every step on them.
+
+    Returns:
+        dict: Results per step, keyed by step name.
+    """
+    file_paths = write_raw_data_files(work_dir, args.start_date, num_weeks=args.weeks, raw_format=args.raw_format,
+                                      num_lists=args.lists, books_per_list=args.books_per_list,
+                                      buy_links_per_book=args.buy_links_per_book, invalid_rate=args.invalid_rate)
+    results = {}
+
+    # Throughputs are in books for reading and transforming, staged rows for loading
+    payloads = [read_json_file(file_path) for file_path in file_paths]
+    books = sum(len(list_entry["books"]) for data in payloads for list_entry in data["results"]["lists"])
+    results["read_json_file"] = time_runs(lambda: [read_json_file(file_path) for file_path in file_paths],
+                                          args.repeat, rows=books)
+    results["read_json_file"]["raw_bytes"] = sum(os.path.getsize(file_path) for file_path in file_paths)
+
+    for transform in (transform_data, transform_data_columnar):
+        results[transform.__name__] = time_runs(lambda: [transform(data) for data in payloads], args.repeat,
+                                                rows=books)
+    results["transform_data_batch"] = time_runs(lambda: transform_data_batch(payloads), args.repeat, rows=books)
+
+    df_lists, df_books, df_buy_links, df_best_sellers, rejected_records = merge_transformed(
+        [transform_data(data) for data in payloads])
+    frames = unique_keys([df_lists, df_books, df_buy_links, df_best_sellers])
+    staged_rows = sum(len(df) for df in frames)
+    for method in args.load_methods:
+        if args.postgres:
+            conn, cursor = init_db_connection(args.host, args.dbname, args.user, args.password, args.port)
+            schema = args.schema
+
+            def reset():
+                create_schema(conn, cursor, schema)
+        else:
+            conn = InProcessConnection()
+            cursor = conn.cursor()
+            schema = "stage"
+            reset = None
+        try:
+            results[f"load_data.{method}"] = time_runs(
+                lambda: load_data(conn, cursor, *frames, method=method, schema=schema, source="bench_etl"),
+                args.repeat, rows=staged_rows, before=reset)
+            # load_data logs and rolls back failed loads instead of raising
+            if args.postgres:
+                cursor.execute(f"SELECT COUNT(*) FROM {schema}.best_sellings_lists_books")
+                loaded = cursor.fetchone()[0] == len(frames[3])
+            else:
+                loaded = conn.rollbacks == 0
+            if not loaded:
+                sys.exit(f"load_data with method {method} failed, see the logs.")
+        finally:
+            if args.postgres:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+                conn.commit()
+            cursor.close()
+            conn.close()
+
+    rejected_path = os.path.join(work_dir, "rejected_records.csv")
+
+    def remove_rejected_file():
+        if os.path.exists(rejected_path):
+            os.remove(rejected_path)
+
+    results["write_rejected_records_to_file"] = time_runs(
+        lambda: write_rejected_records_to_file(rejected_records, rejected_path), args.repeat,
+        rows=len(rejected_records), before=remove_rejected_file)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares the rows per second of every step with `baseline`.
+
+    Returns:
+        list: The steps more than `tolerance` slower than in the baseline.
+    """
+    regressions = []
+    print(f"\nCompared with {baseline['created_at']} ({baseline.get('git_commit') or 'unknown commit'})")
+    if baseline["config"] != results["config"]:
+        print("The two runs used different settings, throughputs may not be comparable.")
+    print(f"{'step':<34}{'rows/s':>14}{'baseline':>14}{'change':>9}")
+    for step, result in results["results"].items():
+        previous = baseline["results"].get(step)
+        if not previous or not previous["rows_per_second"] or not result["rows_per_second"]:
+            continue
+        change = result["rows_per_second"] / previous["rows_per_second"] - 1
+        flag = "  REGRESSION" if change < -tolerance else ""
+        if flag:
+            regressions.append(step)
+        print(f"{step:<34}{result['rows_per_second']:>14.0f}{previous['rows_per_second']:>14.0f}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--lists", type=int, default=12)
+    parser.add_argument("--books-per-list", type=int, default=15)
+    parser.add_argument("--buy-links-per-book", type=int, default=6)
+    parser.add_argument("--invalid-rate", type=float, default=0.01)
+    parser.add_argument("--start-date", default="2023-01-01")
+    parser.add_argument("--raw-format", choices=RAW_DATA_FORMATS, default=DEFAULT_RAW_DATA_FORMAT)
+    parser.add_argument("--load-methods", nargs="+", choices=LOAD_METHODS, default=LOAD_METHODS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Results file, by default a new timestamped file in benchmarks/results/")
+    parser.add_argument("--baseline", help="Earlier results file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Slowdown in rows per second reported as a regression (default 20%%)")
+    parser.add_argument("--postgres", action="store_true", help="Load into a real database instead of the stand-in")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="5431")
+    parser.add_argument("--dbname", default="mydb")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--schema", default="bench_stage")
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement, including the rejected records logged at ERROR
+    logging.disable(logging.ERROR)
+
+    created_at = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as work_dir:
+        step_results = run_benchmarks(args, work_dir)
+    results = {
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "database": f"postgres {args.host}:{args.port}/{args.dbname}" if args.postgres else "in-process stand-in",
+        "config": {key: getattr(args, key) for key in ("weeks", "lists", "books_per_list", "buy_links_per_book",
+                                                       "invalid_rate", "raw_format", "repeat")},
+        "results": step_results,
+    }
+
+    print(f"{'step':<34}{'rows':>10}{'best s':>10}{'mean s':>10}{'rows/s':>14}")
+    for step, result in step_results.items():
+        print(f"{step:<34}{result['rows']:>10}{result['seconds']:>10.3f}{result['mean_seconds']:>10.3f}"
+              f"{result['rows_per_second'] or 0:>14.0f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_etl-{created_at:%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        if regressions:
+            sys.exit(f"Slower than the baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compares the stage loading paths of `load_data`: batched INSERTs (execute_batch),
+COPY ... FROM STDIN and the idempotent upsert (COPY into a temp table, then merge on
+the natural keys), at 10k/100k/1M rows per table. "upsert-rerun" loads the same rows
+a second time on top of the first upsert, the cost of re-running a date.
+
+The tables are created in a scratch schema (default `bench_stage`) from
+sql/create_stage_layer.sql and dropped afterwards.
+
+Usage (from the repository root, against the docker-compose Postgres):
+    python -m benchmarks.bench_load_data --rows 10000 100000 1000000
+"""
+# imports
+import argparse
+import logging
+import os
+import time
+
+import pandas as pd
+
+from src.utils.helper_functions import init_db_connection, load_data, STAGE_TABLE_KEYS, transform_data
+from benchmarks.synthetic_data import generate_overview_payload
+
+
+STAGE_DDL_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "sql", "create_stage_layer.sql")
+
+
+def tile_frame(df, rows, book_id_columns):
+    """
+    Repeats a DataFrame until it holds `rows` rows, suffixing the book ids of each
+    repeat so the natural keys stay unique.
+    """
+    repeats = -(-rows // len(df))
+    copies = []
+    for repeat in range(repeats):
+        copy = df.copy()
+        for column in book_id_columns:
+            copy[column] = copy[column] + f"-{repeat}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True).iloc[:rows]
+
+
+def build_frames(rows):
+    df_lists, df_books, df_buy_links, df_best_sellers, _ = transform_data(
+        generate_overview_payload("2023-01-01", num_lists=20, books_per_list=15)
+    )
+    # Books shared by several lists would repeat their natural keys
+    df_books = df_books.drop_duplicates(STAGE_TABLE_KEYS["books"])
+    df_buy_links = df_buy_links.drop_duplicates(STAGE_TABLE_KEYS["books_buy_links"])
+    return (df_lists, tile_frame(df_books, rows, ["id"]), tile_frame(df_buy_links, rows, ["book_id"]),
+            tile_frame(df_best_sellers, rows, ["book_id"]))
+
+
+def create_schema(conn, cursor, schema):
+    with open(STAGE_DDL_PATH) as ddl_file:
+        ddl = ddl_file.read().replace("stage", schema)
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    # The GRANT statements only matter for the real stage schema
+    cursor.execute(ddl.split("GRANT")[0])
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--methods", nargs="+", default=["insert", "copy", "upsert", "upsert-rerun"])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="5431")
+    parser.add_argument("--dbname", default="mydb")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--schema", default="bench_stage")
+    args = parser.parse_args()
+
+    conn, cursor = init_db_connection(args.host, args.dbname, args.user, args.password, args.port)
+    logging.disable(logging.INFO)
+    create_schema(conn, cursor, args.schema)
+
+    print(f"{'rows':>10}{'method':>14}{'seconds':>10}{'rows/s':>12}")
+    try:
+        for rows in args.rows:
+            frames = build_frames(rows)
+            total_rows = sum(len(df) for df in frames)
+            for method in args.methods:
+                if method == "upsert-rerun":
+                    load_data(conn, cursor, *frames, method="upsert", schema=args.schema)
+                start = time.perf_counter()
+                load_data(conn, cursor, *frames, method=method.split("-")[0], schema=args.schema)
+                seconds = time.perf_counter() - start
+
+                cursor.execute(f"SELECT COUNT(*) FROM {args.schema}.best_sellings_lists_books")
+                assert cursor.fetchone()[0] == rows, f"{method} did not load every row exactly once"
+                cursor.execute(f"TRUNCATE {', '.join(f'{args.schema}.{table}' for table in ('lists', 'books', 'books_buy_links', 'best_sellings_lists_books'))}")
+                conn.commit()
+
+                print(f"{rows:>10}{method:>14}{seconds:>10.2f}{total_rows / seconds:>12.0f}")
+    finally:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
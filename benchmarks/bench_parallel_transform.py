@@ -0,0 +1,44 @@
+"""
+Measures how reading + transforming raw overview files scales with the number of
+worker processes used by `transform_files`.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_parallel_transform --weeks 156 --workers 1 2 4 8
+"""
+# imports
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from src.utils.ingestion import transform_files
+from benchmarks.synthetic_data import write_raw_data_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=156)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as raw_data_dir:
+        file_paths = write_raw_data_files(raw_data_dir, num_weeks=args.weeks)
+
+        print(f"{'workers':>8}{'seconds':>10}{'files/s':>10}{'speedup':>10}")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            start = time.perf_counter()
+            rows = sum(len(result[3]) for _, result in transform_files(file_paths, workers=workers))
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(f"{workers:>8}{seconds:>10.2f}{len(file_paths) / seconds:>10.1f}{baseline / seconds:>10.2f}")
+
+    print(f"{rows} fact rows per pass, {os.cpu_count()} CPUs available")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares raw data storage formats on a synthetic year of weekly overview files:
+disk footprint, write time and read (decompress + json parse) throughput.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_raw_storage --weeks 52
+"""
+# imports
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from src.utils.helper_functions import RAW_DATA_FORMATS, read_json_file
+from benchmarks.synthetic_data import write_raw_data_files
+
+
+def bench_format(raw_format, weeks, repeats):
+    with tempfile.TemporaryDirectory() as raw_data_dir:
+        start = time.perf_counter()
+        file_paths = write_raw_data_files(raw_data_dir, num_weeks=weeks, raw_format=raw_format)
+        write_seconds = time.perf_counter() - start
+
+        total_bytes = sum(os.path.getsize(file_path) for file_path in file_paths)
+
+        read_seconds = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for file_path in file_paths:
+                read_json_file(file_path)
+            read_seconds.append(time.perf_counter() - start)
+
+    return {
+        "format": raw_format,
+        "files": len(file_paths),
+        "total_bytes": total_bytes,
+        "write_seconds": write_seconds,
+        "read_seconds": min(read_seconds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    # read_json_file logs every file at INFO
+    logging.disable(logging.INFO)
+
+    results = [bench_format(raw_format, args.weeks, args.repeats) for raw_format in RAW_DATA_FORMATS]
+    baseline = results[0]["total_bytes"]
+
+    print(f"{'format':<8}{'size (KiB)':>12}{'ratio':>8}{'write (s)':>12}{'read (s)':>10}{'read (files/s)':>16}")
+    for result in results:
+        print(
+            f"{result['format']:<8}{result['total_bytes'] / 1024:>12.1f}{baseline / result['total_bytes']:>8.1f}"
+            f"{result['write_seconds']:>12.3f}{result['read_seconds']:>10.3f}"
+            f"{result['files'] / result['read_seconds']:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compares the peak Python memory (tracemalloc) of reading a raw file whole with
+`read_json_file` + `transform_data` against streaming it with `iter_transformed_chunks`,
+for one growing response and for a growing number of weeks concatenated into one file.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_streaming_memory --lists 12 48 192 --weeks 4 16 64
+"""
+# imports
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from src.utils.helper_functions import read_json_file, transform_data, write_json_file
+from src.utils.streaming import STREAM_CHUNK_BOOKS, iter_transformed_chunks
+from benchmarks.synthetic_data import generate_overview_payload, write_concatenated_raw_file
+
+
+def measure(function):
+    """
+    Runs `function` twice, returning its peak traced memory in MiB and the duration
+    in seconds of the untraced run (tracing slows allocation-heavy code unevenly).
+    """
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    function()
+    return peak / (1 << 20), time.perf_counter() - start
+
+
+def whole_file(file_path):
+    return transform_data(read_json_file(file_path))
+
+
+def streamed(file_path, chunk_books):
+    for _ in iter_transformed_chunks(file_path, chunk_books=chunk_books):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lists", type=int, nargs="+", default=[12, 48, 192])
+    parser.add_argument("--weeks", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--books-per-list", type=int, default=15)
+    parser.add_argument("--chunk-books", type=int, default=STREAM_CHUNK_BOOKS)
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as raw_data_dir:
+        print("One response with a growing number of lists")
+        print(f"{'lists':>8}{'file MiB':>10}{'whole MiB':>12}{'stream MiB':>12}{'whole s':>10}{'stream s':>10}")
+        for num_lists in args.lists:
+            data = generate_overview_payload("2023-01-01", num_lists=num_lists, books_per_list=args.books_per_list)
+            file_path = write_json_file(data, raw_data_dir, f"lists-{num_lists}", "json")
+            del data
+            whole_peak, whole_seconds = measure(lambda: whole_file(file_path))
+            stream_peak, stream_seconds = measure(lambda: streamed(file_path, args.chunk_books))
+            print(f"{num_lists:>8}{os.path.getsize(file_path) / (1 << 20):>10.1f}{whole_peak:>12.1f}"
+                  f"{stream_peak:>12.1f}{whole_seconds:>10.2f}{stream_seconds:>10.2f}")
+
+        # json.load cannot read concatenated responses, so only the streaming path is measured
+        print("\nWeekly responses concatenated into one file")
+        print(f"{'weeks':>8}{'file MiB':>10}{'stream MiB':>12}{'stream s':>10}")
+        for num_weeks in args.weeks:
+            file_path = write_concatenated_raw_file(os.path.join(raw_data_dir, f"weeks-{num_weeks}.json"),
+                                                    num_weeks=num_weeks, books_per_list=args.books_per_list)
+            stream_peak, stream_seconds = measure(lambda: streamed(file_path, args.chunk_books))
+            print(f"{num_weeks:>8}{os.path.getsize(file_path) / (1 << 20):>10.1f}{stream_peak:>12.1f}"
+                  f"{stream_seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
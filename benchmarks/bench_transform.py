@@ -0,0 +1,51 @@
+"""
+Compares the row-by-row `transform_data` with the columnar `transform_data_columnar`
+on synthetic overview payloads of growing size, checking both return identical frames.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_transform --books-per-list 15 50 200 --repeat 5
+"""
+# imports
+import argparse
+import logging
+import time
+
+import pandas as pd
+
+from src.utils.helper_functions import transform_data, transform_data_columnar
+from benchmarks.synthetic_data import generate_overview_payload
+
+
+def best_of(function, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lists", type=int, default=12)
+    parser.add_argument("--books-per-list", type=int, nargs="+", default=[15, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement
+    logging.disable(logging.INFO)
+
+    print(f"{'books':>8}{'row (ms)':>12}{'columnar (ms)':>16}{'speedup':>10}")
+    for books_per_list in args.books_per_list:
+        data = generate_overview_payload("2023-01-01", num_lists=args.lists, books_per_list=books_per_list)
+        for expected, actual in zip(transform_data(data)[:4], transform_data_columnar(data)[:4]):
+            pd.testing.assert_frame_equal(actual, expected)
+
+        row_seconds = best_of(transform_data, data, args.repeat)
+        columnar_seconds = best_of(transform_data_columnar, data, args.repeat)
+        print(f"{args.lists * books_per_list:>8}{row_seconds * 1000:>12.1f}{columnar_seconds * 1000:>16.1f}"
+              f"{row_seconds / columnar_seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measures the transform throughput with per-record logging (DEBUG, the volume the
+transform used to log at INFO) against the aggregated per-file summary (INFO).
+
+Log records go to a temporary file, as they would to an Airflow task log.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_transform_logging --weeks 26
+"""
+# imports
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from src.utils import helper_functions
+from benchmarks.synthetic_data import generate_overview_payload, generate_weekly_dates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=26)
+    parser.add_argument("--lists", type=int, default=12)
+    parser.add_argument("--books-per-list", type=int, default=15)
+    args = parser.parse_args()
+
+    payloads = [
+        generate_overview_payload(date, num_lists=args.lists, books_per_list=args.books_per_list)
+        for date in generate_weekly_dates("2023-01-01", args.weeks)
+    ]
+    logger = helper_functions.logger
+    logger.propagate = False
+
+    print(f"{'level':>8}{'seconds':>10}{'files/s':>10}{'log lines':>12}{'log KiB':>10}")
+    with tempfile.TemporaryDirectory() as log_dir:
+        for level in ["DEBUG", "INFO"]:
+            log_path = os.path.join(log_dir, f"{level}.log")
+            handler = logging.FileHandler(log_path)
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(level)
+
+            start = time.perf_counter()
+            for data in payloads:
+                helper_functions.transform_data(data)
+            seconds = time.perf_counter() - start
+
+            logger.removeHandler(handler)
+            handler.close()
+            with open(log_path) as log_file:
+                lines = sum(1 for _ in log_file)
+            print(f"{level:>8}{seconds:>10.2f}{len(payloads) / seconds:>10.1f}{lines:>12}"
+                  f"{os.path.getsize(log_path) / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
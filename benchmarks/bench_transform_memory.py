@@ -0,0 +1,64 @@
+"""
+Compares the memory held by the transformed frames with and without the compact dtypes
+of `COMPACT_DTYPES` (categorical names, dates and ids, small nullable integers), over a
+growing number of synthetic weeks merged with `merge_transformed`, for both transforms.
+
+Memory is `DataFrame.memory_usage(deep=True)`, reported per table and per million
+fact rows.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_transform_memory --weeks 4 16 52 --lists 48
+"""
+# imports
+import argparse
+import logging
+import time
+
+from src.utils.helper_functions import STAGE_TABLE_COLUMNS, transform_data, transform_data_columnar
+from src.utils.ingestion import merge_transformed
+from benchmarks.synthetic_data import generate_overview_payload, generate_weekly_dates
+
+
+def frame_mib(df):
+    return df.memory_usage(deep=True, index=False).sum() / (1 << 20)
+
+
+def transform_weeks(transform, payloads, compact):
+    """
+    Transforms and merges every payload, returning the merged frames and the duration in seconds.
+    """
+    start = time.perf_counter()
+    merged = merge_transformed([transform(data, compact=compact) for data in payloads])
+    return merged[:4], time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, nargs="+", default=[4, 16, 52])
+    parser.add_argument("--lists", type=int, default=48)
+    parser.add_argument("--books-per-list", type=int, default=15)
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement
+    logging.disable(logging.INFO)
+
+    tables = list(STAGE_TABLE_COLUMNS)
+    header = "".join(f"{table[:12]:>14}" for table in tables)
+    for transform in (transform_data, transform_data_columnar):
+        print(transform.__name__)
+        print(f"{'weeks':>6}{'dtypes':>9}{'facts':>9}{header}{'MiB/M facts':>13}{'s':>8}")
+        for num_weeks in args.weeks:
+            payloads = [generate_overview_payload(published_date, num_lists=args.lists,
+                                                  books_per_list=args.books_per_list)
+                        for published_date in generate_weekly_dates("2023-01-01", num_weeks)]
+            for compact in (False, True):
+                frames, seconds = transform_weeks(transform, payloads, compact)
+                fact_rows = len(frames[3])
+                sizes = [frame_mib(df) for df in frames]
+                print(f"{num_weeks:>6}{'compact' if compact else 'object':>9}{fact_rows:>9}"
+                      + "".join(f"{size:>14.2f}" for size in sizes)
+                      + f"{sum(sizes) * 1e6 / fact_rows:>13.0f}{seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
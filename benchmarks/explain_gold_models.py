@@ -0,0 +1,105 @@
+"""
+Checks that the gold models read the silver fact table through its indexes, or not
+at all: runs EXPLAIN on the compiled gold SQL and fails when a model expected to use
+an index scans a fact partition sequentially, or when a model answered from the gold
+rollups (models/gold/rollups/) reads the fact table.
+
+The planner rightly prefers sequential scans on small tables, so the check is only
+enforced once the fact table holds `--min-rows` rows; below that the plans are
+printed without failing.
+
+Usage (from the repository root, after `dbt compile` in nyt_lists_reviews/):
+    python -m benchmarks.explain_gold_models --min-rows 100000
+"""
+# imports
+import argparse
+import glob
+import logging
+import os
+import sys
+
+from src.utils.helper_functions import init_db_connection
+
+
+COMPILED_GOLD_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "nyt_lists_reviews", "target", "compiled",
+                                 "nyt_lists_reviews", "models", "gold")
+FACT_TABLE = "silver.best_sellings_lists_books"
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+# Gold models that must reach the fact table through an index
+INDEXED_MODELS = [
+    "book_bought_by_each_team",
+]
+# Gold models answered from the rollups, which must not read the fact table at all
+ROLLUP_MODELS = [
+    "books_most_remaining_in_top_three",
+    "list_with_the_least_uique_books_in_their_rankings",
+    "top_five_publisher_based_on_thier_books_ransk",
+]
+
+
+def fact_scans(plan, table_name):
+    """
+    Returns the scan node types reading partitions of `table_name` in an EXPLAIN (FORMAT JSON) plan.
+    """
+    scans = []
+    if plan.get("Relation Name", "").startswith(table_name):
+        scans.append(plan["Node Type"])
+    for child in plan.get("Plans", []):
+        scans.extend(fact_scans(child, table_name))
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rows", type=int, default=100000)
+    parser.add_argument("--compiled-dir", default=COMPILED_GOLD_DIR)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="5431")
+    parser.add_argument("--dbname", default="mydb")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin")
+    args = parser.parse_args()
+
+    compiled = {os.path.splitext(os.path.basename(path))[0]: path
+                for path in glob.glob(os.path.join(args.compiled_dir, "*.sql"))}
+    missing = [model for model in INDEXED_MODELS + ROLLUP_MODELS if model not in compiled]
+    if missing:
+        sys.exit(f"Compiled SQL not found for {', '.join(missing)}; run `dbt compile` in nyt_lists_reviews/ first.")
+
+    logging.disable(logging.INFO)
+    conn, cursor = init_db_connection(args.host, args.dbname, args.user, args.password, args.port)
+    try:
+        cursor.execute(f"SELECT COUNT(*) FROM {FACT_TABLE}")
+        fact_rows = cursor.fetchone()[0]
+        enforced = fact_rows >= args.min_rows
+        print(f"{FACT_TABLE}: {fact_rows} rows, index scans {'enforced' if enforced else 'not enforced'}")
+
+        failures = []
+        for model, path in sorted(compiled.items()):
+            with open(path) as sql_file:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql_file.read()}")
+            scans = fact_scans(cursor.fetchone()[0][0]["Plan"], FACT_TABLE.split(".")[-1])
+            if model in ROLLUP_MODELS:
+                # Reading the fact table at all means the rollups are bypassed, whatever its size
+                ok = not scans
+                if not ok:
+                    failures.append(model)
+                status = "OK" if ok else "FAIL"
+            else:
+                expected = model in INDEXED_MODELS
+                ok = not expected or all(scan in INDEX_SCANS for scan in scans)
+                if expected and enforced and not ok:
+                    failures.append(model)
+                status = "OK" if ok else ("FAIL" if enforced else "seq scan")
+            print(f"{model:<55}{status:>10}  {', '.join(sorted(set(scans))) or 'no fact scans'}")
+    finally:
+        cursor.close()
+        conn.close()
+
+    if failures:
+        sys.exit(f"Sequential scans of {FACT_TABLE}, or reads bypassing the rollups, in {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# imports
+import json
+import random
+from datetime import datetime, timedelta
+
+from src.utils.helper_functions import write_json_file, DEFAULT_RAW_DATA_FORMAT
+
+
+# Small vocabularies, as in the real overview responses
+PUBLISHERS = ["Penguin Random House", "HarperCollins", "Simon & Schuster", "Hachette", "Macmillan",
+              "Scholastic", "Knopf", "Little, Brown", "St. Martin's", "Ballantine", "Doubleday", "Atria"]
+AGE_GROUPS = ["", "", "", "Ages 8 to 12", "Ages 12 to 18", "Ages 4 to 8"]
+WEBSITES = ["Amazon", "Apple Books", "Barnes and Noble", "Books-A-Million", "Bookshop", "IndieBound"]
+WORDS = ["night", "house", "river", "secret", "garden", "last", "city", "winter", "light", "stranger",
+         "daughter", "war", "summer", "silent", "lost", "island", "king", "promise", "shadow", "heart"]
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def generate_book(index):
+    """
+    Builds the static attributes of the `index`-th book of the synthetic catalog.
+    """
+    rng = random.Random(index)
+    isbn13 = f"978{index:010d}"
+    title = _sentence(rng, rng.randint(2, 4)).upper()
+    author = f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS).capitalize()}son"
+    return {
+        "age_group": rng.choice(AGE_GROUPS),
+        "amazon_product_url": f"https://www.amazon.com/dp/{isbn13[3:]}?tag=NYTBSREV-20",
+        "article_chapter_link": "",
+        "author": author,
+        "book_image": f"https://storage.googleapis.com/du-prd/books/images/{isbn13}.jpg",
+        "book_image_width": rng.choice([326, 328, 330, 331]),
+        "book_image_height": rng.choice([495, 500, 495, 499]),
+        "book_review_link": "",
+        "book_uri": f"nyt://book/{rng.getrandbits(64):016x}",
+        "contributor": f"by {author}",
+        "contributor_note": "",
+        "description": _sentence(rng, rng.randint(12, 30)) + ".",
+        "first_chapter_link": "",
+        "price": rng.choice(["0.00", "0.00", "16.99", "28.00"]),
+        "primary_isbn10": isbn13[3:],
+        "primary_isbn13": isbn13,
+        "publisher": rng.choice(PUBLISHERS),
+        "sunday_review_link": "",
+        "title": title,
+    }
+
+
+def generate_overview_payload(published_date, num_lists=12, books_per_list=15, buy_links_per_book=6,
+                              catalog_size=None, seed=0, invalid_rate=0.0):
+    """
+    Generates a synthetic lists overview response shaped like the NYT Books API payload.
+
+    Books are drawn from a fixed catalog so the same ISBN13 keeps reappearing
+    across lists and weeks, as it does in the real data.
+
+    Args:
+        published_date (date or str): The published date of the overview.
+        num_lists (int): Number of lists in the overview.
+        books_per_list (int): Number of ranked books per list.
+        buy_links_per_book (int): Number of buy links per book (at most len(WEBSITES) distinct names).
+        catalog_size (int, optional): Number of distinct books to draw from. Defaults to 4x the books per week.
+        seed (int): Seed for the weekly selection of books.
+        invalid_rate (float): Fraction of the ranked books given a malformed `created_date`
+            and `price`, which the transform rejects (one book and one fact reject each).
+
+    Returns:
+        dict: The overview payload.
+    """
+    published_date = datetime.strptime(str(published_date), "%Y-%m-%d").date()
+    catalog_size = catalog_size or 4 * num_lists * books_per_list
+    rng = random.Random(f"{seed}-{published_date}")
+    # Drawn apart from `rng`, so the valid books are the same whatever the rate
+    invalid_rng = random.Random(f"{seed}-{published_date}-invalid")
+
+    lists = []
+    for list_index in range(num_lists):
+        list_name = f"Synthetic List {list_index + 1}"
+        books = []
+        for rank, book_index in enumerate(rng.sample(range(catalog_size), books_per_list), start=1):
+            book = generate_book(book_index)
+            book.update({
+                "created_date": f"{published_date - timedelta(days=rng.randint(3, 400))} 22:10:{rank % 60:02d}",
+                "updated_date": f"{published_date - timedelta(days=3)} 22:1{list_index % 10}:{rank % 60:02d}",
+                "rank": rank,
+                "rank_last_week": rng.randint(0, books_per_list),
+                "weeks_on_list": rng.randint(0, 60),
+                "buy_links": [
+                    {"name": WEBSITES[link % len(WEBSITES)],
+                     "url": f"https://www.{WEBSITES[link % len(WEBSITES)].lower().replace(' ', '')}.com/s?isbn={book['primary_isbn13']}"}
+                    for link in range(buy_links_per_book)
+                ],
+            })
+            if invalid_rate and invalid_rng.random() < invalid_rate:
+                book.update({"created_date": "not a date", "price": "n/a"})
+            books.append(book)
+
+        lists.append({
+            "list_id": 700 + list_index,
+            "list_name": list_name,
+            "list_name_encoded": list_name.lower().replace(" ", "-"),
+            "display_name": list_name,
+            "updated": "WEEKLY",
+            "list_image": None,
+            "list_image_width": None,
+            "list_image_height": None,
+            "books": books,
+        })
+
+    return {
+        "status": "OK",
+        "copyright": "Copyright (c) 2023 The New York Times Company.  All Rights Reserved.",
+        "num_results": num_lists * books_per_list,
+        "results": {
+            "bestsellers_date": str(published_date - timedelta(days=13)),
+            "published_date": str(published_date),
+            "published_date_description": "latest",
+            "previous_published_date": str(published_date - timedelta(days=7)),
+            "next_published_date": str(published_date + timedelta(days=7)),
+            "lists": lists,
+        },
+    }
+
+
+def generate_weekly_dates(start_date, num_weeks):
+    start_date = datetime.strptime(str(start_date), "%Y-%m-%d").date()
+    return [start_date + timedelta(weeks=week) for week in range(num_weeks)]
+
+
+def write_raw_data_files(raw_data_dir, start_date="2023-01-01", num_weeks=52, raw_format=DEFAULT_RAW_DATA_FORMAT, **kwargs):
+    """
+    Writes `num_weeks` synthetic weekly overview files into `raw_data_dir`.
+
+    Returns:
+        list: The written file paths.
+    """
+    return [
+        write_json_file(generate_overview_payload(date, **kwargs), raw_data_dir, date, raw_format)
+        for date in generate_weekly_dates(start_date, num_weeks)
+    ]
+
+
+def write_concatenated_raw_file(file_path, start_date="2023-01-01", num_weeks=52, **kwargs):
+    """
+    Writes `num_weeks` synthetic overview responses back to back into a single file,
+    one JSON document per line.
+
+    Returns:
+        str: The written file path.
+    """
+    with open(file_path, "w") as file:
+        for date in generate_weekly_dates(start_date, num_weeks):
+            json.dump(generate_overview_payload(date, **kwargs), file)
+            file.write("\n")
+    return file_path
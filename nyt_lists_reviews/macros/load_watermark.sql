@@ -0,0 +1,11 @@
+{#-
+    Watermark of the incremental models reading rows by loaded_at: the latest `column`
+    already processed, less the `load_watermark_lookback` var. loaded_at is the start of
+    the stage load transaction, so a long batch can commit after a run that already saw
+    rows of later batches; without the lookback its rows would be skipped for good. Rows
+    read twice are replaced by the delete+insert on the unique_key (snapshots find them
+    unchanged).
+-#}
+{% macro load_watermark(column='loaded_at') -%}
+    (select coalesce(max({{ column }}), '-infinity') - interval '{{ var("load_watermark_lookback") }}' from {{ this }})
+{%- endmacro %}
@@ -0,0 +1,59 @@
+{#-
+    Range partitioning for models configured with
+    partition_by={'field': <date column>, 'granularity': 'year' | 'month'}.
+
+    Postgres cannot create a partitioned table with CREATE TABLE ... AS, so the first
+    build of such a model goes through a temporary table. Partitions are named
+    <table>_<YYYY> (or <table>_<YYYY_MM>) and created on demand by
+    create_range_partitions, which partitioned incremental models run as a pre-hook.
+-#}
+
+{% macro postgres__create_table_as(temporary, relation, sql) -%}
+  {%- set partition_by = config.get('partition_by') -%}
+  {%- if temporary or not partition_by -%}
+    {{ dbt.postgres__create_table_as(temporary, relation, sql) }}
+  {%- else -%}
+    {%- set source_relation = make_temp_relation(relation, '__dbt_partition_source') -%}
+    create temporary table {{ source_relation }} on commit drop as (
+      {{ sql }}
+    );
+
+    create table {{ relation }} (like {{ source_relation }} including defaults)
+    partition by range ({{ partition_by.field }});
+
+    {{ create_range_partitions(relation, partition_by, source_relation) }};
+
+    insert into {{ relation }} select * from {{ source_relation }};
+  {%- endif -%}
+{%- endmacro %}
+
+
+{% macro create_range_partitions(relation, partition_by, source) -%}
+  {#- Creates the partitions of `relation` missing for the range of values of `source`; a no-op until `relation` exists -#}
+  {%- if not execute -%}
+    {{ return('') }}
+  {%- endif -%}
+  {%- set granularity = partition_by.get('granularity', 'year') -%}
+  {%- set suffix_format = 'YYYY' if granularity == 'year' else 'YYYY_MM' -%}
+  do $$
+  declare
+    lower_bound date;
+  begin
+    if to_regclass('{{ relation.schema }}.{{ relation.identifier }}') is null then
+      return;
+    end if;
+    -- min/max rather than distinct values, so an index on the field answers it
+    for lower_bound in
+      select generate_series(date_trunc('{{ granularity }}', min({{ partition_by.field }})),
+                             max({{ partition_by.field }}), interval '1 {{ granularity }}')::date
+      from {{ source }}
+    loop
+      execute format(
+        'create table if not exists %I.%I partition of %I.%I for values from (%L) to (%L)',
+        '{{ relation.schema }}', '{{ relation.identifier }}_' || to_char(lower_bound, '{{ suffix_format }}'),
+        '{{ relation.schema }}', '{{ relation.identifier }}',
+        lower_bound, (lower_bound + interval '1 {{ granularity }}')::date
+      );
+    end loop;
+  end $$
+{%- endmacro %}
@@ -0,0 +1,7 @@
+{#-
+    MD5 of the given columns as one row value. Row text output tells NULL and empty
+    strings apart, so no coalescing is needed.
+-#}
+{% macro row_hash(columns) -%}
+    md5(row({{ columns | join(', ') }})::text)
+{%- endmacro %}
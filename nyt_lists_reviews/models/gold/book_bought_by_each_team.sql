@@ -1,6 +1,6 @@
 {{
     config(
-        materialization='view',
+        materialized='view',
         schema='gold',
         unique_key=['book_id', 'list_id', 'team'],
         tags=['sql_question_4', 'gold_layer'],
@@ -25,7 +25,8 @@ WITH books_owned AS (
     JOIN
         {{ ref('books') }} b ON bp.book_id = b.id
     WHERE
-        EXTRACT(YEAR FROM bp.published_date) = 2023
+        bp.published_date >= DATE '2023-01-01'
+        AND bp.published_date < DATE '2024-01-01'
         AND bp.rank IN (1, 3)
 ),
 books_shared AS (
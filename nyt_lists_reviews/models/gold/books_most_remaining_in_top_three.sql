@@ -1,6 +1,6 @@
 {{
     config(
-        materialization='view',
+        materialized='view',
         schema='gold',
         unique_key=['book_id'],
         tags=['sql_question_01', 'gold_layer'],
@@ -10,14 +10,16 @@
 WITH books_remaing_in_top_three AS (
     SELECT
         book_id,
-        COUNT(*) AS weeks_in_top3
+        SUM(top_three_listings)::bigint AS weeks_in_top3
     FROM
-       {{ ref('best_sellings_lists_books') }}
+       {{ ref('book_weekly_ranks') }}
     WHERE
-        rank <= 3
-        AND EXTRACT(YEAR FROM published_date) = 2022
+        published_date >= DATE '2022-01-01'
+        AND published_date < DATE '2023-01-01'
     GROUP BY
         book_id
+    HAVING
+        SUM(top_three_listings) > 0
 )
 SELECT
     b.title,
@@ -1,6 +1,6 @@
 {{
     config(
-        materialization='view',
+        materialized='view',
         schema='gold',
         unique_key=['id'],
         tags=['sql_question_2', 'gold_layer'],
@@ -10,9 +10,9 @@
 WITH lists_books_count AS (
     SELECT
         list_id,
-        COUNT(DISTINCT book_id) AS unique_books_count
+        COUNT(*) AS unique_books_count
     FROM
-       {{ ref('best_sellings_lists_books') }}
+       {{ ref('list_books') }}
     GROUP BY
         list_id
 )
@@ -0,0 +1,44 @@
+-- models/gold/rollups/book_weekly_ranks.sql
+
+{#-
+    One row per book and week: how many lists the book appeared on and how many of
+    those listings were in the top one, three and five. Each run recomputes the weeks
+    touched by the silver facts loaded since the row with the latest loaded_at.
+-#}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['published_date', 'book_id'],
+        indexes=[
+            {'columns': ['published_date', 'book_id'], 'unique': True},
+        ],
+        schema='gold',
+        tags=['gold_layer', 'rollup'],
+    )
+}}
+
+select
+    published_date,
+    book_id,
+    count(*) as listings,
+    count(*) filter (where rank = 1) as top_one_listings,
+    count(*) filter (where rank <= 3) as top_three_listings,
+    count(*) filter (where rank <= 5) as top_five_listings,
+    min(rank) as best_rank,
+    max(loaded_at) as loaded_at
+from
+    {{ ref('best_sellings_lists_books') }}
+
+{% if is_incremental() %}
+
+where published_date in (
+    select distinct published_date
+    from {{ ref('best_sellings_lists_books') }}
+    where loaded_at > {{ load_watermark() }}
+)
+
+{% endif %}
+
+group by
+    published_date, book_id
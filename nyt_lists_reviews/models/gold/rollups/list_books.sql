@@ -0,0 +1,42 @@
+-- models/gold/rollups/list_books.sql
+
+{#-
+    One row per book ever ranked on a list, with the weeks it spent there. Each run
+    recomputes the (list, book) pairs touched by the silver facts loaded since the row
+    with the latest loaded_at, through the (list_id, book_id) index of the facts.
+-#}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['list_id', 'book_id'],
+        indexes=[
+            {'columns': ['list_id', 'book_id'], 'unique': True},
+        ],
+        schema='gold',
+        tags=['gold_layer', 'rollup'],
+    )
+}}
+
+select
+    list_id,
+    book_id,
+    count(*) as weeks,
+    min(published_date) as first_published_date,
+    max(published_date) as last_published_date,
+    max(loaded_at) as loaded_at
+from
+    {{ ref('best_sellings_lists_books') }}
+
+{% if is_incremental() %}
+
+where (list_id, book_id) in (
+    select list_id, book_id
+    from {{ ref('best_sellings_lists_books') }}
+    where loaded_at > {{ load_watermark() }}
+)
+
+{% endif %}
+
+group by
+    list_id, book_id
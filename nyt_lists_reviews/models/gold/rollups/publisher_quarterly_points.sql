@@ -0,0 +1,79 @@
+-- models/gold/rollups/publisher_quarterly_points.sql
+
+{#-
+    One row per publisher and quarter with the points of its books' rankings (5 for a
+    first place down to 1 for a fifth). A quarter is recomputed as a whole when any of
+    its facts, or any book ranked in it (its publisher may have changed), was loaded
+    since the row with the latest loaded_at; delete+insert on (year, quarter) then
+    replaces every publisher of that quarter.
+-#}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['year', 'quarter'],
+        indexes=[
+            {'columns': ['year', 'quarter', 'publisher']},
+        ],
+        schema='gold',
+        tags=['gold_layer', 'rollup'],
+    )
+}}
+
+with
+
+{% if is_incremental() %}
+
+watermark as (
+    select {{ load_watermark() }} as loaded_at
+),
+changed_quarters as (
+    select distinct date_trunc('quarter', bp.published_date)::date as quarter_start
+    from {{ ref('best_sellings_lists_books') }} bp
+    join {{ ref('books') }} b on bp.book_id = b.id
+    where bp.loaded_at > (select loaded_at from watermark)
+        or b.loaded_at > (select loaded_at from watermark)
+),
+
+{% endif %}
+
+books_points as (
+    select
+        b.publisher,
+        d.year,
+        d.quarter,
+        case
+            when bp.rank = 1 then 5
+            when bp.rank = 2 then 4
+            when bp.rank = 3 then 3
+            when bp.rank = 4 then 2
+            when bp.rank = 5 then 1
+            else 0
+        end as points,
+        greatest(bp.loaded_at, b.loaded_at) as loaded_at
+    from
+        {{ ref('best_sellings_lists_books') }} bp
+    join
+        {{ ref('books') }} b on bp.book_id = b.id
+    join
+        {{ ref('dates') }} d on bp.published_date_key = d.datekey
+
+    {% if is_incremental() %}
+
+    join
+        changed_quarters q on bp.published_date >= q.quarter_start
+        and bp.published_date < (q.quarter_start + interval '3 months')::date
+
+    {% endif %}
+)
+
+select
+    publisher,
+    year,
+    quarter,
+    sum(points) as total_points,
+    max(loaded_at) as loaded_at
+from
+    books_points
+group by
+    publisher, year, quarter
@@ -1,9 +1,35 @@
 -- models/silver/best_sellings_lists_books.sql
 
+{#-
+    Range-partitioned by year on published_date (see macros/partitioning.sql). The table
+    is never swapped out by --full-refresh, which would drop its partitions; it is
+    truncated and reloaded instead, so its indexes are only created when it is first built.
+
+    The unique index on the natural key serves the incremental delete+insert and the
+    loaded_at one its load watermark. The others
+    serve the gold models: yearly partitions already narrow their date filters,
+    so rank leads the first one (top-N filters, index-only with book_id) and
+    (list_id, book_id) finds the facts of the pairs the list_books rollup recomputes.
+    It is analyzed after each run so the gold models built next are planned on fresh stats.
+-#}
 {{
     config(
-        materialization="incremental",
-        incremental_strategy="insert_overwrite",
+        materialized="incremental",
+        incremental_strategy="delete+insert",
+        unique_key=['published_date', 'list_id', 'book_id'],
+        full_refresh=false,
+        partition_by={'field': 'published_date', 'granularity': 'year'},
+        indexes=[
+            {'columns': ['published_date', 'list_id', 'book_id'], 'unique': True},
+            {'columns': ['rank', 'published_date', 'book_id']},
+            {'columns': ['list_id', 'book_id']},
+            {'columns': ['loaded_at']},
+        ],
+        pre_hook=[
+            "{% if flags.FULL_REFRESH and load_relation(this) is not none %} truncate {{ this }} {% endif %}",
+            "{{ create_range_partitions(this, config.get('partition_by'), ref('raw_best_sellings_lists_books')) }}",
+        ],
+        post_hook="analyze {{ this }}",
         schema='silver',
         tags='silver_layer',
         loaded_at_field='loaded_at',
@@ -12,34 +38,43 @@
 
 with raw_best_sellers as (
     select
-        row_number() over () id,
+        {% if is_incremental() %}(select coalesce(max(id), 0) from {{ this }}) + {% endif -%}
+        row_number() over (order by published_date, list_id, rank) id,
         bestsellers_date,
         published_date,
+        to_char(published_date, 'YYYYMMDD')::integer as published_date_key,
         previous_published_date,
         next_published_date,
         list_id,
         book_id,
         rank,
         weeks_on_list,
-        price
+        price,
+        loaded_at,
+        batch_id
     from {{ ref('raw_best_sellings_lists_books') }}
+
+    {% if is_incremental() %}
+
+    -- Only rows inserted or changed by the stage loads committed since the last run,
+    -- including late-arriving or re-fetched weeks
+    where loaded_at > {{ load_watermark() }}
+
+    {% endif %}
 )
 
 select
     id,
     bestsellers_date,
     published_date,
+    published_date_key,
     previous_published_date,
     next_published_date,
     list_id,
     book_id,
     rank,
     weeks_on_list,
-    price
+    price,
+    loaded_at,
+    batch_id
 from raw_best_sellers
-
-{% if is_incremental() %}
-
-where published_date > (select coalesce(max(published_date), '1900-01-01') from {{ this }})
-
-{% endif %}
\ No newline at end of file
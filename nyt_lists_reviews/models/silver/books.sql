@@ -1,9 +1,11 @@
 -- models/silver/books.sql
 {{
     config(
-        materialization='incremental',
-        incremental_strategy='insert_overwrite',
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='id',
         loaded_at_field='loaded_at',
+        indexes=[{'columns': ['id'], 'unique': True}],
         schema='silver',
         tags='silver_layer',
     )
@@ -29,7 +31,8 @@ with raw_books as (
         first_chapter_link,
         book_uri,
         sunday_review_link,
-        row_number() OVER (PARTITION BY id ORDER BY updated_date, created_date DESC) as rn
+        loaded_at,
+        batch_id
     from {{ ref('raw_books') }}
 )
 
@@ -51,12 +54,14 @@ select
     book_image_height,
     first_chapter_link,
     book_uri,
-    sunday_review_link
+    sunday_review_link,
+    loaded_at,
+    batch_id
 from raw_books
-where rn = 1
 
 {% if is_incremental() %}
 
-where updated_date > (select coalesce(max(updated_date), '1900-01-01') from {{ this }}) 
+-- Only rows inserted or changed by the stage loads committed since the last run
+where loaded_at > {{ load_watermark() }}
 
 {% endif %}
\ No newline at end of file
@@ -1,9 +1,10 @@
 -- models/silver/books_buy_links.sql
 {{
     config(
-        materialization='incremental',
-        incremental_strategy='insert_overwrite',
+        materialized='incremental',
+        incremental_strategy='delete+insert',
         unique_key=['book_id', 'website_name'],
+        indexes=[{'columns': ['book_id', 'website_name'], 'unique': True}],
         schema='silver',
         tags='silver_layer',
         loaded_at_field='loaded_at',
@@ -15,13 +16,24 @@ with raw_books_buy_links as (
         book_id,
         website_name,
         website_url,
-        row_number() OVER (PARTITION BY book_id, website_name) as rn
+        published_date,
+        loaded_at,
+        batch_id
     from {{ ref('raw_books_buy_links') }}
 )
 
 select
     book_id,
     website_name,
-    website_url
+    website_url,
+    published_date,
+    loaded_at,
+    batch_id
 from raw_books_buy_links
-where rn = 1
+
+{% if is_incremental() %}
+
+-- Only rows inserted or changed by the stage loads committed since the last run
+where loaded_at > {{ load_watermark() }}
+
+{% endif %}
@@ -1,9 +1,11 @@
 -- models/silver/lists.sql
 {{
     config(
-        materialization='incremental',
-        incremental_strategy='insert_overwrite',
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='id',
         loaded_at_field='loaded_at',
+        indexes=[{'columns': ['id'], 'unique': True}],
         schema='silver',
         tags='silver_layer',
     )
@@ -19,7 +21,8 @@ with raw_lists as (
         list_image,
         list_image_width,
         list_image_height,
-        row_number() OVER (PARTITION BY id ORDER BY updated DESC) as rn
+        loaded_at,
+        batch_id
     from {{ ref('raw_lists') }}
 )
 select
@@ -30,12 +33,14 @@ select
     updated,
     list_image,
     list_image_width,
-    list_image_height
+    list_image_height,
+    loaded_at,
+    batch_id
 from raw_lists
-where rn = 1
 
 {% if is_incremental() %}
 
-where updated > (select coalesce(max(updated), '1900-01-01') from {{ this }})
+-- Only rows inserted or changed by the stage loads committed since the last run
+where loaded_at > {{ load_watermark() }}
 
 {% endif %}
\ No newline at end of file
@@ -0,0 +1,42 @@
+{#-
+    Type 2 history of the books: a new version whenever one of the tracked attributes
+    changes. The check strategy only compares row_hash, so books whose only change is
+    the weekly updated_date keep their version. Only the stage rows loaded since the
+    last snapshot run are compared. The untracked columns (created and updated dates, loaded_at)
+    keep the values of the version's first load.
+-#}
+{% snapshot books_snapshot %}
+
+{%- set tracked_columns = [
+    'title', 'publisher', 'author', 'contributor', 'contributor_note', 'description', 'age_group',
+    'amazon_product_url', 'primary_isbn13', 'primary_isbn10', 'book_image_width', 'book_image_height',
+    'first_chapter_link', 'book_uri', 'sunday_review_link',
+] -%}
+
+{{
+    config(
+        target_schema='silver',
+        unique_key='id',
+        strategy='check',
+        check_cols=['row_hash'],
+        tags='silver_layer',
+    )
+}}
+
+select
+    id,
+    {{ tracked_columns | join(',\n    ') }},
+    created_date,
+    updated_date,
+    {{ row_hash(tracked_columns) }} as row_hash,
+    loaded_at
+from {{ ref('raw_books') }}
+
+{% if load_relation(this) is not none %}
+
+-- Only rows inserted or changed by the stage loads committed since the last snapshot run
+where loaded_at > {{ load_watermark('dbt_updated_at') }}
+
+{% endif %}
+
+{% endsnapshot %}
@@ -0,0 +1,39 @@
+{#-
+    Type 2 history of the lists: a new version whenever one of the tracked attributes
+    changes. The check strategy only compares row_hash, so the weekly `updated` date
+    alone does not version a list. Only the stage rows loaded since the last snapshot
+    run are compared. The untracked columns (updated, loaded_at) keep the values of the
+    version's first load.
+-#}
+{% snapshot lists_snapshot %}
+
+{%- set tracked_columns = [
+    'list_name', 'list_name_encoded', 'display_name', 'list_image', 'list_image_width', 'list_image_height',
+] -%}
+
+{{
+    config(
+        target_schema='silver',
+        unique_key='id',
+        strategy='check',
+        check_cols=['row_hash'],
+        tags='silver_layer',
+    )
+}}
+
+select
+    id,
+    {{ tracked_columns | join(',\n    ') }},
+    updated,
+    {{ row_hash(tracked_columns) }} as row_hash,
+    loaded_at
+from {{ ref('raw_lists') }}
+
+{% if load_relation(this) is not none %}
+
+-- Only rows inserted or changed by the stage loads committed since the last snapshot run
+where loaded_at > {{ load_watermark('dbt_updated_at') }}
+
+{% endif %}
+
+{% endsnapshot %}
@@ -0,0 +1,5 @@
+-- Adds the week of each buy link to stage tables created before it was part of
+-- sql/create_stage_layer.sql. The upsert loader keeps the newest week of every buy link
+-- with it; links already staged have no week and are replaced by the next load.
+
+ALTER TABLE stage.books_buy_links ADD COLUMN published_date date;
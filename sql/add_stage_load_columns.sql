@@ -0,0 +1,32 @@
+-- Adds the load audit columns, the load_batches audit table and the watermark indexes to
+-- stage tables created before they were part of sql/create_stage_layer.sql. Rows already
+-- staged get the time of this migration as loaded_at and no batch.
+
+ALTER TABLE stage.lists
+  ADD COLUMN loaded_at timestamptz NOT NULL DEFAULT now(),
+  ADD COLUMN batch_id bigint;
+ALTER TABLE stage.books
+  ADD COLUMN loaded_at timestamptz NOT NULL DEFAULT now(),
+  ADD COLUMN batch_id bigint;
+ALTER TABLE stage.books_buy_links
+  ADD COLUMN loaded_at timestamptz NOT NULL DEFAULT now(),
+  ADD COLUMN batch_id bigint;
+ALTER TABLE stage.best_sellings_lists_books
+  ADD COLUMN loaded_at timestamptz NOT NULL DEFAULT now(),
+  ADD COLUMN batch_id bigint;
+
+CREATE TABLE stage.load_batches (
+  batch_id bigserial PRIMARY KEY,
+  source text,
+  started_at timestamptz NOT NULL DEFAULT now(),
+  finished_at timestamptz,
+  rows_loaded bigint,
+  rejected_records bigint
+);
+
+CREATE INDEX ON stage.lists (loaded_at);
+CREATE INDEX ON stage.books (loaded_at);
+CREATE INDEX ON stage.books_buy_links (loaded_at);
+CREATE INDEX ON stage.best_sellings_lists_books (loaded_at);
+
+GRANT SELECT ON stage.load_batches TO admin;
@@ -0,0 +1,22 @@
+-- Adds the natural keys used by the upsert loader to stage tables created before they
+-- were part of sql/create_stage_layer.sql, keeping one row per key.
+
+DELETE FROM stage.lists a USING stage.lists b
+WHERE a.id = b.id AND a.ctid < b.ctid;
+DELETE FROM stage.lists WHERE id IS NULL;
+ALTER TABLE stage.lists ADD PRIMARY KEY (id);
+
+DELETE FROM stage.books a USING stage.books b
+WHERE a.id = b.id AND a.ctid < b.ctid;
+DELETE FROM stage.books WHERE id IS NULL;
+ALTER TABLE stage.books ADD PRIMARY KEY (id);
+
+DELETE FROM stage.books_buy_links a USING stage.books_buy_links b
+WHERE a.book_id = b.book_id AND a.website_name = b.website_name AND a.ctid < b.ctid;
+DELETE FROM stage.books_buy_links WHERE book_id IS NULL OR website_name IS NULL;
+ALTER TABLE stage.books_buy_links ADD PRIMARY KEY (book_id, website_name);
+
+DELETE FROM stage.best_sellings_lists_books a USING stage.best_sellings_lists_books b
+WHERE a.published_date = b.published_date AND a.list_id = b.list_id AND a.book_id = b.book_id AND a.ctid < b.ctid;
+DELETE FROM stage.best_sellings_lists_books WHERE published_date IS NULL OR list_id IS NULL OR book_id IS NULL;
+ALTER TABLE stage.best_sellings_lists_books ADD PRIMARY KEY (published_date, list_id, book_id);
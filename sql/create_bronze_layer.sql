@@ -1,4 +1,4 @@
-create schema bronze
+create schema bronze;
 
 CREATE TABLE bronze.books_buy_links (
   book_id varchar,
@@ -2,5 +2,6 @@ CREATE TABLE silver.books_buy_links (
   book_id varchar,
   website_name varchar,
   website_url text,
+  published_date date,
   PRIMARY KEY ("book_id", "website_name")
 );
\ No newline at end of file
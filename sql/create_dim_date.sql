@@ -1,14 +1,14 @@
 CREATE TABLE silver.date (
-  DateKey integer,
+  DateKey integer NOT NULL UNIQUE,
   FullDate date PRIMARY KEY,
-  DayOfMonth varchar,
+  DayOfMonth integer,
   DayName varchar,
-  DayOfWeek varchar,
-  DayOfYear varchar,
-  WeekOfYear varchar,
-  Month varchar,
+  DayOfWeek integer,
+  DayOfYear integer,
+  WeekOfYear integer,
+  Month integer,
   MonthName varchar,
-  Quarter varchar,
-  Year varchar,
-  MonthYear varchar
+  Quarter integer,
+  Year integer,
+  MonthYear integer
 );
\ No newline at end of file
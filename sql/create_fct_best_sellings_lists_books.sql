@@ -2,6 +2,7 @@ CREATE TABLE silver.best_sellings_lists_books (
   id integer PRIMARY KEY,
   bestsellers_date date,
   published_date date,
+  published_date_key integer,
   previous_published_date date,
   next_published_date date,
   list_id varchar,
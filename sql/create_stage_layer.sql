@@ -1,9 +1,13 @@
-create schema stage
+create schema stage;
 
 CREATE TABLE stage.books_buy_links (
   book_id varchar,
   website_name varchar,
-  website_url text
+  website_url text,
+  published_date date,
+  loaded_at timestamptz NOT NULL DEFAULT now(),
+  batch_id bigint,
+  PRIMARY KEY (book_id, website_name)
 );
 
 CREATE TABLE stage.books (
@@ -24,7 +28,10 @@ CREATE TABLE stage.books (
   book_image_height int,
   first_chapter_link text,
   book_uri text,
-  sunday_review_link text
+  sunday_review_link text,
+  loaded_at timestamptz NOT NULL DEFAULT now(),
+  batch_id bigint,
+  PRIMARY KEY (id)
 );
 
 CREATE TABLE stage.lists (
@@ -35,7 +42,10 @@ CREATE TABLE stage.lists (
   updated date,
   list_image text,
   list_image_width int,
-  list_image_height int
+  list_image_height int,
+  loaded_at timestamptz NOT NULL DEFAULT now(),
+  batch_id bigint,
+  PRIMARY KEY (id)
 );
 
 CREATE TABLE stage.best_sellings_lists_books (
@@ -48,8 +58,28 @@ CREATE TABLE stage.best_sellings_lists_books (
   book_id varchar,
   rank integer,
   weeks_on_list int,
-  price numeric
+  price numeric,
+  loaded_at timestamptz NOT NULL DEFAULT now(),
+  batch_id bigint,
+  PRIMARY KEY (published_date, list_id, book_id)
+) PARTITION BY RANGE (published_date);
+-- Yearly partitions (e.g. stage.best_sellings_lists_books_2023) are created by the loader as new weeks arrive
+
+-- One row per committed load; loaded_at/batch_id above record the load that last changed each row
+CREATE TABLE stage.load_batches (
+  batch_id bigserial PRIMARY KEY,
+  source text,
+  started_at timestamptz NOT NULL DEFAULT now(),
+  finished_at timestamptz,
+  rows_loaded bigint,
+  rejected_records bigint
 );
 
+-- Serve the load watermark of the incremental silver models
+CREATE INDEX ON stage.lists (loaded_at);
+CREATE INDEX ON stage.books (loaded_at);
+CREATE INDEX ON stage.books_buy_links (loaded_at);
+CREATE INDEX ON stage.best_sellings_lists_books (loaded_at);
+
 GRANT USAGE ON SCHEMA stage TO admin;
 GRANT SELECT ON ALL TABLES IN SCHEMA stage TO admin;
\ No newline at end of file
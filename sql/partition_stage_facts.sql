@@ -0,0 +1,34 @@
+-- Converts a stage.best_sellings_lists_books created before it was range-partitioned by
+-- published_date (see sql/create_stage_layer.sql), creating the yearly partitions of the
+-- rows it holds. Run after sql/add_stage_natural_keys.sql.
+
+BEGIN;
+
+ALTER TABLE stage.best_sellings_lists_books RENAME TO best_sellings_lists_books_unpartitioned;
+ALTER TABLE stage.best_sellings_lists_books_unpartitioned
+  RENAME CONSTRAINT best_sellings_lists_books_pkey TO best_sellings_lists_books_unpartitioned_pkey;
+
+CREATE TABLE stage.best_sellings_lists_books (
+  LIKE stage.best_sellings_lists_books_unpartitioned INCLUDING DEFAULTS,
+  PRIMARY KEY (published_date, list_id, book_id)
+) PARTITION BY RANGE (published_date);
+
+DO $$
+DECLARE
+  year int;
+BEGIN
+  FOR year IN SELECT DISTINCT extract(year FROM published_date)::int FROM stage.best_sellings_lists_books_unpartitioned
+  LOOP
+    EXECUTE format(
+      'CREATE TABLE stage.%I PARTITION OF stage.best_sellings_lists_books FOR VALUES FROM (%L) TO (%L)',
+      'best_sellings_lists_books_' || year, make_date(year, 1, 1), make_date(year + 1, 1, 1)
+    );
+  END LOOP;
+END $$;
+
+INSERT INTO stage.best_sellings_lists_books SELECT * FROM stage.best_sellings_lists_books_unpartitioned;
+DROP TABLE stage.best_sellings_lists_books_unpartitioned;
+
+GRANT SELECT ON stage.best_sellings_lists_books TO admin;
+
+COMMIT;
@@ -4,10 +4,9 @@ from datetime import datetime
 import psycopg2
 from psycopg2.extras import execute_batch
 
-from utils.helper_functions import  init_db_connection, generate_incremental_dates, read_json_file, transform_data, load_data, write_rejected_records_to_file, validate_published_dates
-
-# Init database connection
-conn, cursor = init_db_connection("localhost", "mydb", "admin", "admin", "5432")
+from utils.helper_functions import  generate_incremental_dates, write_rejected_records_to_file, validate_published_dates, \
+    transform_data_columnar
+from utils.ingestion import IngestionRunner
 
 # generate weekly dates starting from 2021 to 2023
 START_DATE = '2020-12-27'
@@ -15,18 +14,28 @@ END_DATE = '2023-12-31'
 OFFSET = 7
 dates = generate_incremental_dates(START_DATE, END_DATE, OFFSET)
 
-# preprocess and ingest the data 
-for date in dates:
-    data = read_json_file(f'./raw_data/{date}.json')
-    df_lists, df_books, df_buy_links, df_best_sellers, rejected_records = transform_data(data)
-    load_data(conn, cursor, df_lists, df_books, df_buy_links, df_best_sellers)\
+# number of weekly files loaded per transaction, and processes transforming them
+BATCH_SIZE = 20
+TRANSFORM_WORKERS = 4
+# stream each raw file in bounded chunks instead of parsing it whole (for very large files)
+STREAM_RAW_FILES = False
+# also export every loaded week as partitioned Parquet datasets for offline analytics (needs pyarrow), e.g. './parquet'
+PARQUET_EXPORT_DIR = None
+# transform the files of a batch together into one set of DataFrames (Parquet export needs each week apart)
+TRANSFORM_BATCHES = PARQUET_EXPORT_DIR is None
 
-# handling rejected records
-write_rejected_records_to_file(rejected_records)
+# preprocess and ingest the data using pooled database connections
+with IngestionRunner("localhost", "mydb", "admin", "admin", "5432", batch_size=BATCH_SIZE, workers=TRANSFORM_WORKERS,
+                     transform=transform_data_columnar, parquet_dir=PARQUET_EXPORT_DIR,
+                     transform_batches=TRANSFORM_BATCHES) as runner:
+    if STREAM_RAW_FILES:
+        rejected_records = runner.run_streaming(dates)
+    else:
+        rejected_records = runner.run(dates)
 
-# do simple validation that the data ingested for the while range
-validate_published_dates(cursor, START_DATE, END_DATE)
+    # handling rejected records
+    write_rejected_records_to_file(rejected_records)
 
-# close database connection
-cursor.close()
-conn.close()
\ No newline at end of file
+    # do simple validation that the data ingested for the while range
+    with runner.connection() as conn:
+        validate_published_dates(conn.cursor(), START_DATE, END_DATE)
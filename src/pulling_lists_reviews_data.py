@@ -8,6 +8,8 @@ import requests
 
 # import helper functions
 from utils.helper_functions import parse_configs, generate_incremental_dates, fetch_data_from_api
+from utils.concurrent_fetcher import fetch_dates_concurrently
+from utils.raw_data_manifest import RawDataManifest
 
 # get API credientials
 NYT_BOOKS_API_KEY, NYT_BOOKS_API_SECRET, NYT_BOOKS_API_ENDPOINT = parse_configs('./config.json')
@@ -17,10 +19,12 @@ NYT_BOOKS_API_KEY, NYT_BOOKS_API_SECRET, NYT_BOOKS_API_ENDPOINT = parse_configs(
 START_DATE = '2022-05-29'
 END_DATE = '2023-12-31'
 OFFSET = 7
+MAX_WORKERS = 4
 
 dates = generate_incremental_dates(START_DATE, END_DATE, OFFSET)
 
-for date in dates:
-    fetch_data_from_api(NYT_BOOKS_API_KEY, date)
-    # sleep for 12 second to not hit the API limit as recommended by the documentation
-    time.sleep(12)
\ No newline at end of file
+# only dates missing, failed or stale in the raw data manifest are requested
+manifest = RawDataManifest('./raw_data')
+
+# keep several requests in flight, paced by the API per-minute and per-day quotas
+fetch_dates_concurrently(NYT_BOOKS_API_KEY, dates, max_workers=MAX_WORKERS, manifest=manifest)
\ No newline at end of file
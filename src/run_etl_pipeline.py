@@ -0,0 +1,42 @@
+# imports
+from concurrent.futures import ProcessPoolExecutor
+
+# import helper functions
+from utils.helper_functions import parse_configs, generate_incremental_dates, write_rejected_records_to_file, \
+    validate_published_dates, transform_data_columnar
+from utils.raw_data_manifest import RawDataManifest
+from utils.ingestion import IngestionRunner
+from utils.pipeline import run_etl_pipeline
+
+# get API credientials
+NYT_BOOKS_API_KEY, NYT_BOOKS_API_SECRET, NYT_BOOKS_API_ENDPOINT = parse_configs('./config.json')
+
+# fetch and ingest the data end to end, the fetching, transforming and loading of different weeks overlapping
+START_DATE = '2020-12-27'
+END_DATE = '2023-12-31'
+OFFSET = 7
+FETCH_WORKERS = 4
+TRANSFORM_WORKERS = 4
+BATCH_SIZE = 20
+# also export every loaded week as partitioned Parquet datasets for offline analytics (needs pyarrow), e.g. './parquet'
+PARQUET_EXPORT_DIR = None
+# transform the files of a batch together into one set of DataFrames (Parquet export needs each week apart)
+TRANSFORM_BATCHES = PARQUET_EXPORT_DIR is None
+
+dates = generate_incremental_dates(START_DATE, END_DATE, OFFSET)
+
+with ProcessPoolExecutor(max_workers=TRANSFORM_WORKERS) as executor, \
+        IngestionRunner("localhost", "mydb", "admin", "admin", "5432", batch_size=BATCH_SIZE,
+                        parquet_dir=PARQUET_EXPORT_DIR, transform_batches=TRANSFORM_BATCHES) as runner:
+    rejected_records = run_etl_pipeline(
+        runner, dates, NYT_BOOKS_API_KEY=NYT_BOOKS_API_KEY, fetch_workers=FETCH_WORKERS,
+        transform_workers=TRANSFORM_WORKERS, transform_executor=executor, manifest=RawDataManifest('./raw_data'),
+        transform=transform_data_columnar,
+    )
+
+    # handling rejected records
+    write_rejected_records_to_file(rejected_records)
+
+    # do simple validation that the data ingested for the while range
+    with runner.connection() as conn:
+        validate_published_dates(conn.cursor(), START_DATE, END_DATE)
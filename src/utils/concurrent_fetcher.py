@@ -0,0 +1,238 @@
+# imports
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .helper_functions import APIRequestError, DEFAULT_RAW_DATA_FORMAT, NYT_OVERVIEW_ENDPOINT, NYTBooksAPIClient, \
+    fetch_data_from_api
+
+
+logger = logging.getLogger(__name__)
+
+# Default NYT Books API quotas
+NYT_REQUESTS_PER_MINUTE = 5
+NYT_REQUESTS_PER_DAY = 500
+
+
+class TokenBucket:
+    """
+    A bucket of `rate` tokens for a quota window of `period` seconds. Each spent token
+    returns to the bucket `period` seconds after it was consumed, so no window of
+    `period` seconds ever sees more than `rate` requests while a full burst is still
+    allowed whenever the quota has room for it.
+
+    Args:
+        rate (int): Number of requests allowed per `period`.
+        period (float): Length of the quota window in seconds.
+        clock (callable, optional): Monotonic clock, overridable for testing.
+    """
+
+    def __init__(self, rate, period, clock=time.monotonic):
+        self.rate = rate
+        self.period = period
+        self.clock = clock
+        self.spent = deque()
+
+    def refill(self):
+        now = self.clock()
+        while self.spent and self.spent[0] + self.period <= now:
+            self.spent.popleft()
+
+    def time_until_available(self):
+        """
+        Returns the number of seconds until one token is available (0 if one already is).
+        """
+        self.refill()
+        if len(self.spent) < self.rate:
+            return 0.0
+        return self.spent[0] + self.period - self.clock()
+
+    def consume(self):
+        self.spent.append(self.clock())
+
+
+class RateLimiter:
+    """
+    Thread-safe rate limiter enforcing several token buckets at once, e.g. the
+    per-minute and per-day quotas of the NYT Books API.
+
+    A caller only waits while at least one bucket is empty, so requests go out as
+    soon as every quota allows it.
+
+    Args:
+        buckets (list[TokenBucket]): The quotas to enforce together.
+        clock (callable, optional): Monotonic clock, overridable for testing.
+        sleep (callable, optional): Sleep function, overridable for testing.
+    """
+
+    def __init__(self, buckets, clock=time.monotonic, sleep=time.sleep):
+        self.buckets = buckets
+        self.clock = clock
+        self.sleep = sleep
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until every bucket has a token, then consumes one from each.
+
+        Returns:
+            float: The total number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                wait = max(self.blocked_until - self.clock(), 0.0)
+                wait = max([wait] + [bucket.time_until_available() for bucket in self.buckets])
+                if wait <= 0:
+                    for bucket in self.buckets:
+                        bucket.consume()
+                    return waited
+            self.sleep(wait)
+            waited += wait
+
+    @property
+    def interval(self):
+        """
+        The steady-state spacing between requests allowed by the tightest quota, in seconds.
+        """
+        return min(bucket.period / bucket.rate for bucket in self.buckets)
+
+    def penalize(self, delay):
+        """
+        Pauses every caller for `delay` seconds, used when the API answers with
+        429 Too Many Requests despite the local accounting.
+        """
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, self.clock() + delay)
+
+
+def build_nyt_rate_limiter(requests_per_minute=NYT_REQUESTS_PER_MINUTE, requests_per_day=NYT_REQUESTS_PER_DAY):
+    """
+    Builds a rate limiter tracking the NYT Books API per-minute and per-day quotas.
+    """
+    return RateLimiter([
+        TokenBucket(requests_per_minute, 60),
+        TokenBucket(requests_per_day, 24 * 60 * 60),
+    ])
+
+
+def build_fetch_client(max_workers):
+    """
+    Builds a client pooling `max_workers` connections that leaves 429 handling to the
+    rate limiter, so 429s are coordinated across workers rather than retried per worker.
+    """
+    return NYTBooksAPIClient(pool_maxsize=max_workers, retry_statuses=(500, 502, 503, 504))
+
+
+def fetch_date(NYT_BOOKS_API_KEY, date, rate_limiter, client, max_attempts=5, endpoint=NYT_OVERVIEW_ENDPOINT,
+               raw_data_dir="./raw_data", manifest=None, raw_format=DEFAULT_RAW_DATA_FORMAT):
+    """
+    Fetches the lists overview of one date once `rate_limiter` allows it. A 429 Too
+    Many Requests answer pauses the whole limiter (for the `Retry-After` delay when
+    given) and the request is retried up to `max_attempts` times.
+
+    Args:
+        NYT_BOOKS_API_KEY (str): The API key for accessing the New York Times Books API.
+        date (date or str): The published date to fetch.
+        rate_limiter (RateLimiter): The limiter shared by every concurrent caller.
+        client (NYTBooksAPIClient): The pooled client shared by every concurrent caller.
+        max_attempts (int): Attempts before giving up on 429 responses.
+        endpoint (str): The lists overview endpoint to call.
+        raw_data_dir (str): Folder where the raw JSON files are written.
+        manifest (RawDataManifest, optional): Records the outcome (without saving it).
+        raw_format (str): Storage format of the raw file, one of `RAW_DATA_FORMATS`.
+
+    Returns:
+        str: The saved file path.
+
+    Raises:
+        APIRequestError: If the API answers with an error status.
+        requests.exceptions.RequestException: If no response was received.
+    """
+    for attempt in range(1, max_attempts + 1):
+        rate_limiter.acquire()
+        try:
+            file_path = fetch_data_from_api(NYT_BOOKS_API_KEY, date, endpoint=endpoint, raw_data_dir=raw_data_dir,
+                                            client=client, raw_format=raw_format)
+            if manifest is not None:
+                manifest.record(date, 200, file_path)
+            return file_path
+        except APIRequestError as e:
+            if e.status_code != 429 or attempt == max_attempts:
+                if manifest is not None:
+                    manifest.record(date, e.status_code)
+                raise
+            delay = e.retry_after if e.retry_after is not None else rate_limiter.interval
+            logger.warning(f"Rate limited while fetching {date} (attempt {attempt}), pausing for {delay:.1f}s")
+            rate_limiter.penalize(delay)
+        except requests.exceptions.RequestException:
+            # No response was received (connection error or timeout, after the client's retries)
+            if manifest is not None:
+                manifest.record(date, None)
+            raise
+
+
+def fetch_dates_concurrently(NYT_BOOKS_API_KEY, dates, max_workers=4, rate_limiter=None, max_attempts=5,
+                             endpoint=NYT_OVERVIEW_ENDPOINT, raw_data_dir="./raw_data", client=None, manifest=None,
+                             raw_format=DEFAULT_RAW_DATA_FORMAT):
+    """
+    Fetches the lists overview for many dates with several requests in flight, paced
+    by a token-bucket rate limiter instead of a fixed sleep between calls.
+
+    Requests answered with 429 Too Many Requests pause the whole limiter (for the
+    `Retry-After` delay when given) and are retried up to `max_attempts` times.
+
+    Args:
+        NYT_BOOKS_API_KEY (str): The API key for accessing the New York Times Books API.
+        dates (list): Dates to fetch, as `datetime.date` objects or "YYYY-MM-DD" strings.
+        max_workers (int): Number of requests kept in flight.
+        rate_limiter (RateLimiter, optional): Defaults to the NYT per-minute and per-day quotas.
+        max_attempts (int): Attempts per date before giving up on 429 responses.
+        endpoint (str): The lists overview endpoint to call.
+        raw_data_dir (str): Folder where the raw JSON files are written.
+        client (NYTBooksAPIClient, optional): Defaults to a client pooling `max_workers`
+            connections that leaves 429 handling to the rate limiter.
+        manifest (RawDataManifest, optional): When given, only dates that are missing, failed
+            or stale in the manifest are fetched, and every outcome is recorded in it.
+        raw_format (str): Storage format of the raw files, one of `RAW_DATA_FORMATS`.
+
+    Returns:
+        list: The saved file paths, in the same order as the fetched dates.
+
+    Raises:
+        Exception: If any date could not be fetched, after every other date has been attempted.
+    """
+    if manifest is not None:
+        dates = manifest.dates_to_fetch(dates)
+    rate_limiter = rate_limiter or build_nyt_rate_limiter()
+    client = client or build_fetch_client(max_workers)
+    logger.info(f"Fetching {len(dates)} dates with {max_workers} workers.")
+
+    start = time.monotonic()
+    file_paths = []
+    failed_dates = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (date, executor.submit(fetch_date, NYT_BOOKS_API_KEY, date, rate_limiter, client, max_attempts,
+                                   endpoint, raw_data_dir, manifest, raw_format))
+            for date in dates
+        ]
+        for date, future in futures:
+            try:
+                file_paths.append(future.result())
+            except Exception as e:
+                logger.error(f"Error fetching data for date {date}: {e}")
+                failed_dates.append(date)
+
+    if manifest is not None:
+        manifest.save()
+    logger.info(f"Fetched {len(file_paths)} of {len(dates)} dates in {time.monotonic() - start:.1f}s.")
+    client.log_stats()
+    if failed_dates:
+        raise Exception(f"Failed to fetch data for dates: {', '.join(str(date) for date in failed_dates)}")
+    return file_paths
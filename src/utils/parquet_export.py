@@ -0,0 +1,134 @@
+# imports
+import logging
+import os
+import shutil
+
+from .helper_functions import FACT_PARTITION_COLUMN, STAGE_TABLE_COLUMNS
+
+# Parquet export is optional
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+logger = logging.getLogger(__name__)
+
+# Arrow types of the exported columns that are not strings; string columns are
+# dictionary-encoded, since names, publishers and list ids repeat across rows
+PARQUET_TYPED_COLUMNS = {
+    "lists": {"id": "int64", "updated": "date32", "list_image_width": "int32", "list_image_height": "int32"},
+    "books": {"created_date": "date32", "updated_date": "date32", "book_image_width": "int32",
+              "book_image_height": "int32"},
+    "books_buy_links": {"published_date": "date32"},
+    "best_sellings_lists_books": {"bestsellers_date": "date32", "published_date": "date32",
+                                  "previous_published_date": "date32", "next_published_date": "date32",
+                                  "list_id": "int64", "rank": "int32", "weeks_on_list": "int32",
+                                  "price": "float64"},
+}
+
+# Every table is partitioned by the week its rows were published in
+PARQUET_PARTITION_COLUMN = FACT_PARTITION_COLUMN
+
+# "append" replaces only the partitions being written, "overwrite" the whole dataset
+PARQUET_EXPORT_MODES = ("append", "overwrite")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet export needs the pyarrow package, which is not installed.")
+
+
+def parquet_schema(table):
+    """
+    Returns the Arrow schema a stage table is exported with, partition column included.
+    """
+    _require_pyarrow()
+    typed_columns = PARQUET_TYPED_COLUMNS[table]
+    fields = [
+        pa.field(column, getattr(pa, typed_columns[column])() if column in typed_columns
+                 else pa.dictionary(pa.int32(), pa.string()))
+        for column in STAGE_TABLE_COLUMNS[table]
+    ]
+    if PARQUET_PARTITION_COLUMN not in STAGE_TABLE_COLUMNS[table]:
+        fields.append(pa.field(PARQUET_PARTITION_COLUMN, pa.date32()))
+    return pa.schema(fields)
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([pa.field(PARQUET_PARTITION_COLUMN, pa.date32())]), flavor="hive")
+
+
+def export_parquet(output_dir, published_date, df_lists, df_books, df_buy_links, df_best_sellers, mode="append",
+                   compression="zstd"):
+    """
+    Writes the outputs of `transform_data` for one week as partitioned Parquet datasets,
+    one per stage table under `output_dir/<table>/published_date=YYYY-MM-DD/`, with
+    typed dates and dictionary-encoded strings.
+
+    Lists, books and buy links are written to the partition of `published_date`, as
+    they were that week; facts to the partition of their own published_date.
+
+    Args:
+        output_dir (str): Folder holding one dataset per stage table.
+        published_date (datetime.date): The week of the lists, books and buy links.
+        df_lists, df_books, df_buy_links, df_best_sellers (pd.DataFrame): Outputs of `transform_data`.
+        mode (str): "append" to replace only the partitions written, so a week can be
+            exported again without touching the others; "overwrite" to replace every dataset.
+        compression (str): Parquet compression codec.
+
+    Returns:
+        int: The rows written.
+
+    Raises:
+        ValueError: If `mode` is not one of `PARQUET_EXPORT_MODES`.
+        ImportError: If pyarrow is not installed.
+    """
+    if mode not in PARQUET_EXPORT_MODES:
+        raise ValueError(f"Unknown Parquet export mode {mode!r}, expected one of {PARQUET_EXPORT_MODES}.")
+    _require_pyarrow()
+
+    rows = 0
+    frames = {"lists": df_lists, "books": df_books, "books_buy_links": df_buy_links,
+              "best_sellings_lists_books": df_best_sellers}
+    for table, df in frames.items():
+        dataset_dir = os.path.join(output_dir, table)
+        if mode == "overwrite" and os.path.isdir(dataset_dir):
+            shutil.rmtree(dataset_dir)
+        if df.empty:
+            continue
+        if PARQUET_PARTITION_COLUMN not in df.columns:
+            df = df.assign(**{PARQUET_PARTITION_COLUMN: published_date})
+        arrow_table = pa.Table.from_pandas(df, schema=parquet_schema(table), preserve_index=False)
+        pq.write_to_dataset(
+            arrow_table, dataset_dir, partitioning=_partitioning(), existing_data_behavior="delete_matching",
+            basename_template="part-{i}.parquet", compression=compression,
+        )
+        rows += len(df)
+
+    logger.info(f"Exported {rows} rows for {published_date} to Parquet in {output_dir}.")
+    return rows
+
+
+def read_parquet_table(output_dir, table, columns=None, filters=None):
+    """
+    Reads an exported stage table back, with its partition column as a typed date.
+
+    Args:
+        output_dir (str): Folder passed to `export_parquet`.
+        table (str): The stage table, a key of `STAGE_TABLE_COLUMNS`.
+        columns (list, optional): Columns to read, all by default.
+        filters (list, optional): Row filters in the pyarrow format, e.g.
+            [("published_date", ">=", date(2023, 1, 1))]; filters on the partition
+            column skip whole weeks without opening their files.
+
+    Returns:
+        pd.DataFrame: The rows of every matching partition.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(os.path.join(output_dir, table), schema=parquet_schema(table), format="parquet",
+                         partitioning=_partitioning())
+    filter_expression = pq.filters_to_expression(filters) if filters else None
+    return dataset.to_table(columns=columns, filter=filter_expression).to_pandas()
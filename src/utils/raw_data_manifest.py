@@ -0,0 +1,144 @@
+# imports
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """
+    Computes the SHA-256 hex digest of a file, reading it in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RawDataManifest:
+    """
+    Tracks every raw overview file fetched into `raw_data_dir` in a JSON manifest, so
+    incremental runs only call the API for dates that are missing, failed or stale.
+
+    Each entry is keyed by date ("YYYY-MM-DD") and records the HTTP status, the
+    file path, its byte size, its SHA-256 content hash and the fetch timestamp (UTC).
+    File paths are stored relative to `raw_data_dir`, so the manifest stays valid when
+    a later run (e.g. the Airflow worker) starts from another working directory.
+
+    Args:
+        raw_data_dir (str): Folder holding the raw files and the manifest.
+        file_name (str): Name of the manifest file inside `raw_data_dir`.
+    """
+
+    def __init__(self, raw_data_dir="./raw_data", file_name=MANIFEST_FILE_NAME):
+        self.raw_data_dir = raw_data_dir
+        self.path = os.path.join(raw_data_dir, file_name)
+        self.lock = threading.Lock()
+        self.entries = self.load()
+
+    def load(self):
+        """
+        Reads the manifest from disk, starting empty when it does not exist or is unreadable.
+        """
+        try:
+            with open(self.path) as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            logger.warning(f"Manifest {self.path} is malformed, starting from an empty manifest.")
+            return {}
+
+    def save(self):
+        """
+        Writes the manifest atomically (temporary file + rename) so a crash never leaves it half written.
+        """
+        os.makedirs(self.raw_data_dir, exist_ok=True)
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as manifest_file:
+                json.dump(self.entries, manifest_file, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def record(self, date, status, file_path=None, fetched_at=None):
+        """
+        Records the outcome of fetching `date`.
+
+        Args:
+            date (date or str): The published date that was requested.
+            status (int or None): The HTTP status code, or None if no response was received.
+            file_path (str, optional): The saved raw file for successful fetches.
+            fetched_at (datetime, optional): Fetch timestamp, defaults to now (UTC).
+        """
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        entry = {
+            "date": str(date),
+            "status": status,
+            "file_path": os.path.relpath(file_path, self.raw_data_dir) if file_path else None,
+            "bytes": os.path.getsize(file_path) if file_path else None,
+            "sha256": file_sha256(file_path) if file_path else None,
+            "fetched_at": fetched_at.isoformat(),
+        }
+        with self.lock:
+            self.entries[str(date)] = entry
+
+    def needs_fetch(self, date, settle_days=7, max_age=None, verify_hash=False, now=None):
+        """
+        Decides whether `date` has to be (re-)fetched.
+
+        A date needs fetching when it has no entry, its last fetch failed, its file is
+        missing or changed size (or hash when `verify_hash` is set), or it is stale:
+        fetched less than `settle_days` after the published date (the list may still
+        have changed since) or longer than `max_age` ago.
+
+        Args:
+            date (date or str): The published date.
+            settle_days (int): Days after the published date from which a fetch is considered final.
+            max_age (timedelta, optional): Maximum age of a fetch before it is refreshed anyway.
+            verify_hash (bool): Re-hash the file instead of only checking its size.
+            now (datetime, optional): Current time (UTC), overridable for testing.
+
+        Returns:
+            bool: True if the date should be fetched.
+        """
+        entry = self.entries.get(str(date))
+        if entry is None or entry["status"] != 200:
+            return True
+
+        file_path = os.path.join(self.raw_data_dir, entry["file_path"])
+        if not os.path.exists(file_path) or os.path.getsize(file_path) != entry["bytes"]:
+            return True
+        if verify_hash and file_sha256(file_path) != entry["sha256"]:
+            return True
+
+        now = now or datetime.now(timezone.utc)
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        published_date = datetime.strptime(str(date), "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        if fetched_at < published_date + timedelta(days=settle_days):
+            return True
+        if max_age is not None and now - fetched_at > max_age:
+            return True
+        return False
+
+    def dates_to_fetch(self, dates, **kwargs):
+        """
+        Filters `dates` down to the ones that are missing, failed or stale.
+
+        Args:
+            dates (list): Dates produced by `generate_incremental_dates`.
+            **kwargs: Passed to `needs_fetch`.
+
+        Returns:
+            list: The dates to fetch, in their original order.
+        """
+        pending = [date for date in dates if self.needs_fetch(date, **kwargs)]
+        logger.info(f"{len(pending)} of {len(dates)} dates are missing, failed or stale.")
+        return pending
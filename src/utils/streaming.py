@@ -0,0 +1,252 @@
+# imports
+import json
+import logging
+import re
+
+from .helper_functions import FILE_DATE_KEYS, close_load_batch, open_load_batch, open_raw_file, stage_dataframes, \
+    transform_data
+
+
+logger = logging.getLogger(__name__)
+
+# Characters read from a raw file at a time
+STREAM_READ_SIZE = 1 << 16
+# Books transformed and loaded per chunk
+STREAM_CHUNK_BOOKS = 500
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JSONStream:
+    """
+    Minimal pull parser over a text stream: walks objects and arrays one member at a
+    time and decodes only the values asked for with `json.JSONDecoder.raw_decode`,
+    so at most one such value (plus a read buffer) is held in memory.
+
+    Args:
+        file (file object): Text-mode file to read.
+        read_size (int): Characters read from `file` at a time.
+    """
+
+    def __init__(self, file, read_size=STREAM_READ_SIZE):
+        self.file = file
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        """
+        Appends the next characters of the file to the buffer, dropping the consumed part.
+
+        Returns:
+            bool: False once the end of the file is reached.
+        """
+        chunk = self.file.read(size or self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character, or "" at the end of the file.
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """
+        Decodes the next JSON value, reading more of the file while it is incomplete.
+        """
+        self.peek()
+        size = self.read_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A value ending with the buffer may be a truncated number or literal
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill(size)
+            size *= 2
+
+    def members(self):
+        """
+        Iterates the keys of the object at the current position. The caller consumes
+        each member's value (with `value`, `members` or `items`) before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self._separator("}") == "}":
+                return
+
+    def items(self):
+        """
+        Iterates the elements of the array at the current position. The caller consumes
+        each element before asking for the next one.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self._separator("]") == "]":
+                return
+
+    def _separator(self, closing):
+        """
+        Consumes the "," or `closing` character following a member and returns it.
+        """
+        char = self.peek()
+        if char not in (",", closing):
+            raise json.JSONDecodeError(f"Expecting ',' or {closing!r}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+
+def iter_overview_lists(file_path, read_size=STREAM_READ_SIZE):
+    """
+    Streams the list entries of a raw overview file without parsing it as a whole.
+    The file may hold several responses back to back (e.g. one per line).
+
+    Lists are yielded as soon as the file-level dates of their response are known;
+    lists appearing before those dates are held until the end of the response.
+
+    Args:
+        file_path (str): The raw file, compressed or not.
+        read_size (int): Characters read at a time.
+
+    Yields:
+        tuple: (results header without `lists`, list entry). The header is the same
+            dict for every list of one response.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If the file is malformed.
+    """
+    with open_raw_file(file_path) as file:
+        stream = JSONStream(file, read_size)
+        while stream.peek():
+            header = {}
+            pending = []
+            for key in stream.members():
+                if key != "results":
+                    stream.value()
+                    continue
+                for result_key in stream.members():
+                    if result_key != "lists":
+                        header[result_key] = stream.value()
+                        continue
+                    for _ in stream.items():
+                        list_entry = stream.value()
+                        if all(date_key in header for date_key in FILE_DATE_KEYS):
+                            yield header, list_entry
+                        else:
+                            pending.append(list_entry)
+            for list_entry in pending:
+                yield header, list_entry
+
+
+def iter_transformed_chunks(file_path, chunk_books=STREAM_CHUNK_BOOKS, transform=transform_data,
+                            read_size=STREAM_READ_SIZE):
+    """
+    Transforms a raw overview file in chunks of whole lists holding about `chunk_books`
+    books, so memory stays bounded by the chunk size rather than the file size.
+
+    Args:
+        file_path (str): The raw file.
+        chunk_books (int): Books per chunk; a chunk is closed once it reaches this size.
+        transform (callable): `transform_data` or `transform_data_columnar`.
+        read_size (int): Characters read at a time.
+
+    Yields:
+        tuple: The outputs of `transform` for each chunk.
+    """
+    batch = []
+    batch_header = None
+    books = 0
+    for header, list_entry in iter_overview_lists(file_path, read_size):
+        if batch and header is not batch_header:
+            yield transform({"results": {**batch_header, "lists": batch}})
+            batch, books = [], 0
+        batch_header = header
+        batch.append(list_entry)
+        books += len(list_entry.get("books") or [])
+        if books >= chunk_books:
+            yield transform({"results": {**batch_header, "lists": batch}})
+            batch, books = [], 0
+    if batch:
+        yield transform({"results": {**batch_header, "lists": batch}})
+
+
+def stage_file_streaming(conn, file_path, chunk_books=STREAM_CHUNK_BOOKS, method="upsert", schema="stage",
+                         transform=transform_data, registry=None):
+    """
+    Streams one raw file into the stage tables chunk by chunk, in a single transaction
+    recorded as one load batch.
+
+    Args:
+        conn (psycopg2.connection): The database connection.
+        file_path (str): The raw file.
+        chunk_books (int): Books transformed and loaded per chunk.
+        method (str): "upsert", "copy" or "insert", see `stage_dataframes`.
+        schema (str): Schema holding the stage tables.
+        transform (callable): `transform_data` or `transform_data_columnar`.
+        registry (DimensionRegistry, optional): Skips the lists, books and buy links
+            already staged earlier in the run.
+
+    Returns:
+        tuple: (rows staged, rejected records).
+
+    Raises:
+        Exception: Any read or load error, after rolling the file back.
+    """
+    rows = 0
+    chunks = 0
+    rejected_records = []
+    try:
+        with conn.cursor() as cursor:
+            batch_id = open_load_batch(cursor, file_path, schema)
+            for df_lists, df_books, df_buy_links, df_best_sellers, rejected in iter_transformed_chunks(
+                    file_path, chunk_books, transform):
+                if registry is not None:
+                    df_lists, df_books, df_buy_links = registry.filter(df_lists, df_books, df_buy_links)
+                rows += stage_dataframes(cursor, df_lists, df_books, df_buy_links, df_best_sellers,
+                                         method=method, schema=schema, batch_id=batch_id)
+                rejected_records.extend(rejected)
+                chunks += 1
+            close_load_batch(cursor, batch_id, rows, len(rejected_records), schema)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        if registry is not None:
+            registry.rollback()
+        logger.error(f"Error streaming {file_path}, rolled back: {e}")
+        raise
+    if registry is not None:
+        registry.commit()
+    logger.info(f"Streamed {rows} rows from {file_path} in {chunks} chunks.")
+    return rows, rejected_records
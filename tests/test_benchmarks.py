@@ -0,0 +1,61 @@
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.helper_functions import transform_data
+from benchmarks import bench_etl
+from benchmarks.synthetic_data import generate_overview_payload
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def run_bench_etl(*args):
+    with patch("sys.argv", ["bench_etl", "--weeks", "2", "--lists", "2", "--books-per-list", "5", "--repeat", "1",
+                            "--invalid-rate", "0.2", *args]):
+        bench_etl.main()
+
+
+def test_generate_overview_payload_invalid_rate_only_spoils_books():
+    valid = generate_overview_payload("2023-01-01", num_lists=4, books_per_list=10)
+    spoiled = generate_overview_payload("2023-01-01", num_lists=4, books_per_list=10, invalid_rate=0.25)
+
+    valid_books = [book for list_entry in valid['results']['lists'] for book in list_entry['books']]
+    spoiled_books = [book for list_entry in spoiled['results']['lists'] for book in list_entry['books']]
+    invalid = [book for book in spoiled_books if book['price'] == "n/a"]
+    assert [book['primary_isbn13'] for book in spoiled_books] == [book['primary_isbn13'] for book in valid_books]
+    assert 0 < len(invalid) < len(spoiled_books)
+    assert len(transform_data(spoiled)[4]) == 2 * len(invalid)
+
+
+def test_bench_etl_writes_every_step_as_json(tmp_path):
+    output = tmp_path / "results.json"
+
+    run_bench_etl("--output", str(output))
+
+    results = json.loads(output.read_text())
+    assert results["database"] == "in-process stand-in"
+    assert results["config"]["weeks"] == 2
+    assert list(results["results"]) == [
+        "read_json_file", "transform_data", "transform_data_columnar", "transform_data_batch",
+        "load_data.upsert", "load_data.copy", "load_data.insert", "write_rejected_records_to_file",
+    ]
+    assert results["results"]["transform_data"]["rows"] == 2 * 2 * 5
+    assert results["results"]["write_rejected_records_to_file"]["rows"] > 0
+    assert all(result["seconds"] > 0 for result in results["results"].values())
+
+
+def test_bench_etl_fails_on_regressions_against_a_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    run_bench_etl("--output", str(baseline), "--load-methods", "copy")
+    results = json.loads(baseline.read_text())
+    results["results"]["load_data.copy"]["rows_per_second"] *= 100
+    baseline.write_text(json.dumps(results))
+
+    with pytest.raises(SystemExit, match="load_data.copy"):
+        run_bench_etl("--output", str(tmp_path / "results.json"), "--load-methods", "copy", "--baseline", str(baseline))
@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from unittest.mock import MagicMock
+
+from src.utils.concurrent_fetcher import RateLimiter, TokenBucket, fetch_date, fetch_dates_concurrently
+from src.utils.helper_functions import NYTBooksAPIClient, read_json_file
+from src.utils.raw_data_manifest import RawDataManifest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class StubNYTServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the lists overview endpoint that answers 429 once more than
+    `limit` requests arrive within `window` seconds.
+    """
+
+    def __init__(self, limit, window, latency=0.05):
+        super().__init__(("127.0.0.1", 0), StubNYTHandler)
+        self.limit = limit
+        self.window = window
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.accepted = []
+        self.rejected = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/svc/books/v3/lists/overview.json"
+
+
+class StubNYTHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            now = time.monotonic()
+            recent = [ts for ts in server.accepted if now - ts < server.window]
+            if len(recent) >= server.limit:
+                server.rejected += 1
+                self.send_response(429)
+                self.send_header("Retry-After", str(server.window))
+                self.end_headers()
+                return
+            server.accepted.append(now)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        time.sleep(server.latency)
+        published_date = parse_qs(urlparse(self.path).query)["published_date"][0]
+        body = json.dumps({"status": "OK", "results": {"published_date": published_date, "lists": []}}).encode()
+        with server.lock:
+            server.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(limit, window, latency=0.05):
+        server = StubNYTServer(limit, window, latency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+# Unit test the token buckets
+def test_rate_limiter_allows_burst_then_waits_for_window():
+    clock = FakeClock()
+    limiter = RateLimiter([TokenBucket(5, 60, clock=clock)], clock=clock, sleep=clock.sleep)
+
+    waits = [limiter.acquire() for _ in range(7)]
+
+    assert waits[:5] == [0.0] * 5
+    # Tokens come back one window after they were spent
+    assert waits[5] == pytest.approx(60.0)
+    assert waits[6] == 0.0
+
+
+def test_rate_limiter_enforces_tightest_quota():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        [TokenBucket(5, 60, clock=clock), TokenBucket(6, 24 * 60 * 60, clock=clock)],
+        clock=clock, sleep=clock.sleep,
+    )
+
+    for _ in range(6):
+        limiter.acquire()
+    # The daily quota is exhausted, so the next request waits for a daily token
+    assert clock.now == pytest.approx(60.0)
+    assert limiter.acquire() == pytest.approx(24 * 60 * 60 - 60.0)
+
+
+def test_rate_limiter_penalize_pauses_callers():
+    clock = FakeClock()
+    limiter = RateLimiter([TokenBucket(5, 60, clock=clock)], clock=clock, sleep=clock.sleep)
+
+    limiter.penalize(30)
+
+    assert limiter.acquire() == pytest.approx(30.0)
+
+
+# Test fetch_dates_concurrently against a local stub server
+def test_fetch_dates_concurrently_stays_within_quota(stub_server, tmp_path):
+    server = stub_server(limit=4, window=1)
+    # Leave a little headroom for network jitter between acquiring a token and reaching the server
+    limiter = RateLimiter([TokenBucket(4, 1.2)])
+    dates = [f"2023-01-{day:02d}" for day in range(1, 11)]
+
+    file_paths = fetch_dates_concurrently(
+        "test_api_key", dates, max_workers=4, rate_limiter=limiter,
+        endpoint=server.endpoint, raw_data_dir=str(tmp_path),
+    )
+
+    assert file_paths == [os.path.join(str(tmp_path), f"{date}.json.gz") for date in dates]
+    assert server.rejected == 0
+    assert server.max_in_flight > 1
+    assert read_json_file(file_paths[-1])["results"]["published_date"] == "2023-01-10"
+
+
+def test_fetch_dates_concurrently_retries_after_429(stub_server, tmp_path):
+    server = stub_server(limit=2, window=1)
+    # The local quota is looser than the server's, so some requests get 429s
+    limiter = RateLimiter([TokenBucket(10, 1)])
+    dates = [f"2023-02-{day:02d}" for day in range(1, 6)]
+
+    file_paths = fetch_dates_concurrently(
+        "test_api_key", dates, max_workers=4, rate_limiter=limiter,
+        endpoint=server.endpoint, raw_data_dir=str(tmp_path),
+    )
+
+    assert server.rejected > 0
+    assert len(server.accepted) == len(dates)
+    assert all(os.path.exists(file_path) for file_path in file_paths)
+
+
+def test_fetch_dates_concurrently_raises_after_max_attempts(stub_server, tmp_path):
+    server = stub_server(limit=0, window=0.01)
+    limiter = RateLimiter([TokenBucket(100, 1)])
+
+    with pytest.raises(Exception, match="2023-03-01"):
+        fetch_dates_concurrently(
+            "test_api_key", ["2023-03-01"], max_workers=1, rate_limiter=limiter, max_attempts=2,
+            endpoint=server.endpoint, raw_data_dir=str(tmp_path),
+        )
+    assert server.rejected == 2
+
+
+def test_fetch_dates_concurrently_skips_dates_in_manifest(stub_server, tmp_path):
+    server = stub_server(limit=100, window=1)
+    limiter = RateLimiter([TokenBucket(100, 1)])
+    manifest = RawDataManifest(str(tmp_path))
+    dates = ["2023-01-01", "2023-01-08", "2023-01-15"]
+
+    fetch_dates_concurrently(
+        "test_api_key", dates, rate_limiter=limiter, manifest=manifest,
+        endpoint=server.endpoint, raw_data_dir=str(tmp_path),
+    )
+    file_paths = fetch_dates_concurrently(
+        "test_api_key", dates + ["2023-01-22"], rate_limiter=limiter, manifest=RawDataManifest(str(tmp_path)),
+        endpoint=server.endpoint, raw_data_dir=str(tmp_path),
+    )
+
+    assert len(server.accepted) == 4
+    assert file_paths == [os.path.join(str(tmp_path), "2023-01-22.json.gz")]
+    assert sorted(RawDataManifest(str(tmp_path)).entries) == dates + ["2023-01-22"]
+
+
+def test_fetch_date_records_requests_without_response_in_manifest(tmp_path):
+    client = NYTBooksAPIClient(max_retries=0)
+    client.session.get = MagicMock(side_effect=requests.exceptions.ConnectTimeout("timed out"))
+    manifest = RawDataManifest(str(tmp_path))
+
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        fetch_date("test_api_key", "2023-01-01", MagicMock(), client, raw_data_dir=str(tmp_path), manifest=manifest)
+
+    assert manifest.entries["2023-01-01"]["status"] is None
+    assert manifest.entries["2023-01-01"]["file_path"] is None
+    assert manifest.needs_fetch("2023-01-01")
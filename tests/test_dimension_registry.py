@@ -0,0 +1,67 @@
+import pandas as pd
+
+from src.utils.dimension_registry import DimensionRegistry
+
+
+def books(*rows):
+    return pd.DataFrame([{"id": book_id, "title": title} for book_id, title in rows])
+
+
+def test_registry_skips_rows_already_staged_and_keeps_changed_ones():
+    registry = DimensionRegistry()
+
+    first = registry.filter_table("books", books(("1", "A"), ("2", "B"), ("1", "A")))
+    registry.commit()
+    second = registry.filter_table("books", books(("1", "A"), ("2", "B2"), ("3", "C")))
+    registry.commit()
+
+    assert first["id"].tolist() == ["2", "1"]
+    assert second[["id", "title"]].values.tolist() == [["2", "B2"], ["3", "C"]]
+    assert registry.emitted["books"] == 4
+    assert registry.skipped["books"] == 2
+
+
+def test_registry_ignores_the_weekly_dates_of_a_book():
+    registry = DimensionRegistry()
+    week = lambda updated_date: pd.DataFrame([{"id": "1", "title": "A", "updated_date": updated_date}])
+
+    first = registry.filter_table("books", week("2023-01-01"))
+    registry.commit()
+    second = registry.filter_table("books", week("2023-01-08"))
+
+    assert first["updated_date"].tolist() == ["2023-01-01"]
+    assert second.empty
+    assert registry.skipped["books"] == 1
+
+
+def test_registry_keeps_the_last_row_of_each_key():
+    registry = DimensionRegistry()
+
+    rows = registry.filter_table("books", books(("1", "old"), ("1", "new")))
+
+    assert rows["title"].tolist() == ["new"]
+
+
+def test_registry_rollback_stages_the_rows_again():
+    registry = DimensionRegistry()
+
+    registry.filter_table("books", books(("1", "A")))
+    registry.rollback()
+
+    assert registry.filter_table("books", books(("1", "A")))["id"].tolist() == ["1"]
+
+
+def test_registry_dedupes_buy_links_on_book_and_website_and_passes_rows_without_keys():
+    registry = DimensionRegistry()
+    links = pd.DataFrame([
+        {"book_id": "1", "website_name": "Amazon", "website_url": "a"},
+        {"book_id": "1", "website_name": "Bookshop", "website_url": "b"},
+        {"book_id": None, "website_name": "Amazon", "website_url": "orphan"},
+    ])
+
+    first = registry.filter_table("books_buy_links", links)
+    registry.commit()
+    second = registry.filter_table("books_buy_links", links)
+
+    assert len(first) == 3
+    assert second["website_url"].tolist() == ["orphan"]
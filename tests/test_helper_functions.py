@@ -1,11 +1,18 @@
 import os
+import gzip
 import json
 import pytest
+import pandas as pd
 from datetime import datetime
 import requests
 from unittest.mock import patch, MagicMock
 
-from src.utils.helper_functions import parse_configs, generate_incremental_dates, fetch_data_from_api
+from src.utils.helper_functions import parse_configs, generate_incremental_dates, fetch_data_from_api, \
+    NYTBooksAPIClient, APIRequestError, RAW_DATA_FORMATS, read_json_file, write_json_file, raw_data_file_path, \
+    copy_dataframe, load_data, upsert_dataframe, ensure_fact_partitions, STAGE_TABLE_COLUMNS, STAGE_TABLE_KEYS, \
+    STAGE_TABLE_RECENCY, transform_data, transform_data_columnar, parse_date, date_parse_cache_info, \
+    clear_date_parse_cache, COMPACT_DTYPES, compact_frame, concat_frames, transform_data_batch
+from benchmarks.synthetic_data import generate_overview_payload
 
 # Unit test generate_incremental_dates
 def test_generate_incremental_dates_with_large_offset():
@@ -28,7 +35,7 @@ def test_generate_incremental_dates_no_dates():
 
 
 # Test fetch_data_from_api function
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_fetch_data_from_api_success(mock_get):
     # get API credientials
     NYT_BOOKS_API_KEY, NYT_BOOKS_API_SECRET, NYT_BOOKS_API_ENDPOINT = parse_configs('./config.json')
@@ -46,9 +53,10 @@ def test_fetch_data_from_api_success(mock_get):
     # Call the actual function
     fetch_data_from_api(NYT_BOOKS_API_KEY, DATE)
 
-    # Check that requests.get was called with the expected URL
+    # Check that the pooled session was called with the expected URL and timeouts
     mock_get.assert_called_once_with(
-        f"https://api.nytimes.com/svc/books/v3/lists/overview.json?published_date={DATE}&api-key={NYT_BOOKS_API_KEY}"
+        f"https://api.nytimes.com/svc/books/v3/lists/overview.json?published_date={DATE}&api-key={NYT_BOOKS_API_KEY}",
+        timeout=(5, 30)
     )
 
 def test_fetch_data_from_api_failure():
@@ -61,4 +69,421 @@ def test_fetch_data_from_api_failure():
         NYT_BOOKS_API_KEY = "test_api_key"
         DATE = "2023-01-01"
         with pytest.raises(Exception):
-            fetch_data_from_api(NYT_BOOKS_API_KEY, DATE)
\ No newline at end of file
+            fetch_data_from_api(NYT_BOOKS_API_KEY, DATE)
+
+# Test NYTBooksAPIClient retries
+def make_response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+def test_api_client_retries_transient_status_with_retry_after():
+    sleeps = []
+    client = NYTBooksAPIClient(sleep=sleeps.append)
+    client.session.get = MagicMock(side_effect=[
+        make_response(503, {"Retry-After": "7"}),
+        make_response(200),
+    ])
+
+    response, latency, retries = client.get("http://example.test")
+
+    assert response.status_code == 200
+    assert retries == 1
+    assert sleeps == [7.0]
+    assert client.stats()["requests"] == 1
+    assert client.stats()["retries"] == 1
+
+def test_api_client_backoff_is_jittered_and_capped():
+    client = NYTBooksAPIClient(backoff_factor=1.0, max_backoff=4.0)
+    delays = [client.backoff_delay(retry) for retry in (1, 2, 3, 4, 5) for _ in range(50)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+
+def test_api_client_caps_retry_after_at_max_backoff():
+    client = NYTBooksAPIClient(max_backoff=10.0)
+    assert client.backoff_delay(3, retry_after=7.0) == 7.0
+    assert client.backoff_delay(1, retry_after=3600.0) == 10.0
+
+def test_api_client_gives_up_after_max_retries():
+    sleeps = []
+    client = NYTBooksAPIClient(max_retries=2, sleep=sleeps.append)
+    client.session.get = MagicMock(side_effect=requests.exceptions.ConnectionError("refused"))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get("http://example.test")
+    assert client.session.get.call_count == 3
+    assert len(sleeps) == 2
+
+def test_fetch_data_from_api_raises_api_error_without_retrying_client_errors(tmp_path):
+    client = NYTBooksAPIClient(sleep=lambda delay: None)
+    client.session.get = MagicMock(return_value=make_response(401))
+
+    with pytest.raises(APIRequestError) as error:
+        fetch_data_from_api("test_api_key", "2023-01-01", raw_data_dir=str(tmp_path), client=client)
+    assert error.value.status_code == 401
+    assert client.session.get.call_count == 1
+
+
+# Test compressed raw data storage
+@pytest.mark.parametrize("raw_format", sorted(RAW_DATA_FORMATS))
+def test_write_and_read_json_file_round_trip(tmp_path, raw_format):
+    data = {"status": "OK", "results": {"lists": [{"list_id": 1, "books": []}]}}
+
+    file_path = write_json_file(data, str(tmp_path), "2023-01-01", raw_format)
+
+    assert file_path.endswith(RAW_DATA_FORMATS[raw_format][0])
+    assert raw_data_file_path(str(tmp_path), "2023-01-01") == file_path
+    assert read_json_file(file_path) == data
+
+def test_write_json_file_replaces_other_formats(tmp_path):
+    write_json_file({"results": {}}, str(tmp_path), "2023-01-01", "json")
+    file_path = write_json_file({"results": {}}, str(tmp_path), "2023-01-01", "gzip")
+
+    assert os.listdir(str(tmp_path)) == [os.path.basename(file_path)]
+
+def test_read_json_file_detects_compression_from_content(tmp_path):
+    # A gzip payload saved without the .gz extension is still decompressed
+    file_path = os.path.join(str(tmp_path), "2023-01-01.json")
+    with gzip.open(file_path, "wt") as raw_file:
+        json.dump({"status": "OK"}, raw_file)
+
+    assert read_json_file(file_path) == {"status": "OK"}
+
+def test_read_json_file_returns_none_for_corrupt_archive(tmp_path):
+    file_path = os.path.join(str(tmp_path), "2023-01-01.json.gz")
+    with open(file_path, "wb") as raw_file:
+        raw_file.write(gzip.compress(b'{"status": "OK"}')[:-6])
+
+    assert read_json_file(file_path) is None
+
+
+# Test the COPY bulk loader
+def capture_copies(cursor):
+    copies = []
+    cursor.copy_expert.side_effect = lambda sql, buffer: copies.append((sql, buffer.read()))
+    return copies
+
+def test_copy_dataframe_streams_csv_with_nulls_and_integers():
+    cursor = MagicMock()
+    copies = capture_copies(cursor)
+    df = pd.DataFrame({
+        "id": ["1", "2"],
+        "list_image": ["", None],
+        "list_image_width": [330, None],
+        "note": ['has "quotes", commas', "plain"],
+    })
+
+    rows = copy_dataframe(cursor, df, "stage.lists", ["id", "list_image", "list_image_width", "note"])
+
+    assert rows == 2
+    assert copies == [(
+        "COPY stage.lists (id, list_image, list_image_width, note) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        '1,,330,"has ""quotes"", commas"\n2,\\N,\\N,plain\n',
+    )]
+
+def test_copy_dataframe_splits_large_frames_into_chunks():
+    cursor = MagicMock()
+    copies = capture_copies(cursor)
+    df = pd.DataFrame({"book_id": [str(i) for i in range(5)]})
+
+    copy_dataframe(cursor, df, "stage.books_buy_links", ["book_id"], chunk_rows=2)
+
+    assert [buffer.count("\n") for _, buffer in copies] == [2, 2, 1]
+
+def test_load_data_copies_every_table_in_one_transaction():
+    conn, cursor = MagicMock(), MagicMock()
+    copies = capture_copies(cursor)
+    frames = [pd.DataFrame([{column: None for column in columns}]) for columns in STAGE_TABLE_COLUMNS.values()]
+
+    load_data(conn, cursor, *frames, method="copy")
+
+    assert [sql.split(" (")[0] for sql, _ in copies] == [
+        "COPY stage.lists", "COPY stage.books", "COPY stage.books_buy_links", "COPY stage.best_sellings_lists_books"
+    ]
+    conn.commit.assert_called_once()
+    conn.rollback.assert_not_called()
+
+
+def test_upsert_dataframe_merges_on_natural_keys_through_a_temp_table():
+    cursor = MagicMock()
+    copies = capture_copies(cursor)
+    df = pd.DataFrame([
+        {"book_id": "1", "website_name": "Amazon", "website_url": "old"},
+        {"book_id": "1", "website_name": "Amazon", "website_url": "new"},
+        {"book_id": None, "website_name": "Amazon", "website_url": "orphan"},
+    ])
+
+    rows = upsert_dataframe(cursor, df, "stage.books_buy_links", ["book_id", "website_name", "website_url"],
+                            STAGE_TABLE_KEYS["books_buy_links"])
+
+    statements = [" ".join(call.args[0].split()) for call in cursor.execute.call_args_list]
+    assert rows == 2
+    assert statements[0] == ("CREATE TEMP TABLE books_buy_links_upsert (LIKE stage.books_buy_links "
+                             "INCLUDING DEFAULTS) ON COMMIT DROP")
+    assert [sql.split(" (")[0] for sql, _ in copies] == ["COPY books_buy_links_upsert"]
+    assert "orphan" not in copies[0][1]
+    merge = statements[2]
+    assert "SELECT DISTINCT ON (book_id, website_name)" in merge
+    assert "ORDER BY book_id, website_name, load_order DESC" in merge
+    assert "ON CONFLICT (book_id, website_name) DO UPDATE SET website_url = EXCLUDED.website_url" in merge
+    assert "WHERE (target.website_url) IS DISTINCT FROM (EXCLUDED.website_url)" in merge
+    assert statements[3] == "DROP TABLE books_buy_links_upsert"
+
+def test_upsert_dataframe_never_replaces_a_row_with_an_older_one():
+    cursor = MagicMock()
+    capture_copies(cursor)
+    df = pd.DataFrame([{"id": 1, "list_name": "Fiction", "updated": "2023-01-08"}])
+
+    upsert_dataframe(cursor, df, "stage.lists", ["id", "list_name", "updated"], STAGE_TABLE_KEYS["lists"],
+                     recency=STAGE_TABLE_RECENCY["lists"])
+
+    merge = " ".join(cursor.execute.call_args_list[2].args[0].split())
+    assert "ORDER BY id, updated DESC NULLS LAST, load_order DESC" in merge
+    assert "AND (target.updated IS NULL OR EXCLUDED.updated >= target.updated)" in merge
+
+# Loads into a scratch schema of a real database, e.g.
+# STAGE_TEST_DSN="host=localhost port=5431 dbname=mydb user=admin password=admin" (docker-compose)
+@pytest.mark.skipif("STAGE_TEST_DSN" not in os.environ, reason="needs a Postgres database in STAGE_TEST_DSN")
+def test_load_data_keeps_a_newer_week_loaded_before_an_older_one():
+    import psycopg2
+    from benchmarks.bench_load_data import create_schema
+    schema = "test_stage"
+    conn = psycopg2.connect(os.environ["STAGE_TEST_DSN"])
+    cursor = conn.cursor()
+    create_schema(conn, cursor, schema)
+    try:
+        newer, older = (transform_data(generate_overview_payload(week, num_lists=2, books_per_list=3))
+                        for week in ("2023-01-08", "2023-01-01"))
+        older[2].loc[:, "website_url"] = "https://example.test/stale"
+
+        for frames in (newer, older):
+            load_data(conn, cursor, *frames[:4], schema=schema)
+
+        cursor.execute(f"SELECT DISTINCT updated FROM {schema}.lists")
+        assert [str(row[0]) for row in cursor.fetchall()] == [str(newer[0]["updated"].iloc[0])]
+        cursor.execute(f"SELECT id, updated_date FROM {schema}.books")
+        stored = {book_id: str(updated_date) for book_id, updated_date in cursor.fetchall()}
+        newer_books = dict(zip(newer[1]["id"], newer[1]["updated_date"].astype(str)))
+        assert {book_id: stored[book_id] for book_id in newer_books} == newer_books
+        cursor.execute(f"SELECT COUNT(*) FROM {schema}.books_buy_links WHERE website_url LIKE '%%stale'"
+                       f" AND book_id = ANY(%s)", (newer[2]["book_id"].unique().tolist(),))
+        assert cursor.fetchone()[0] == 0
+    finally:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.commit()
+        conn.close()
+
+def test_load_data_upserts_by_default():
+    conn, cursor = MagicMock(), MagicMock()
+    capture_copies(cursor)
+    frames = [pd.DataFrame([{column: "1" for column in columns}]) for columns in STAGE_TABLE_COLUMNS.values()]
+    frames[3]["published_date"] = datetime(2023, 1, 1).date()
+
+    load_data(conn, cursor, *frames)
+
+    merges = [call.args[0] for call in cursor.execute.call_args_list if "ON CONFLICT" in call.args[0]]
+    assert [f"ON CONFLICT ({', '.join(keys)})" in merge for merge, keys in zip(merges, STAGE_TABLE_KEYS.values())] \
+        == [True] * 4
+    conn.commit.assert_called_once()
+
+
+def test_load_data_records_a_load_batch_on_every_staged_row():
+    conn, cursor = MagicMock(), MagicMock()
+    capture_copies(cursor)
+    cursor.fetchone.return_value = (7,)
+    frames = [pd.DataFrame([{column: "1" for column in columns}]) for columns in STAGE_TABLE_COLUMNS.values()]
+    frames[3]["published_date"] = datetime(2023, 1, 1).date()
+
+    load_data(conn, cursor, *frames, source="2023-01-01")
+
+    calls = [(" ".join(call.args[0].split()), call.args[1] if len(call.args) > 1 else None)
+             for call in cursor.execute.call_args_list]
+    assert calls[0] == ("INSERT INTO stage.load_batches (source) VALUES (%s) RETURNING batch_id", ("2023-01-01",))
+    merges = [(sql, params) for sql, params in calls if "ON CONFLICT" in sql]
+    assert [params for _, params in merges] == [(7,)] * 4
+    assert all("loaded_at = EXCLUDED.loaded_at, batch_id = EXCLUDED.batch_id" in sql for sql, _ in merges)
+    assert calls[-1][0].startswith("UPDATE stage.load_batches SET finished_at = clock_timestamp()")
+    assert calls[-1][1] == (4, 0, 7)
+    conn.commit.assert_called_once()
+
+
+def test_ensure_fact_partitions_creates_missing_yearly_partitions():
+    cursor = MagicMock()
+    # stage.best_sellings_lists_books_2022 exists already
+    cursor.fetchone.side_effect = [("stage.best_sellings_lists_books_2022",), (None,)]
+    published_dates = [datetime(2022, 12, 25).date(), datetime(2023, 1, 1).date(), None, datetime(2023, 1, 8).date()]
+
+    created = ensure_fact_partitions(cursor, published_dates)
+
+    statements = [" ".join(call.args[0].split()) for call in cursor.execute.call_args_list]
+    assert created == ["stage.best_sellings_lists_books_2023"]
+    assert statements[-1] == ("CREATE TABLE IF NOT EXISTS stage.best_sellings_lists_books_2023 PARTITION OF "
+                              "stage.best_sellings_lists_books FOR VALUES FROM ('2023-01-01') TO ('2024-01-01')")
+
+
+# Test the columnar transform against transform_data
+def assert_same_transform(data):
+    expected = transform_data(data)
+    actual = transform_data_columnar(data)
+    for expected_frame, actual_frame in zip(expected[:4], actual[:4]):
+        pd.testing.assert_frame_equal(actual_frame, expected_frame)
+    sort_key = lambda rejected: (rejected['table'], rejected['error'], json.dumps(rejected['record'], sort_keys=True))
+    assert sorted(actual[4], key=sort_key) == sorted(expected[4], key=sort_key)
+    return actual
+
+def test_transform_data_columnar_matches_transform_data():
+    data = generate_overview_payload("2023-01-01", num_lists=4, books_per_list=5, buy_links_per_book=3)
+
+    df_lists, df_books, df_buy_links, df_best_sellers, rejected_records = assert_same_transform(data)
+
+    assert (len(df_lists), len(df_books), len(df_buy_links), len(df_best_sellers)) == (4, 20, 60, 20)
+    assert rejected_records == []
+    # Buy links carry the week they were seen in, so an older week never replaces them
+    assert set(df_buy_links["published_date"].astype(str)) == {data["results"]["published_date"]}
+
+def test_transform_data_columnar_routes_invalid_records_to_rejects():
+    data = generate_overview_payload("2023-01-01", num_lists=2, books_per_list=4, buy_links_per_book=2)
+    lists = data['results']['lists']
+    del lists[0]['display_name']
+    lists[0]['books'][0]['created_date'] = "not a date"
+    lists[0]['books'][1]['price'] = "free"
+    lists[0]['books'][2]['contributor'] = None
+    del lists[1]['books'][0]['publisher']
+    del lists[1]['books'][1]['buy_links'][0]['url']
+    del lists[1]['books'][2]['rank']
+
+    _, df_books, df_buy_links, df_best_sellers, rejected_records = assert_same_transform(data)
+
+    assert {(rejected['table'], rejected['error']) for rejected in rejected_records} == {
+        ('lists', "'display_name'"),
+        ('books', "time data 'not a date' does not match format '%Y-%m-%d %H:%M:%S'"),
+        ('best_sellers_publish', "could not convert string to float: 'free'"),
+        ('books', "'publisher'"),
+        ('books_buy_links', "'url'"),
+        ('best_sellers_publish', "'rank'"),
+    }
+    assert df_books['contributor'].isna().sum() == 1
+    assert len(df_buy_links) == 11
+    assert len(df_best_sellers) == 6
+
+def test_transform_data_columnar_rejects_every_fact_on_bad_file_date():
+    data = generate_overview_payload("2023-01-01", num_lists=2, books_per_list=3)
+    data['results']['published_date'] = "2023-13-01"
+
+    df_lists, _, _, df_best_sellers, rejected_records = assert_same_transform(data)
+
+    assert len(df_lists) == 2
+    assert df_best_sellers.empty
+    assert [rejected['table'] for rejected in rejected_records] == ['best_sellers_publish'] * 6
+
+def test_transform_data_columnar_handles_empty_payload():
+    data = generate_overview_payload("2023-01-01", num_lists=0)
+
+    frames = assert_same_transform(data)
+
+    assert all(frame.empty for frame in frames[:4])
+
+# Test the aggregated transform logging
+@pytest.mark.parametrize("transform", [transform_data, transform_data_columnar])
+def test_transform_logs_one_summary_per_file_at_info(caplog, transform):
+    data = generate_overview_payload("2023-01-01", num_lists=2, books_per_list=3, buy_links_per_book=2)
+
+    with caplog.at_level("INFO", logger="src.utils.helper_functions"):
+        transform(data)
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].transform_summary == {
+        'published_date': "2023-01-01", 'lists': 2, 'books': 6, 'buy_links': 12, 'facts': 6, 'rejects': 0,
+        'seconds': caplog.records[0].transform_summary['seconds'],
+    }
+
+def test_transform_data_logs_records_at_debug(caplog):
+    data = generate_overview_payload("2023-01-01", num_lists=2, books_per_list=3, buy_links_per_book=2)
+
+    with caplog.at_level("DEBUG", logger="src.utils.helper_functions"):
+        transform_data(data)
+
+    assert len([record for record in caplog.records if record.levelname == "DEBUG"]) == 2 + 6 + 12 + 6
+
+
+# Test the date parse cache
+def test_parse_date_counts_hits_and_misses():
+    clear_date_parse_cache()
+
+    dates = [parse_date(value) for value in ["2023-01-01", "2023-01-08", "2023-01-01", "2023-01-01"]]
+
+    assert dates == [datetime(2023, 1, 1).date(), datetime(2023, 1, 8).date()] + [datetime(2023, 1, 1).date()] * 2
+    assert date_parse_cache_info() == {'hits': 2, 'misses': 2, 'size': 2, 'maxsize': 1024}
+
+def test_parse_date_raises_strptime_errors_without_caching_them():
+    clear_date_parse_cache()
+
+    for value, message in [("2023-13-01", "does not match format"), (None, "must be str")]:
+        with pytest.raises((ValueError, TypeError), match=message):
+            parse_date(value)
+
+    assert date_parse_cache_info()['size'] == 0
+
+def test_transform_data_parses_each_distinct_date_once():
+    data = generate_overview_payload("2023-01-01", num_lists=3, books_per_list=10)
+    books = [book for list_entry in data['results']['lists'] for book in list_entry['books']]
+    distinct_book_dates = {(book['created_date'], book['updated_date']) for book in books}
+    distinct_strings = {value for pair in distinct_book_dates for value in pair}
+    clear_date_parse_cache()
+
+    transform_data(data)
+
+    # Four file-level dates, parsed once per file, plus each distinct book date string
+    assert date_parse_cache_info()['misses'] == 4 + len(distinct_strings)
+    assert date_parse_cache_info()['hits'] == 2 * len(books) - len(distinct_strings)
+
+def test_transform_data_returns_compact_dtypes_with_the_same_values():
+    data = generate_overview_payload("2023-01-01", num_lists=3, books_per_list=5, buy_links_per_book=2)
+
+    compact = transform_data(data)
+    plain = transform_data(data, compact=False)
+
+    for table, compact_df, plain_df in zip(STAGE_TABLE_COLUMNS, compact[:4], plain[:4]):
+        for column, dtype in COMPACT_DTYPES[table].items():
+            assert compact_df[column].dtype == dtype
+        pd.testing.assert_frame_equal(compact_df.astype(object), plain_df.astype(object))
+
+def test_compact_frame_keeps_columns_it_cannot_cast():
+    df = pd.DataFrame({'rank': [1, 'first'], 'weeks_on_list': [3, None], 'list_id': [1, 2]})
+
+    df = compact_frame(df, 'best_sellings_lists_books')
+
+    assert df['rank'].tolist() == [1, 'first']
+    assert df['weeks_on_list'].dtype == 'Int16' and df['weeks_on_list'].isna().tolist() == [False, True]
+    assert df['list_id'].dtype == 'category'
+
+def test_concat_frames_unions_categories():
+    first = pd.DataFrame({'book_id': pd.Categorical(['b', 'a']), 'rank': [1, 2]})
+    second = pd.DataFrame({'book_id': pd.Categorical(['c', 'a']), 'rank': [3, 4]})
+
+    df = concat_frames([first, pd.DataFrame(), second])
+
+    assert df.columns.tolist() == ['book_id', 'rank']
+    assert df['book_id'].dtype == 'category'
+    assert df['book_id'].cat.categories.tolist() == ['a', 'b', 'c']
+    assert df['book_id'].tolist() == ['b', 'a', 'c', 'a']
+    assert df['rank'].tolist() == [1, 2, 3, 4]
+
+def test_transform_data_batch_matches_each_week_transformed_apart():
+    payloads = [generate_overview_payload(date, num_lists=3, books_per_list=4, buy_links_per_book=2)
+                for date in ["2023-01-01", "2023-01-08", "2023-01-15"]]
+    payloads[0]['results']['lists'][1]['books'][0]['price'] = "free"
+    payloads[1]['results']['bestsellers_date'] = "not a date"
+    del payloads[2]['results']['lists'][0]['books'][1]['publisher']
+    weekly = [transform_data_columnar(data) for data in payloads]
+
+    df_lists, df_books, df_buy_links, df_best_sellers, rejected_records = transform_data_batch(iter(payloads))
+
+    for table, df in enumerate([df_lists, df_books, df_buy_links, df_best_sellers]):
+        pd.testing.assert_frame_equal(df, concat_frames([result[table] for result in weekly]))
+    assert df_lists['updated'].astype(str).tolist() == [payloads[0]['results']['bestsellers_date']] * 3 + \
+        [payloads[2]['results']['bestsellers_date']] * 3
+    sort_key = lambda rejected: (rejected['table'], rejected['error'], json.dumps(rejected['record'], sort_keys=True))
+    assert sorted(rejected_records, key=sort_key) == sorted(
+        [record for result in weekly for record in result[4]], key=sort_key)
+    assert len(rejected_records) == 1 + 3 + 12 + 1
@@ -0,0 +1,186 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from src.utils.helper_functions import transform_data_columnar
+from src.utils.ingestion import IngestionRunner, merge_transformed, transform_file_batches, transform_files
+from benchmarks.synthetic_data import generate_overview_payload, generate_weekly_dates, write_raw_data_files
+
+
+@pytest.fixture
+def pool():
+    with patch("src.utils.ingestion.ThreadedConnectionPool") as pool_class:
+        pool = pool_class.return_value
+        pool.closed = False
+        pool.getconn.side_effect = lambda: MagicMock()
+        yield pool
+
+
+def make_runner(tmp_path, **kwargs):
+    return IngestionRunner("localhost", "mydb", "admin", "admin", "5432", raw_data_dir=str(tmp_path), **kwargs)
+
+
+def test_runner_commits_once_per_batch_and_returns_connections(pool, tmp_path):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=5, num_lists=2, books_per_list=3)
+    dates = generate_weekly_dates("2023-01-01", 5)
+
+    with make_runner(tmp_path, batch_size=2, dedupe_dimensions=False) as runner:
+        rejected_records = runner.run(dates)
+
+    connections = [call.args[0] for call in pool.putconn.call_args_list]
+    assert pool.getconn.call_count == 3
+    assert len(connections) == 3
+    assert [conn.commit.call_count for conn in connections] == [1, 1, 1]
+    pool.closeall.assert_called_once()
+
+    assert rejected_records == []
+    assert runner.metrics["batches"] == 3
+    assert runner.metrics["dates"] == 5
+    assert len(runner.metrics["acquire_seconds"]) == 3
+    assert len(runner.metrics["commit_seconds"]) == 3
+    # 2 lists, 6 books, 36 buy links and 6 facts per week
+    assert runner.metrics["rows"] == 5 * (2 + 6 + 36 + 6)
+
+
+def test_runner_rejects_missing_raw_files(pool, tmp_path):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=1, num_lists=1, books_per_list=1)
+
+    with make_runner(tmp_path) as runner:
+        rejected_records = runner.run(generate_weekly_dates("2023-01-01", 2))
+
+    assert [record["table"] for record in rejected_records] == ["raw_data"]
+    assert rejected_records[0]["record"].endswith("2023-01-08.json")
+
+
+def test_runner_stages_each_dimension_row_once_per_run(pool, tmp_path):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=4, num_lists=2, books_per_list=3)
+    staged = []
+
+    def capture(cursor, df_lists, df_books, df_buy_links, df_best_sellers, **kwargs):
+        staged.append((len(df_lists), len(df_books), len(df_buy_links), len(df_best_sellers)))
+        return sum(staged[-1])
+
+    with patch("src.utils.ingestion.stage_dataframes", side_effect=capture):
+        with make_runner(tmp_path, batch_size=2) as runner:
+            runner.run(generate_weekly_dates("2023-01-01", 4))
+
+    weeks = generate_weekly_dates("2023-01-01", 4)
+    batch_books = [
+        {book_id for date in weeks[start:start + 2]
+         for book_id in transform_data_columnar(generate_overview_payload(date, num_lists=2, books_per_list=3))[1]["id"]}
+        for start in (0, 2)
+    ]
+    # Only the weekly dates of lists, books and buy links change, so each is staged once
+    # per run, by the first batch it appears in; facts are never skipped
+    assert [lists for lists, _, _, _ in staged] == [2, 0]
+    assert [books_staged for _, books_staged, _, _ in staged] == [len(batch_books[0]),
+                                                                   len(batch_books[1] - batch_books[0])]
+    assert sum(links for _, _, links, _ in staged) == 6 * len(batch_books[0] | batch_books[1])
+    assert [facts for _, _, _, facts in staged] == [12, 12]
+
+
+def test_runner_transforms_each_batch_at_once(pool, tmp_path):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=4, num_lists=2, books_per_list=3)
+    dates = generate_weekly_dates("2023-01-01", 5)
+    staged = []
+
+    def capture(cursor, df_lists, df_books, df_buy_links, df_best_sellers, **kwargs):
+        staged.append(len(df_best_sellers))
+        return len(df_lists) + len(df_books) + len(df_buy_links) + len(df_best_sellers)
+
+    with patch("src.utils.ingestion.stage_dataframes", side_effect=capture):
+        with make_runner(tmp_path, batch_size=2, dedupe_dimensions=False, transform_batches=True,
+                         workers=2) as runner:
+            rejected_records = runner.run(dates)
+
+    assert staged == [12, 12, 0]
+    assert [record["table"] for record in rejected_records] == ["raw_data"]
+    assert runner.metrics["batches"] == 3
+    assert runner.metrics["rows"] == 4 * (2 + 6 + 36 + 6)
+
+
+def test_runner_cannot_export_parquet_from_batched_transforms(pool, tmp_path):
+    with pytest.raises(ValueError, match="transform_batches"):
+        make_runner(tmp_path, transform_batches=True, parquet_dir=str(tmp_path / "parquet"))
+
+
+def test_runner_rolls_back_failed_batch_and_still_returns_connection(pool, tmp_path):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=1, num_lists=1, books_per_list=1)
+
+    with patch("src.utils.ingestion.stage_dataframes", side_effect=RuntimeError("copy failed")):
+        with pytest.raises(RuntimeError):
+            with make_runner(tmp_path) as runner:
+                runner.run(generate_weekly_dates("2023-01-01", 1))
+
+    conn = pool.putconn.call_args.args[0]
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
+    pool.closeall.assert_called_once()
+
+
+def test_runner_streams_one_transaction_per_file(pool, tmp_path):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=2, num_lists=3, books_per_list=2)
+
+    with make_runner(tmp_path, dedupe_dimensions=False) as runner:
+        rejected_records = runner.run_streaming(generate_weekly_dates("2023-01-01", 3), chunk_books=2)
+
+    connections = [call.args[0] for call in pool.putconn.call_args_list]
+    assert [conn.commit.call_count for conn in connections] == [1, 1, 0]
+    assert [record["table"] for record in rejected_records] == ["raw_data"]
+    assert runner.metrics["dates"] == 2
+    # 3 lists, 6 books, 36 buy links and 6 facts per week
+    assert runner.metrics["rows"] == 2 * (3 + 6 + 36 + 6)
+
+
+def test_runner_exports_each_committed_week_to_parquet(pool, tmp_path):
+    pytest.importorskip("pyarrow")
+    raw_data_dir, parquet_dir = tmp_path / "raw", tmp_path / "parquet"
+    write_raw_data_files(str(raw_data_dir), "2023-01-01", num_weeks=3, num_lists=2, books_per_list=3)
+
+    with make_runner(raw_data_dir, batch_size=2, parquet_dir=str(parquet_dir)) as runner:
+        runner.run(generate_weekly_dates("2023-01-01", 3))
+
+    assert sorted(os.listdir(parquet_dir / "best_sellings_lists_books")) == [
+        "published_date=2023-01-01", "published_date=2023-01-08", "published_date=2023-01-15"
+    ]
+
+
+def test_transform_files_in_parallel_keeps_file_order_and_output(tmp_path):
+    file_paths = write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=6, num_lists=2, books_per_list=2)
+
+    serial = list(transform_files(file_paths, workers=1))
+    parallel = list(transform_files(file_paths, workers=3, transform=transform_data_columnar))
+
+    assert [file_path for file_path, _ in parallel] == file_paths
+    for (_, expected), (_, result) in zip(serial, parallel):
+        for expected_df, df in zip(expected[:4], result[:4]):
+            pd.testing.assert_frame_equal(expected_df, df)
+
+
+def test_merge_transformed_concatenates_tables_and_rejects(tmp_path):
+    file_paths = write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=2, num_lists=2, books_per_list=2)
+    results = [result for _, result in transform_files(file_paths)]
+    results[1][4].append({"error": "bad", "record": {}, "table": "books"})
+
+    df_lists, df_books, df_buy_links, df_best_sellers, rejected_records = merge_transformed(results)
+
+    assert len(df_lists) == 4
+    assert len(df_best_sellers) == 8
+    assert list(df_best_sellers["published_date"].astype(str).unique()) == ["2023-01-01", "2023-01-08"]
+    assert rejected_records == [{"error": "bad", "record": {}, "table": "books"}]
+
+
+def test_transform_file_batches_merges_rejects_and_raw_files(tmp_path):
+    file_paths = write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=3, num_lists=2, books_per_list=2)
+    missing = str(tmp_path / "2023-01-22.json")
+
+    batches = list(transform_file_batches([file_paths[:2], [file_paths[2], missing]]))
+
+    assert [paths for paths, _ in batches] == [file_paths[:2], [file_paths[2], missing]]
+    expected = merge_transformed([result for _, result in transform_files(file_paths[:2])])
+    for expected_df, df in zip(expected[:4], batches[0][1][:4]):
+        pd.testing.assert_frame_equal(expected_df, df)
+    assert len(batches[1][1][3]) == 4
+    assert batches[1][1][4] == [{"error": "Raw file is missing or malformed", "record": missing, "table": "raw_data"}]
@@ -0,0 +1,65 @@
+import os
+from datetime import date
+
+import pytest
+
+from src.utils.helper_functions import STAGE_TABLE_COLUMNS, transform_data
+from src.utils.parquet_export import export_parquet, read_parquet_table
+from benchmarks.synthetic_data import generate_overview_payload
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def export_week(output_dir, week, mode="append", books_per_list=3):
+    outputs = transform_data(generate_overview_payload(week, num_lists=2, books_per_list=books_per_list))
+    return export_parquet(str(output_dir), date.fromisoformat(week), *outputs[:4], mode=mode)
+
+
+def partitions(output_dir, table):
+    return sorted(os.listdir(os.path.join(output_dir, table)))
+
+
+def test_export_parquet_writes_typed_partitioned_datasets(tmp_path):
+    rows = export_week(tmp_path, "2023-01-01")
+
+    # 2 lists, 6 books, 36 buy links and 6 facts
+    assert rows == 2 + 6 + 36 + 6
+    for table in STAGE_TABLE_COLUMNS:
+        assert partitions(tmp_path, table) == ["published_date=2023-01-01"]
+
+    schema = pq.read_schema(tmp_path / "books" / "published_date=2023-01-01" / "part-0.parquet")
+    assert schema.field("publisher").type == pa.dictionary(pa.int32(), pa.string())
+    assert schema.field("created_date").type == pa.date32()
+    assert schema.field("book_image_width").type == pa.int32()
+
+    df_best_sellers = read_parquet_table(str(tmp_path), "best_sellings_lists_books")
+    assert len(df_best_sellers) == 6
+    assert set(df_best_sellers["published_date"]) == {date(2023, 1, 1)}
+    assert str(df_best_sellers["book_id"].dtype) == "category"
+
+
+def test_export_parquet_append_replaces_only_the_weeks_written(tmp_path):
+    export_week(tmp_path, "2023-01-01")
+    export_week(tmp_path, "2023-01-08")
+    export_week(tmp_path, "2023-01-08", books_per_list=1)
+
+    assert partitions(tmp_path, "lists") == ["published_date=2023-01-01", "published_date=2023-01-08"]
+    df_best_sellers = read_parquet_table(str(tmp_path), "best_sellings_lists_books")
+    assert df_best_sellers.groupby("published_date").size().to_dict() == {date(2023, 1, 1): 6, date(2023, 1, 8): 2}
+
+    recent = read_parquet_table(str(tmp_path), "books", columns=["id", "published_date"],
+                                filters=[("published_date", ">=", date(2023, 1, 8))])
+    assert len(recent) == 2
+
+
+def test_export_parquet_overwrite_replaces_every_week(tmp_path):
+    export_week(tmp_path, "2023-01-01")
+    export_week(tmp_path, "2023-01-08", mode="overwrite")
+
+    assert partitions(tmp_path, "best_sellings_lists_books") == ["published_date=2023-01-08"]
+
+
+def test_export_parquet_rejects_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        export_week(tmp_path, "2023-01-01", mode="upsert")
@@ -0,0 +1,233 @@
+import datetime
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utils.ingestion import IngestionRunner
+from src.utils.pipeline import Pipeline, Stage, run_etl_pipeline
+from src.utils.helper_functions import transform_data_batch, write_json_file
+from benchmarks.synthetic_data import generate_overview_payload, generate_weekly_dates, write_raw_data_files
+
+
+def test_pipeline_runs_items_through_every_stage():
+    pipeline = Pipeline([
+        Stage("double", lambda item: item * 2, workers=3),
+        Stage("increment", lambda item: item + 1),
+    ])
+
+    outputs = list(pipeline.run(range(20)))
+
+    assert sorted(outputs) == [item * 2 + 1 for item in range(20)]
+    assert pipeline.stats()["double"]["processed"] == 20
+    assert pipeline.stats()["increment"]["processed"] == 20
+
+
+def test_pipeline_hands_batches_to_batched_stages():
+    batches = []
+    pipeline = Pipeline([Stage("load", lambda batch: batches.append(batch) or len(batch), batch_size=4)])
+
+    assert list(pipeline.run(range(10))) == [4, 4, 2]
+    assert sum(batches, []) == list(range(10))
+
+
+def test_pipeline_restores_the_input_order_for_ordered_stages():
+    def shuffle(item):
+        # Early items take longest, so the workers finish them last
+        time.sleep(0.01 * (10 - item))
+        if item == 4:
+            raise ValueError("bad item 4")
+        return item
+
+    pipeline = Pipeline([
+        Stage("shuffle", shuffle, workers=4),
+        Stage("batch", lambda batch: batch, batch_size=3, ordered=True),
+    ])
+
+    with pytest.raises(Exception, match="1 items failed"):
+        batches = []
+        for batch in pipeline.run(range(10)):
+            batches.append(batch)
+
+    assert batches == [[0, 1, 2], [3, 5, 6], [7, 8, 9]]
+
+
+def test_pipeline_applies_backpressure_to_the_source():
+    pulled = []
+    release = threading.Event()
+
+    def source():
+        for item in range(100):
+            pulled.append(item)
+            yield item
+
+    pipeline = Pipeline([Stage("wait", lambda item: release.wait() and item)], queue_size=2)
+    outputs = pipeline.run(source())
+    consumer = threading.Thread(target=lambda: list(outputs))
+    consumer.start()
+    time.sleep(0.3)
+
+    # One item in the stage, two queued in front of it and one blocked in the feeder
+    assert len(pulled) <= 4
+    release.set()
+    consumer.join()
+    assert len(pulled) == 100
+    assert pipeline.stats()["wait"]["max_queue_depth"] == 2
+
+
+def test_pipeline_applies_backpressure_through_ordered_stages():
+    pulled = []
+    release = threading.Event()
+
+    def source():
+        for item in range(100):
+            pulled.append(item)
+            yield item
+
+    def slow_first(item):
+        if item == 0:
+            release.wait()
+        return item
+
+    pipeline = Pipeline([Stage("shuffle", slow_first, workers=4), Stage("ordered", lambda item: item, ordered=True)],
+                        queue_size=2)
+    outputs = []
+    consumer = threading.Thread(target=lambda: outputs.extend(pipeline.run(source())))
+    consumer.start()
+    time.sleep(0.3)
+
+    try:
+        # The ordered stage waits for item 0 holding at most two items, so the source is not drained
+        assert len(pulled) <= 3
+    finally:
+        release.set()
+        consumer.join()
+    assert outputs == list(range(100))
+
+
+def test_pipeline_drops_failed_items_and_raises_at_the_end():
+    def check(item):
+        if item % 5 == 0:
+            raise ValueError(f"bad item {item}")
+        return item
+
+    pipeline = Pipeline([Stage("check", check, workers=2)])
+    outputs = []
+
+    with pytest.raises(Exception, match="2 items failed"):
+        for output in pipeline.run(range(1, 11)):
+            outputs.append(output)
+
+    assert sorted(outputs) == [1, 2, 3, 4, 6, 7, 8, 9]
+    assert pipeline.stats()["check"]["failed"] == 2
+
+
+def test_pipeline_stops_its_threads_when_abandoned():
+    pipeline = Pipeline([Stage("identity", lambda item: item)], queue_size=1)
+
+    outputs = pipeline.run(iter(range(1000)))
+    assert next(outputs) == 0
+    outputs.close()
+
+    assert pipeline.stats()["identity"]["processed"] < 1000
+
+
+# Test the ETL pipeline with a mocked connection pool
+@pytest.fixture
+def pool():
+    with patch("src.utils.ingestion.ThreadedConnectionPool") as pool_class:
+        pool = pool_class.return_value
+        pool.closed = False
+        pool.getconn.side_effect = lambda: MagicMock()
+        yield pool
+
+
+def test_etl_pipeline_loads_existing_raw_files_in_batches(pool, tmp_path):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=5, num_lists=2, books_per_list=3)
+    dates = generate_weekly_dates("2023-01-01", 6)
+
+    with IngestionRunner("localhost", "mydb", "admin", "admin", "5432", raw_data_dir=str(tmp_path),
+                         batch_size=2, dedupe_dimensions=False) as runner:
+        rejected_records = run_etl_pipeline(runner, dates, transform_workers=2)
+
+    assert [record["table"] for record in rejected_records] == ["raw_data"]
+    assert runner.metrics["batches"] == 3
+    assert runner.metrics["dates"] == 6
+    # 2 lists, 6 books, 36 buy links and 6 facts per existing week
+    assert runner.metrics["rows"] == 5 * (2 + 6 + 36 + 6)
+
+
+def test_etl_pipeline_transforms_in_a_process_pool(pool, tmp_path):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=4, num_lists=1, books_per_list=2)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        with IngestionRunner("localhost", "mydb", "admin", "admin", "5432", raw_data_dir=str(tmp_path),
+                             dedupe_dimensions=False) as runner:
+            pipeline_rejects = run_etl_pipeline(runner, generate_weekly_dates("2023-01-01", 4),
+                                                transform_workers=2, transform_executor=executor)
+
+    assert pipeline_rejects == []
+    assert runner.metrics["rows"] == 4 * (1 + 2 + 12 + 2)
+
+
+def test_etl_pipeline_transforms_whole_batches(pool, tmp_path):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=5, num_lists=2, books_per_list=3)
+    dates = generate_weekly_dates("2023-01-01", 6)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for transform_executor in (None, executor):
+            with IngestionRunner("localhost", "mydb", "admin", "admin", "5432", raw_data_dir=str(tmp_path),
+                                 batch_size=2, dedupe_dimensions=False, transform_batches=True) as runner:
+                rejected_records = run_etl_pipeline(runner, dates, transform_workers=2,
+                                                    transform_executor=transform_executor)
+
+            assert [record["table"] for record in rejected_records] == ["raw_data"]
+            assert runner.metrics["batches"] == 3
+            assert runner.metrics["dates"] == 6
+            assert runner.metrics["rows"] == 5 * (2 + 6 + 36 + 6)
+
+
+# The DAG transforms whole batches in a process pool
+@pytest.mark.parametrize("transform_batches, processes", [(False, 0), (True, 0), (True, 3)])
+def test_etl_pipeline_commits_consecutive_dates_in_date_order(pool, tmp_path, transform_batches, processes):
+    write_raw_data_files(str(tmp_path), "2023-01-01", num_weeks=8, num_lists=1, books_per_list=2)
+    dates = generate_weekly_dates("2023-01-01", 8)
+
+    def slow_transform(payloads):
+        # The earliest weeks take longest, so the transform workers finish them last
+        weeks = [payload["results"]["published_date"] for payload in payloads]
+        time.sleep(0.05 * (len(dates) - dates.index(datetime.date.fromisoformat(min(weeks)))))
+        return transform_data_batch(payloads)
+
+    committed = []
+    # Patched before the pool starts, so that its forked processes inherit the patch
+    with patch("src.utils.pipeline.transform_data_batch", side_effect=slow_transform), \
+            patch("src.utils.ingestion.transform_data_batch", side_effect=slow_transform), \
+            ProcessPoolExecutor(max_workers=processes or 1) as executor:
+        with IngestionRunner("localhost", "mydb", "admin", "admin", "5432", raw_data_dir=str(tmp_path),
+                             batch_size=3, dedupe_dimensions=False, transform_batches=transform_batches) as runner:
+            stage_batch = runner.stage_batch
+            runner.stage_batch = lambda batch_dates, result: committed.append(batch_dates) or stage_batch(
+                batch_dates, result)
+            run_etl_pipeline(runner, dates, transform_workers=3, transform_executor=executor if processes else None,
+                             transform=lambda data: slow_transform([data]))
+
+    assert committed == [dates[0:3], dates[3:6], dates[6:8]]
+
+
+def test_etl_pipeline_fetches_dates_before_loading_them(pool, tmp_path):
+    def fake_fetch_date(api_key, date, rate_limiter, client, **kwargs):
+        data = generate_overview_payload(date, num_lists=1, books_per_list=1)
+        return write_json_file(data, kwargs["raw_data_dir"], date, kwargs["raw_format"])
+
+    dates = generate_weekly_dates("2023-01-01", 3)
+    with patch("src.utils.pipeline.fetch_date", side_effect=fake_fetch_date) as fetch_date:
+        with IngestionRunner("localhost", "mydb", "admin", "admin", "5432", raw_data_dir=str(tmp_path)) as runner:
+            rejected_records = run_etl_pipeline(runner, dates, NYT_BOOKS_API_KEY="test_api_key",
+                                                rate_limiter=MagicMock(), client=MagicMock())
+
+    assert fetch_date.call_count == 3
+    assert rejected_records == []
+    assert runner.metrics["dates"] == 3
@@ -0,0 +1,84 @@
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from src.utils.raw_data_manifest import RawDataManifest, file_sha256
+
+
+def write_raw_file(raw_data_dir, published_date, payload=None):
+    file_path = os.path.join(str(raw_data_dir), f"{published_date}.json")
+    with open(file_path, "w") as raw_file:
+        json.dump(payload or {"status": "OK", "results": {"lists": []}}, raw_file)
+    return file_path
+
+
+def fetched_on(day):
+    return datetime(2023, 6, day, tzinfo=timezone.utc)
+
+
+def test_record_persists_size_hash_and_timestamp(tmp_path):
+    manifest = RawDataManifest(str(tmp_path))
+    file_path = write_raw_file(tmp_path, "2023-05-28")
+
+    manifest.record(date(2023, 5, 28), 200, file_path, fetched_at=fetched_on(1))
+    manifest.save()
+
+    entry = RawDataManifest(str(tmp_path)).entries["2023-05-28"]
+    assert entry["status"] == 200
+    assert entry["bytes"] == os.path.getsize(file_path)
+    assert entry["sha256"] == file_sha256(file_path)
+    assert entry["fetched_at"] == "2023-06-01T00:00:00+00:00"
+
+
+def test_dates_to_fetch_selects_missing_failed_and_stale_dates(tmp_path):
+    manifest = RawDataManifest(str(tmp_path))
+    manifest.record("2023-05-07", 200, write_raw_file(tmp_path, "2023-05-07"), fetched_at=fetched_on(1))
+    manifest.record("2023-05-14", 503, fetched_at=fetched_on(1))
+    # Fetched the day after publication, before the list was final
+    manifest.record("2023-05-28", 200, write_raw_file(tmp_path, "2023-05-28"), fetched_at=datetime(2023, 5, 29, tzinfo=timezone.utc))
+
+    dates = ["2023-05-07", "2023-05-14", "2023-05-21", "2023-05-28"]
+
+    assert manifest.dates_to_fetch(dates) == ["2023-05-14", "2023-05-21", "2023-05-28"]
+
+
+def test_dates_to_fetch_detects_changed_or_deleted_files(tmp_path):
+    manifest = RawDataManifest(str(tmp_path))
+    for published_date in ("2023-05-07", "2023-05-14", "2023-05-21"):
+        manifest.record(published_date, 200, write_raw_file(tmp_path, published_date), fetched_at=fetched_on(1))
+
+    os.remove(os.path.join(str(tmp_path), "2023-05-07.json"))
+    write_raw_file(tmp_path, "2023-05-14", {"status": "OK", "results": {"lists": [1]}})
+
+    assert manifest.dates_to_fetch(["2023-05-07", "2023-05-14", "2023-05-21"]) == ["2023-05-07", "2023-05-14"]
+
+
+def test_dates_to_fetch_refreshes_entries_older_than_max_age(tmp_path):
+    manifest = RawDataManifest(str(tmp_path))
+    manifest.record("2023-05-07", 200, write_raw_file(tmp_path, "2023-05-07"), fetched_at=fetched_on(1))
+
+    assert manifest.dates_to_fetch(["2023-05-07"], max_age=timedelta(days=30), now=fetched_on(10)) == []
+    assert manifest.dates_to_fetch(["2023-05-07"], max_age=timedelta(days=5), now=fetched_on(10)) == ["2023-05-07"]
+
+
+def test_recorded_files_are_found_from_another_working_directory(tmp_path, monkeypatch):
+    (tmp_path / "airflow" / "raw_data").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path / "airflow")
+    manifest = RawDataManifest("./raw_data")
+    manifest.record("2023-05-28", 200, write_raw_file("./raw_data", "2023-05-28"), fetched_at=fetched_on(10))
+    manifest.save()
+
+    monkeypatch.chdir(tmp_path)
+    manifest = RawDataManifest(os.path.join("airflow", "raw_data"))
+
+    assert manifest.entries["2023-05-28"]["file_path"] == "2023-05-28.json"
+    assert not manifest.needs_fetch("2023-05-28", now=fetched_on(10))
+
+
+def test_malformed_manifest_starts_empty(tmp_path):
+    with open(os.path.join(str(tmp_path), "manifest.json"), "w") as manifest_file:
+        manifest_file.write("{not json")
+
+    assert RawDataManifest(str(tmp_path)).entries == {}
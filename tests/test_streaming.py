@@ -0,0 +1,80 @@
+import json
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from src.utils.helper_functions import transform_data, transform_data_columnar, write_json_file
+from src.utils.ingestion import merge_transformed
+from src.utils.streaming import iter_overview_lists, iter_transformed_chunks, stage_file_streaming
+from benchmarks.synthetic_data import generate_overview_payload, write_concatenated_raw_file
+
+
+@pytest.mark.parametrize("raw_format", ["json", "gzip"])
+@pytest.mark.parametrize("transform", [transform_data, transform_data_columnar])
+def test_streamed_chunks_match_whole_file_transform(tmp_path, raw_format, transform):
+    data = generate_overview_payload("2023-01-01", num_lists=5, books_per_list=4)
+    file_path = write_json_file(data, str(tmp_path), "2023-01-01", raw_format)
+
+    # A tiny read size makes values straddle buffer boundaries
+    chunks = list(iter_transformed_chunks(file_path, chunk_books=8, transform=transform, read_size=7))
+
+    assert [len(chunk[1]) for chunk in chunks] == [8, 8, 4]
+    for expected, actual in zip(transform_data(data)[:4], merge_transformed(chunks)[:4]):
+        pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_iter_overview_lists_reads_concatenated_responses(tmp_path):
+    file_path = write_concatenated_raw_file(str(tmp_path / "weeks.json"), "2023-01-01", num_weeks=3,
+                                            num_lists=2, books_per_list=1)
+
+    published_dates = [header["published_date"] for header, _ in iter_overview_lists(file_path, read_size=16)]
+
+    assert published_dates == ["2023-01-01"] * 2 + ["2023-01-08"] * 2 + ["2023-01-15"] * 2
+
+
+def test_iter_overview_lists_waits_for_dates_listed_after_lists(tmp_path):
+    data = generate_overview_payload("2023-01-01", num_lists=2, books_per_list=1)
+    results = data["results"]
+    data["results"] = {"lists": results.pop("lists"), **results}
+    file_path = tmp_path / "lists_first.json"
+    file_path.write_text(json.dumps(data, indent=2))
+
+    headers = [header for header, _ in iter_overview_lists(str(file_path))]
+
+    assert [header["published_date"] for header in headers] == ["2023-01-01", "2023-01-01"]
+
+
+def test_iter_overview_lists_raises_on_malformed_file(tmp_path):
+    file_path = tmp_path / "truncated.json"
+    file_path.write_text('{"results": {"published_date": "2023-01-01", "lists": [{"list_id": 1}')
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_overview_lists(str(file_path)))
+
+
+def test_stage_file_streaming_loads_every_chunk_in_one_transaction(tmp_path):
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    data = generate_overview_payload("2023-01-01", num_lists=3, books_per_list=2, buy_links_per_book=1)
+    file_path = write_json_file(data, str(tmp_path), "2023-01-01")
+
+    rows, rejected_records = stage_file_streaming(conn, file_path, chunk_books=2)
+
+    # 3 chunks x 4 tables
+    assert cursor.copy_expert.call_count == 12
+    assert rows == 3 + 6 + 6 + 6
+    assert rejected_records == []
+    conn.commit.assert_called_once()
+
+
+def test_stage_file_streaming_rolls_back_on_malformed_file(tmp_path):
+    conn = MagicMock()
+    file_path = tmp_path / "2023-01-01.json"
+    file_path.write_text('{"results": {"lists": [')
+
+    with pytest.raises(json.JSONDecodeError):
+        stage_file_streaming(conn, str(file_path))
+
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()